@@ -1,9 +1,14 @@
 import React, { useState, useRef, useEffect } from "react";
-import { Search, X, Clock, ArrowUpRight } from "lucide-react";
+import { Search, X, Clock, ArrowUpRight, Heart } from "lucide-react";
 import { useTranslation } from 'react-i18next';
+import { useNavigate } from "react-router-dom";
 import { Input } from "../components/ui/input";
 import { Button } from "../components/ui/button";
 import { Card, CardContent } from "../components/ui/card";
+import { campaignsAPI } from "../lib/api";
+
+// Wait for a pause in typing before asking for suggestions
+const SUGGEST_DELAY_MS = 250;
 
 const SearchBar = ({ 
   onSearch, 
@@ -17,8 +22,10 @@ const SearchBar = ({
   const [isOpen, setIsOpen] = useState(false);
   const [recentSearches, setRecentSearches] = useState([]);
   const [isLoading, setIsLoading] = useState(false);
+  const [suggestions, setSuggestions] = useState([]);
   const searchRef = useRef(null);
   const inputRef = useRef(null);
+  const navigate = useNavigate();
 
   // Load recent searches from localStorage on mount
   useEffect(() => {
@@ -34,6 +41,32 @@ const SearchBar = ({
     }
   }, [showRecentSearches]);
 
+  // Fetch campaign title suggestions as the user types
+  useEffect(() => {
+    const term = query.trim();
+    if (!term) {
+      setSuggestions([]);
+      return;
+    }
+
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const results = await campaignsAPI.suggestCampaigns(term);
+        // Ignore responses for a query the user has already typed past
+        if (!cancelled) setSuggestions(results);
+      } catch (error) {
+        console.error('Error loading suggestions:', error);
+        if (!cancelled) setSuggestions([]);
+      }
+    }, SUGGEST_DELAY_MS);
+
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [query]);
+
   // Close search dropdown when clicking outside
   useEffect(() => {
     const handleClickOutside = (event) => {
@@ -108,6 +141,12 @@ const SearchBar = ({
     handleSearch(searchTerm);
   };
 
+  const handleSuggestion = (campaign) => {
+    setQuery("");
+    setIsOpen(false);
+    navigate(`/campaigns/${campaign.id}`);
+  };
+
   return (
     <div ref={searchRef} className={`relative ${className}`}>
       <div className="relative">
@@ -157,6 +196,22 @@ const SearchBar = ({
               </div>
             )}
 
+            {/* Campaign Suggestions */}
+            {query.trim() && suggestions.length > 0 && (
+              <div className="mb-2 space-y-1">
+                {suggestions.map((campaign) => (
+                  <button
+                    key={campaign.id}
+                    className="w-full flex items-center gap-3 p-2 text-left hover:bg-muted rounded-md transition-colors"
+                    onClick={() => handleSuggestion(campaign)}
+                  >
+                    <Heart className="h-4 w-4 text-muted-foreground flex-shrink-0" />
+                    <span className="flex-1 truncate text-sm">{campaign.title}</span>
+                  </button>
+                ))}
+              </div>
+            )}
+
             {/* Recent Searches */}
             {showRecentSearches && recentSearches.length > 0 && (
               <div>
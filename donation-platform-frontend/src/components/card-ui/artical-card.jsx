@@ -41,6 +41,11 @@ const ArticalCard = ({ campaign }) => {
               {t('campaign.currentAmount')}: {formatCurrency(campaign.current_amount)} /{" "}
               {formatCurrency(campaign.target_amount)}
             </div>
+            {campaign.donation_stats && (
+              <div className=" text-sm text-muted-foreground">
+                {t('analytics.donationsCount')}: {campaign.donation_stats.total_donations}
+              </div>
+            )}
           </div>
           <Link
             to={`/campaigns/${campaign.id}`}
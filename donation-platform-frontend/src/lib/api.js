@@ -159,6 +159,13 @@ export const campaignsAPI = {
     return response.data;
   },
 
+  // Title suggestions while typing (id and title only)
+  suggestCampaigns: async (query, limit = 8) => {
+    const url = createUrlWithLang('/api/v1/campaigns/suggest', { q: query, limit });
+    const response = await api.get(url);
+    return response.data;
+  },
+
   // Get user's campaigns
   getMyCampaigns: async (page = 1, pageSize = 10) => {
     const params = { page, page_size: pageSize };
@@ -465,6 +472,19 @@ export const newsletterAPI = {
     }
   },
 
+  // Unsubscribe with the signed token from a newsletter email link
+  unsubscribeWithToken: async (token) => {
+    try {
+      const response = await api.post('/api/v1/newsletter/unsubscribe', {
+        token
+      });
+      return response.data;
+    } catch (error) {
+      console.error('Error unsubscribing from newsletter:', error);
+      throw error;
+    }
+  },
+
   // Get subscription status
   getSubscriptionStatus: async (email) => {
     try {
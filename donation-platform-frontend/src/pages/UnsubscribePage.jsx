@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useTranslation } from 'react-i18next';
 import { useSearchParams } from 'react-router-dom';
 import { newsletterAPI } from '../lib/api';
@@ -10,8 +10,18 @@ const UnsubscribePage = () => {
   const [isUnsubscribing, setIsUnsubscribing] = useState(false);
   const [status, setStatus] = useState(null); // 'success' | 'error' | null
   const [message, setMessage] = useState('');
+  const tokenHandled = useRef(null);
 
   useEffect(() => {
+    // Newsletter links carry a signed token: unsubscribe in one click
+    const token = searchParams.get('token');
+    if (token) {
+      if (tokenHandled.current === token) return;
+      tokenHandled.current = token;
+      unsubscribeWithToken(token);
+      return;
+    }
+
     // Pre-fill email from URL params if available
     const emailParam = searchParams.get('email');
     if (emailParam) {
@@ -19,6 +29,30 @@ const UnsubscribePage = () => {
     }
   }, [searchParams]);
 
+  const unsubscribeWithToken = async (token) => {
+    setIsUnsubscribing(true);
+    setStatus(null);
+    setMessage('');
+
+    try {
+      await newsletterAPI.unsubscribeWithToken(token);
+      setStatus('success');
+      setMessage(t('footer.unsubscribeSuccess'));
+    } catch (error) {
+      // Fall back to the email form below
+      setStatus('error');
+      if (error.response?.status === 400) {
+        setMessage('This unsubscribe link is invalid. Please enter your email instead.');
+      } else if (error.response?.status === 404) {
+        setMessage('Email not found in newsletter subscriptions');
+      } else {
+        setMessage(t('footer.unsubscribeError'));
+      }
+    } finally {
+      setIsUnsubscribing(false);
+    }
+  };
+
   const handleUnsubscribe = async (e) => {
     e.preventDefault();
     
@@ -9,7 +9,7 @@ from alembic import context
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from app.db.database import Base
-from app.db.models import User, Campaign, Donation
+import app.db.models  # noqa: F401  registers every model's table on Base.metadata
 from app.core.config import settings
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,142 @@
+"""Initial schema: users, categories, campaigns, donations and newsletter subscriptions
+
+Revision ID: 0001
+Revises: 
+Create Date: 2025-06-01 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('username', sa.String(length=50), nullable=False),
+        sa.Column('hashed_password', sa.String(length=255), nullable=False),
+        sa.Column('full_name', sa.String(length=100), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('is_admin', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
+
+    op.create_table(
+        'categories',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('slug', sa.String(length=100), nullable=False),
+        sa.Column('icon', sa.String(length=50), nullable=True),
+        sa.Column('color', sa.String(length=7), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+        sa.UniqueConstraint('slug')
+    )
+    op.create_index('ix_categories_id', 'categories', ['id'], unique=False)
+
+    op.create_table(
+        'campaigns',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('markdown_text', sa.Text(), nullable=True),
+        sa.Column('target_amount', sa.Float(), nullable=False),
+        sa.Column('current_amount', sa.Float(), nullable=True),
+        sa.Column('start_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('end_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            'status',
+            sa.Enum('DRAFT', 'PENDING', 'ACTIVE', 'COMPLETED', 'CANCELLED', name='campaignstatus'),
+            nullable=True
+        ),
+        sa.Column('image_path', sa.String(length=255), nullable=True),
+        sa.Column('lang', sa.String(length=10), nullable=False),
+        sa.Column('creator_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['creator_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_campaigns_id', 'campaigns', ['id'], unique=False)
+
+    op.create_table(
+        'campaign_categories',
+        sa.Column('campaign_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id']),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+        sa.PrimaryKeyConstraint('campaign_id', 'category_id')
+    )
+
+    op.create_table(
+        'donations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=True),
+        sa.Column('message', sa.Text(), nullable=True),
+        sa.Column('is_anonymous', sa.Boolean(), nullable=True),
+        sa.Column('payment_status', sa.String(length=20), nullable=True),
+        sa.Column('payment_id', sa.String(length=255), nullable=True),
+        sa.Column('donor_id', sa.Integer(), nullable=True),
+        sa.Column('campaign_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id']),
+        sa.ForeignKeyConstraint(['donor_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_donations_id', 'donations', ['id'], unique=False)
+
+    op.create_table(
+        'newsletter_subscriptions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('subscribed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('unsubscribed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('source', sa.String(length=50), nullable=True),
+        sa.Column('language', sa.String(length=5), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_newsletter_subscriptions_id', 'newsletter_subscriptions', ['id'], unique=False)
+    op.create_index('ix_newsletter_subscriptions_email', 'newsletter_subscriptions', ['email'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_newsletter_subscriptions_email', table_name='newsletter_subscriptions')
+    op.drop_index('ix_newsletter_subscriptions_id', table_name='newsletter_subscriptions')
+    op.drop_table('newsletter_subscriptions')
+    op.drop_index('ix_donations_id', table_name='donations')
+    op.drop_table('donations')
+    op.drop_table('campaign_categories')
+    op.drop_index('ix_campaigns_id', table_name='campaigns')
+    op.drop_table('campaigns')
+    sa.Enum(name='campaignstatus').drop(op.get_bind(), checkfirst=True)
+    op.drop_index('ix_categories_id', table_name='categories')
+    op.drop_table('categories')
+    op.drop_index('ix_users_username', table_name='users')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_table('users')
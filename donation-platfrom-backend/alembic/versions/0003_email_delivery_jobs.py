@@ -0,0 +1,58 @@
+"""Checkpointed newsletter delivery jobs
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-06-27 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'email_delivery_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('outbox_id', sa.Integer(), nullable=False),
+        sa.Column('notification', sa.String(length=50), nullable=False),
+        sa.Column('campaign_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('last_language', sa.String(length=5), nullable=True),
+        sa.Column('last_subscriber_id', sa.Integer(), nullable=True),
+        sa.Column('total_recipients', sa.Integer(), nullable=False),
+        sa.Column('sent_count', sa.Integer(), nullable=False),
+        sa.Column('failed_count', sa.Integer(), nullable=False),
+        sa.Column('runs', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('run_started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('run_start_count', sa.Integer(), nullable=False),
+        sa.Column('checkpointed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['outbox_id'], ['email_outbox.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('outbox_id')
+    )
+    op.create_index('ix_email_delivery_jobs_id', 'email_delivery_jobs', ['id'], unique=False)
+    op.create_index('ix_email_delivery_jobs_campaign_id', 'email_delivery_jobs', ['campaign_id'], unique=False)
+    op.create_index('ix_email_delivery_jobs_status', 'email_delivery_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_email_delivery_jobs_status', table_name='email_delivery_jobs')
+    op.drop_index('ix_email_delivery_jobs_campaign_id', table_name='email_delivery_jobs')
+    op.drop_index('ix_email_delivery_jobs_id', table_name='email_delivery_jobs')
+    op.drop_table('email_delivery_jobs')
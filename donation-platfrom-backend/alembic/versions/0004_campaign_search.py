@@ -0,0 +1,48 @@
+"""Full-text search vector and trigram title index on campaigns
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-07-08 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Title (A) > description (B) > content (C), stemmed with the campaign's language configuration
+SEARCH_DOCUMENT = (
+    "setweight(to_tsvector(CASE lang WHEN 'en' THEN 'english'::regconfig WHEN 'fr' THEN 'french'::regconfig WHEN 'es' THEN 'spanish'::regconfig WHEN 'ru' THEN 'russian'::regconfig WHEN 'ar' THEN 'arabic'::regconfig ELSE 'simple'::regconfig END, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector(CASE lang WHEN 'en' THEN 'english'::regconfig WHEN 'fr' THEN 'french'::regconfig WHEN 'es' THEN 'spanish'::regconfig WHEN 'ru' THEN 'russian'::regconfig WHEN 'ar' THEN 'arabic'::regconfig ELSE 'simple'::regconfig END, coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector(CASE lang WHEN 'en' THEN 'english'::regconfig WHEN 'fr' THEN 'french'::regconfig WHEN 'es' THEN 'spanish'::regconfig WHEN 'ru' THEN 'russian'::regconfig WHEN 'ar' THEN 'arabic'::regconfig ELSE 'simple'::regconfig END, coalesce(markdown_text, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        'campaigns',
+        sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_DOCUMENT, persisted=True), nullable=True)
+    )
+    op.create_index('ix_campaigns_search_vector', 'campaigns', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index(
+        'ix_campaigns_title_trgm', 'campaigns', ['title'], unique=False,
+        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pg_trgm is left installed; other database objects may rely on it
+    op.drop_index('ix_campaigns_title_trgm', table_name='campaigns')
+    op.drop_index('ix_campaigns_search_vector', table_name='campaigns')
+    op.drop_column('campaigns', 'search_vector')
@@ -0,0 +1,67 @@
+"""Indexes matched to the hot listing, donation and analytics queries
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-07-15 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COMPLETED = sa.text("payment_status = 'completed'")
+
+# (name, table, columns, extra create_index options)
+INDEXES = [
+    # Campaign listings: filter by status/lang or creator, page by (created_at, id) descending
+    ('ix_campaigns_status_lang_created', 'campaigns', ['status', 'lang', 'created_at', 'id'], {}),
+    ('ix_campaigns_creator_created', 'campaigns', ['creator_id', 'created_at', 'id'], {}),
+    ('ix_campaigns_created', 'campaigns', ['created_at', 'id'], {}),
+    ('ix_campaign_categories_category_id', 'campaign_categories', ['category_id'], {}),
+    # Foreign keys and payment gateway lookups
+    ('ix_donations_campaign_id', 'donations', ['campaign_id'], {}),
+    ('ix_donations_donor_id', 'donations', ['donor_id'], {}),
+    ('ix_donations_payment_id', 'donations', ['payment_id'], {}),
+    # Only completed donations are listed and aggregated
+    (
+        'ix_donations_campaign_completed_created', 'donations', ['campaign_id', 'created_at'],
+        {'postgresql_where': COMPLETED, 'postgresql_include': ['amount']}
+    ),
+    ('ix_donations_donor_completed_created', 'donations', ['donor_id', 'created_at'], {'postgresql_where': COMPLETED}),
+    (
+        'ix_donations_completed_created', 'donations', ['created_at'],
+        {'postgresql_where': COMPLETED, 'postgresql_include': ['amount']}
+    ),
+    # Outbox claim and newsletter blast scans
+    ('ix_email_outbox_pending', 'email_outbox', ['id'], {'postgresql_where': sa.text("status = 'pending'")}),
+    (
+        'ix_newsletter_subscriptions_active_language', 'newsletter_subscriptions', ['language', 'id'],
+        {'postgresql_where': sa.text('is_active')}
+    ),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build without blocking writes on tables that already hold data
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True, **options
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,44 @@
+"""One donation per payment: unique donations.payment_id
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-07-29 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Racing webhook/confirm calls could record a payment twice. Keep the first completed row
+    # (or the first row) and rename the payment id of the others so they stay auditable.
+    op.execute("""
+        UPDATE donations d
+        SET payment_id = d.payment_id || '#duplicate-' || d.id
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY payment_id
+                ORDER BY payment_status = 'completed' DESC, id
+            ) AS position
+            FROM donations
+            WHERE payment_id IS NOT NULL
+        ) ranked
+        WHERE d.id = ranked.id AND ranked.position > 1
+    """)
+    op.drop_index('ix_donations_payment_id', table_name='donations')
+    op.create_index('ix_donations_payment_id', 'donations', ['payment_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_donations_payment_id', table_name='donations')
+    op.create_index('ix_donations_payment_id', 'donations', ['payment_id'], unique=False)
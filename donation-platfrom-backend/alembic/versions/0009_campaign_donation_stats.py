@@ -0,0 +1,57 @@
+"""Per-campaign donation stats rollup
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2025-08-12 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'campaign_donation_stats',
+        sa.Column('campaign_id', sa.Integer(), nullable=False),
+        sa.Column('donation_count', sa.Integer(), nullable=False),
+        sa.Column('total_amount', sa.Float(), nullable=False),
+        sa.Column('donor_count', sa.Integer(), nullable=False),
+        sa.Column('last_donation_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('recent_day', sa.Date(), nullable=True),
+        sa.Column(
+            'recent_counts', postgresql.ARRAY(sa.Integer()),
+            server_default=sa.text("'{0,0,0,0,0,0,0}'::integer[]"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('campaign_id')
+    )
+    # Backfill from existing donations, as app.workers.donation_stats_reconciler does
+    recent = ", ".join(
+        f"count(id) FILTER (WHERE (created_at AT TIME ZONE 'UTC')::date = (now() AT TIME ZONE 'UTC')::date - {offset})"
+        for offset in range(7)
+    )
+    op.execute(f"""
+        INSERT INTO campaign_donation_stats
+            (campaign_id, donation_count, total_amount, donor_count, last_donation_at, recent_day, recent_counts)
+        SELECT campaign_id, count(id), sum(amount), count(DISTINCT donor_id), max(created_at),
+               (now() AT TIME ZONE 'UTC')::date, ARRAY[{recent}]
+        FROM donations
+        WHERE payment_status = 'completed'
+        GROUP BY campaign_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('campaign_donation_stats')
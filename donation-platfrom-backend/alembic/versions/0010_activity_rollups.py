@@ -0,0 +1,57 @@
+"""Hourly, daily and monthly donation and signup rollups
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2025-08-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'activity_rollups',
+        sa.Column('granularity', sa.String(length=5), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('donation_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('donation_amount', sa.Float(), server_default=sa.text('0'), nullable=False),
+        sa.Column('donor_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('new_users', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.PrimaryKeyConstraint('granularity', 'bucket_start')
+    )
+    # Backfill from existing donations and users, as app.workers.activity_rollup_backfill does
+    op.execute("""
+        INSERT INTO activity_rollups (granularity, bucket_start, donation_count, donation_amount, donor_count, new_users)
+        SELECT coalesce(d.granularity, u.granularity), coalesce(d.bucket_start, u.bucket_start),
+               coalesce(d.donation_count, 0), coalesce(d.donation_amount, 0), coalesce(d.donor_count, 0),
+               coalesce(u.new_users, 0)
+        FROM (
+            SELECT g.granularity, date_trunc(g.granularity, created_at, 'UTC') AS bucket_start,
+                   count(id) AS donation_count, sum(amount) AS donation_amount,
+                   count(DISTINCT donor_id) AS donor_count
+            FROM donations CROSS JOIN (VALUES ('day'), ('hour'), ('month')) AS g (granularity)
+            WHERE payment_status = 'completed'
+            GROUP BY 1, 2
+        ) d
+        FULL JOIN (
+            SELECT g.granularity, date_trunc(g.granularity, created_at, 'UTC') AS bucket_start, count(id) AS new_users
+            FROM users CROSS JOIN (VALUES ('day'), ('hour'), ('month')) AS g (granularity)
+            GROUP BY 1, 2
+        ) u ON u.granularity = d.granularity AND u.bucket_start = d.bucket_start
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('activity_rollups')
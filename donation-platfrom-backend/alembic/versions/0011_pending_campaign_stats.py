@@ -0,0 +1,43 @@
+"""Donations waiting to be folded into campaign stats when totals are sharded
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2025-08-26 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'pending_campaign_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('donation_id', sa.Integer(), nullable=False),
+        sa.Column('campaign_id', sa.Integer(), nullable=False),
+        sa.Column('donor_id', sa.Integer(), nullable=True),
+        sa.Column('donor_only', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+        sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['donation_id'], ['donations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['donor_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pending_campaign_stats_campaign_id'), 'pending_campaign_stats', ['campaign_id'], unique=False)
+    op.create_index(op.f('ix_pending_campaign_stats_donation_id'), 'pending_campaign_stats', ['donation_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_pending_campaign_stats_donation_id'), table_name='pending_campaign_stats')
+    op.drop_index(op.f('ix_pending_campaign_stats_campaign_id'), table_name='pending_campaign_stats')
+    op.drop_table('pending_campaign_stats')
@@ -0,0 +1,43 @@
+"""Donations and users waiting to be folded into the activity rollups
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2025-08-27 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'pending_activity',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('donation_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('donor_id', sa.Integer(), nullable=True),
+        sa.Column('donor_only', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+        sa.ForeignKeyConstraint(['donation_id'], ['donations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['donor_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pending_activity_donation_id'), 'pending_activity', ['donation_id'], unique=False)
+    op.create_index(op.f('ix_pending_activity_user_id'), 'pending_activity', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_pending_activity_user_id'), table_name='pending_activity')
+    op.drop_index(op.f('ix_pending_activity_donation_id'), table_name='pending_activity')
+    op.drop_table('pending_activity')
@@ -0,0 +1,42 @@
+"""Lease outbox entries to a dispatcher instead of locking them for the whole send
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2025-08-28 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('email_outbox', sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True))
+    # Entries whose dispatcher died are due again once their lease passes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_email_outbox_due', 'email_outbox', ['id'], unique=False,
+            postgresql_where=sa.text("status IN ('pending', 'processing')"), postgresql_concurrently=True
+        )
+        op.drop_index('ix_email_outbox_pending', table_name='email_outbox', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("UPDATE email_outbox SET status = 'pending' WHERE status = 'processing'")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_email_outbox_pending', 'email_outbox', ['id'], unique=False,
+            postgresql_where=sa.text("status = 'pending'"), postgresql_concurrently=True
+        )
+        op.drop_index('ix_email_outbox_due', table_name='email_outbox', postgresql_concurrently=True)
+    op.drop_column('email_outbox', 'locked_until')
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import status as http_status
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from app.db.database import get_db
+from app.db.database import get_async_db
 from app.db.models.user import User
 from app.db.models.campaign import CampaignStatus
 from app.schemas.campaign import (
@@ -10,7 +11,10 @@ from app.schemas.campaign import (
     CampaignUpdate, 
     CampaignResponse,
     CampaignDetailResponse,
-    PaginatedCampaignsResponse
+    PaginatedAdminCampaignsResponse,
+    PaginatedCampaignListResponse,
+    CampaignListItem,
+    CampaignSuggestion
 )
 from app.services.campaign_service import (
     create_campaign,
@@ -21,7 +25,10 @@ from app.services.campaign_service import (
     get_campaigns_by_creator_paginated,
     update_campaign,
     delete_campaign,
-    search_campaigns
+    search_campaigns,
+    suggest_campaigns,
+    resolve_fields,
+    CAMPAIGN_CARD_FIELDS
 )
 from app.services.storage_service import storage_service
 from app.auth.jwt import get_current_user
@@ -39,7 +46,7 @@ async def create_new_campaign(
     campaign_status: Optional[str] = Form("draft"),
     lang: str = Form("en", description="Language code (e.g., en, ar, fr, ru)"),
     image: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -124,12 +131,12 @@ async def create_new_campaign(
         lang=lang
     )
     
-    return create_campaign(db, campaign_data, current_user.id)
+    return await create_campaign(db, campaign_data, current_user.id)
 
 @router.post("/json", response_model=CampaignResponse, status_code=status.HTTP_201_CREATED)
 async def create_campaign_json(
     campaign_data: CampaignCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -141,20 +148,20 @@ async def create_campaign_json(
     if not current_user.is_admin and campaign_data.status != CampaignStatus.DRAFT:
         campaign_data.status = CampaignStatus.PENDING
         
-    return create_campaign(db, campaign_data, current_user.id)
+    return await create_campaign(db, campaign_data, current_user.id)
 
 @router.post("/{campaign_id}/upload-image")
 async def upload_campaign_image(
     campaign_id: int,
     image: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Upload or update the image for an existing campaign.
     This endpoint requires authentication and the user must be the campaign creator.
     """
-    existing_campaign = get_campaign_by_id(db, campaign_id)
+    existing_campaign = await get_campaign_by_id(db, campaign_id)
     
     if not existing_campaign:
         raise HTTPException(
@@ -178,7 +185,7 @@ async def upload_campaign_image(
     
     # Update campaign with new image path
     campaign_update = CampaignUpdate(image_path=image_path)
-    updated_campaign = update_campaign(db, campaign_id, campaign_update)
+    updated_campaign = await update_campaign(db, campaign_id, campaign_update)
     
     return {
         "message": "Image uploaded successfully",
@@ -186,13 +193,16 @@ async def upload_campaign_image(
         "image_url": storage_service.get_image_url(image_path)
     }
 
-@router.get("/paginated", response_model=PaginatedCampaignsResponse)
+@router.get("/paginated", response_model=PaginatedCampaignListResponse, response_model_exclude_unset=True)
 async def read_campaigns_paginated(
     page: int = Query(1, ge=1, description="Page number (1-based)"),
     page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
     status: Optional[CampaignStatus] = Query(None, description="Filter by campaign status"),
     lang: Optional[str] = Query(None, description="Filter by language code (e.g., en, ar, fr, ru)"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from pagination.next_cursor; pages by keyset instead of page number"),
+    include_total: Optional[bool] = Query(None, description="Compute total_items/total_pages (default: true for page numbers, false with a cursor)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. title,current_amount,categories); defaults to all fields"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve campaigns with proper pagination metadata and optional language filtering.
@@ -201,41 +211,67 @@ async def read_campaigns_paginated(
     - Total pages and items
     - Next/Previous page numbers
     - Navigation flags
+    - next_cursor for keyset paging (pass it back as `cursor`)
     """
-    campaigns, pagination = get_campaigns_paginated(db, page, page_size, status, lang)
+    try:
+        selected = resolve_fields(fields)
+        campaigns, pagination = await get_campaigns_paginated(
+            db, page, page_size, status, lang, cursor, include_total, fields=selected
+        )
+    except ValueError as e:
+        # `status` is shadowed by the query parameter here
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    return PaginatedCampaignsResponse(
-        items=campaigns,
+    return PaginatedCampaignListResponse(
+        items=[CampaignListItem.from_campaign(campaign, selected) for campaign in campaigns],
         pagination=pagination
     )
 
-@router.get("/search", response_model=PaginatedCampaignsResponse)
+@router.get("/search", response_model=PaginatedCampaignListResponse, response_model_exclude_unset=True)
 async def search_campaigns_endpoint(
     keyword: str = Query(..., description="Search keyword to find matching campaigns"),
     page: int = Query(1, ge=1, description="Page number (1-based)"),
     page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
     status: Optional[CampaignStatus] = Query(None, description="Filter by campaign status"),
     lang: Optional[str] = Query(None, description="Filter by language code (e.g., en, ar, fr, ru)"),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. title,current_amount,categories); defaults to all fields"),
+    include_total: bool = Query(True, description="Count all matches for total_items/total_pages"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Search campaigns by keyword with proper pagination metadata and optional language filtering.
-    This endpoint performs a search across campaign titles, descriptions, and content,
-    returning campaigns that match the provided keyword and language.
+    This endpoint performs a full-text search across campaign titles, descriptions, and content
+    using each campaign's language, returning the best matches first with a highlighted snippet.
+    The keyword supports web search syntax ("quoted phrases", or, -excluded).
     """
-    campaigns, pagination = search_campaigns(db, keyword, page, page_size, status, lang)
+    try:
+        selected = resolve_fields(fields)
+    except ValueError as e:
+        # `status` is shadowed by the query parameter here
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    return PaginatedCampaignsResponse(
-        items=campaigns,
+    campaigns, pagination = await search_campaigns(db, keyword, page, page_size, status, lang, selected, include_total)
+    
+    return PaginatedCampaignListResponse(
+        items=[CampaignListItem.from_search_result(campaign, selected) for campaign in campaigns],
         pagination=pagination
     )
 
-@router.get("/me/paginated", response_model=PaginatedCampaignsResponse)
+@router.get("/me/paginated", response_model=PaginatedCampaignListResponse, response_model_exclude_unset=True)
 async def read_my_campaigns_paginated(
     page: int = Query(1, ge=1, description="Page number (1-based)"),
     page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
     lang: Optional[str] = Query(None, description="Filter by language code (e.g., en, ar, fr, ru)"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from pagination.next_cursor; pages by keyset instead of page number"),
+    include_total: Optional[bool] = Query(None, description="Compute total_items/total_pages (default: true for page numbers, false with a cursor)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. title,current_amount,categories); defaults to all fields"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -243,10 +279,19 @@ async def read_my_campaigns_paginated(
     This endpoint requires authentication and returns paginated results
     with frontend-friendly metadata.
     """
-    campaigns, pagination = get_campaigns_by_creator_paginated(db, current_user.id, page, page_size, lang)
+    try:
+        selected = resolve_fields(fields)
+        campaigns, pagination = await get_campaigns_by_creator_paginated(
+            db, current_user.id, page, page_size, lang, cursor, include_total, selected
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    return PaginatedCampaignsResponse(
-        items=campaigns,
+    return PaginatedCampaignListResponse(
+        items=[CampaignListItem.from_campaign(campaign, selected) for campaign in campaigns],
         pagination=pagination
     )
 
@@ -256,54 +301,67 @@ async def read_campaigns(
     limit: int = 100,
     status: Optional[CampaignStatus] = None,
     lang: Optional[str] = Query(None, description="Filter by language code (e.g., en, ar, fr, ru)"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve all campaigns with optional status and language filter (legacy endpoint).
     For better frontend support, use /paginated endpoint instead.
     """
-    return get_campaigns(db, skip, limit, status, lang)
+    return await get_campaigns(db, skip, limit, status, lang)
 
 @router.get("/me", response_model=List[CampaignResponse])
 async def read_my_campaigns(
     skip: int = 0,
     limit: int = 100,
     lang: Optional[str] = Query(None, description="Filter by language code (e.g., en, ar, fr, ru)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Retrieve all campaigns created by the authenticated user with optional language filtering.
     This endpoint requires authentication.
     """
-    return get_campaigns_by_creator(db, current_user.id, skip, limit, lang)
+    return await get_campaigns_by_creator(db, current_user.id, skip, limit, lang)
 
-@router.get("/public", response_model=PaginatedCampaignsResponse)
+@router.get("/public", response_model=PaginatedCampaignListResponse, response_model_exclude_unset=True)
 async def read_public_campaigns_paginated(
     page: int = Query(1, ge=1, description="Page number (1-based)"),
     page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
     lang: Optional[str] = Query(None, description="Filter by language code (e.g., en, ar, fr, ru)"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from pagination.next_cursor; pages by keyset instead of page number"),
+    include_total: Optional[bool] = Query(None, description="Compute total_items/total_pages (default: true for page numbers, false with a cursor)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. title,current_amount,categories); defaults to the card fields, without markdown_text"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve only active campaigns that have been approved by admins with optional language filtering.
-    This endpoint is meant for public display on the home page.
+    This endpoint is meant for public display on the home page; infinite scroll should
+    follow pagination.next_cursor instead of page numbers.
     """
     # Enforce ACTIVE status for public display
-    campaigns, pagination = get_campaigns_paginated(db, page, page_size, CampaignStatus.ACTIVE, lang)
+    try:
+        selected = resolve_fields(fields, CAMPAIGN_CARD_FIELDS)
+        campaigns, pagination = await get_campaigns_paginated(
+            db, page, page_size, CampaignStatus.ACTIVE, lang, cursor, include_total, fields=selected
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    return PaginatedCampaignsResponse(
-        items=campaigns,
+    return PaginatedCampaignListResponse(
+        items=[CampaignListItem.from_campaign(campaign, selected) for campaign in campaigns],
         pagination=pagination
     )
 
-@router.get("/admin/paginated", response_model=PaginatedCampaignsResponse)
+@router.get("/admin/paginated", response_model=PaginatedAdminCampaignsResponse)
 async def read_admin_campaigns_paginated(
     page: int = Query(1, ge=1, description="Page number (1-based)"),
     page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
     status: Optional[CampaignStatus] = Query(None, description="Filter by campaign status"),
     lang: Optional[str] = Query(None, description="Filter by language code (e.g., en, ar, fr, ru). If not provided, shows all languages"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -314,27 +372,66 @@ async def read_admin_campaigns_paginated(
     # Check if user is admin
     if not current_user.is_admin:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
+            status_code=http_status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
         )
     
     # Note: We pass lang=None by default to show all languages for admin
-    campaigns, pagination = get_campaigns_paginated(db, page, page_size, status, lang)
+    campaigns, pagination = await get_campaigns_paginated(db, page, page_size, status, lang, with_creator=True)
     
-    return PaginatedCampaignsResponse(
+    return PaginatedAdminCampaignsResponse(
         items=campaigns,
         pagination=pagination
     )
 
+@router.get("/featured", response_model=List[CampaignListItem], response_model_exclude_unset=True)
+async def read_featured_campaigns(
+    lang: Optional[str] = Query(None, description="Filter by language code (e.g., en, ar, fr, ru)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. title,current_amount,categories); defaults to the card fields, without markdown_text"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Retrieve the first 3 active campaigns for featured display.
+    This endpoint returns campaigns that have been approved by admins.
+    """
+    try:
+        selected = resolve_fields(fields, CAMPAIGN_CARD_FIELDS)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    # Get campaigns with pagination, limit to 3
+    campaigns, _ = await get_campaigns_paginated(
+        db, page=1, page_size=3, status=CampaignStatus.ACTIVE, lang=lang, include_total=False, fields=selected
+    )
+    
+    return [CampaignListItem.from_campaign(campaign, selected) for campaign in campaigns]
+
+@router.get("/suggest", response_model=List[CampaignSuggestion])
+async def suggest_campaigns_endpoint(
+    q: str = Query(..., min_length=1, max_length=100, description="What the user has typed so far"),
+    lang: Optional[str] = Query(None, description="Filter by language code (e.g., en, ar, fr, ru)"),
+    limit: int = Query(8, ge=1, le=20, description="Maximum number of suggestions"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Suggest active campaign titles for search-as-you-type.
+    Prefix matches come first, followed by fuzzy matches that tolerate typos.
+    Returns only id and title so it is cheap enough to call on every keystroke.
+    """
+    return await suggest_campaigns(db, q, lang, limit)
+
 @router.get("/{campaign_id}", response_model=CampaignDetailResponse)
 async def read_campaign(
     campaign_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve a specific campaign by ID.
     """
-    campaign = get_campaign_by_id(db, campaign_id)
+    campaign = await get_campaign_by_id(db, campaign_id)
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -346,14 +443,14 @@ async def read_campaign(
 async def update_campaign_details(
     campaign_id: int,
     campaign_data: CampaignUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Update a campaign.
     This endpoint requires authentication and the user must be the campaign creator or an admin.
     """
-    existing_campaign = get_campaign_by_id(db, campaign_id)
+    existing_campaign = await get_campaign_by_id(db, campaign_id)
     
     if not existing_campaign:
         raise HTTPException(
@@ -368,20 +465,20 @@ async def update_campaign_details(
             detail="Not enough permissions to update this campaign"
         )
     
-    updated_campaign = update_campaign(db, campaign_id, campaign_data)
+    updated_campaign = await update_campaign(db, campaign_id, campaign_data)
     return updated_campaign
 
 @router.delete("/{campaign_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_campaign_endpoint(
     campaign_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Delete a campaign.
     This endpoint requires authentication and the user must be the campaign creator or an admin.
     """
-    existing_campaign = get_campaign_by_id(db, campaign_id)
+    existing_campaign = await get_campaign_by_id(db, campaign_id)
     
     if not existing_campaign:
         raise HTTPException(
@@ -396,7 +493,7 @@ async def delete_campaign_endpoint(
             detail="Not enough permissions to delete this campaign"
         )
     
-    delete_result = delete_campaign(db, campaign_id)
+    delete_result = await delete_campaign(db, campaign_id)
     
     if not delete_result:
         raise HTTPException(
@@ -405,17 +502,3 @@ async def delete_campaign_endpoint(
         )
     
     return None
-
-@router.get("/featured", response_model=List[CampaignResponse])
-async def read_featured_campaigns(
-    lang: Optional[str] = Query(None, description="Filter by language code (e.g., en, ar, fr, ru)"),
-    db: Session = Depends(get_db)
-):
-    """
-    Retrieve the first 3 active campaigns for featured display.
-    This endpoint returns campaigns that have been approved by admins.
-    """
-    # Get campaigns with pagination, limit to 3
-    campaigns, _ = get_campaigns_paginated(db, page=1, page_size=3, status=CampaignStatus.ACTIVE, lang=lang)
-    
-    return campaigns
\ No newline at end of file
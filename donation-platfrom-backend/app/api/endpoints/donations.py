@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
-from app.db.database import get_db
+from app.db.database import get_async_db
 from app.services.payment_service import PaymentService
-from app.schemas.donation import DonationCreate, PaymentIntentResponse, DonationResponse, DonationStats
-from app.db.models import User, Donation, Campaign
+from app.services.donation_stats_service import get_campaign_stats, parse_campaign_ids
+from app.services.webhook_service import DONATION_EVENTS, enqueue_webhook_event
+from app.schemas.donation import (
+    DonationCreate, PaymentIntentResponse, DonationResponse, DonationStats, CampaignDonationStatsItem
+)
+from app.db.models import User, Donation, Campaign, CampaignDonationStats
 from app.api.deps import get_current_user_optional, get_current_user
 import logging
 
@@ -14,13 +19,13 @@ logger = logging.getLogger(__name__)
 @router.post("/create-payment-intent", response_model=PaymentIntentResponse)
 async def create_payment_intent(
     donation_data: DonationCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Optional[User] = Depends(get_current_user_optional)
 ):
     """Create Stripe Payment Intent for donation"""
     try:
         # Verify campaign exists and is active
-        campaign = db.query(Campaign).filter(Campaign.id == donation_data.campaign_id).first()
+        campaign = await db.get(Campaign, donation_data.campaign_id)
         if not campaign:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -60,7 +65,7 @@ async def create_payment_intent(
 @router.post("/confirm-payment/{payment_intent_id}")
 async def confirm_payment(
     payment_intent_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Optional[User] = Depends(get_current_user_optional)
 ):
     """Confirm payment and create donation record"""
@@ -89,72 +94,72 @@ async def confirm_payment(
 @router.get("/campaign/{campaign_id}", response_model=List[DonationResponse])
 async def get_campaign_donations(
     campaign_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 50
 ):
     """Get donations for a specific campaign (non-anonymous only)"""
-    donations = db.query(Donation).filter(
-        Donation.campaign_id == campaign_id,
-        Donation.payment_status == "completed",
-        Donation.is_anonymous == False
-    ).offset(skip).limit(limit).all()
+    result = await db.execute(
+        select(Donation).where(
+            Donation.campaign_id == campaign_id,
+            Donation.payment_status == "completed",
+            Donation.is_anonymous == False
+        ).offset(skip).limit(limit)
+    )
+    
+    return result.scalars().all()
+
+@router.get("/stats", response_model=List[CampaignDonationStatsItem])
+async def get_donation_stats_batch(
+    campaign_ids: str = Query(..., description="Comma-separated campaign ids (at most 100), e.g. 1,2,3"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get donation statistics for several campaigns at once, in the order requested"""
+    try:
+        ids = parse_campaign_ids(campaign_ids)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    return donations
+    # One SELECT ... WHERE campaign_id IN (...) for the whole grid instead of a request per card
+    stats = await get_campaign_stats(db, ids)
+    return [
+        CampaignDonationStatsItem.from_rollup(stats.get(campaign_id), campaign_id=campaign_id)
+        for campaign_id in ids
+    ]
 
 @router.get("/stats/{campaign_id}", response_model=DonationStats)
 async def get_campaign_donation_stats(
     campaign_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get donation statistics for a campaign"""
-    from sqlalchemy import func
-    
-    # Get donation statistics
-    stats = db.query(
-        func.count(Donation.id).label('total_donations'),
-        func.sum(Donation.amount).label('total_amount'),
-        func.avg(Donation.amount).label('average_donation')
-    ).filter(
-        Donation.campaign_id == campaign_id,
-        Donation.payment_status == "completed"
-    ).first()
-    
-    # Get recent donations (last 7 days)
-    from datetime import datetime, timedelta
-    recent_date = datetime.utcnow() - timedelta(days=7)
-    recent_donations = db.query(func.count(Donation.id)).filter(
-        Donation.campaign_id == campaign_id,
-        Donation.payment_status == "completed",
-        Donation.created_at >= recent_date
-    ).scalar()
-    
-    return DonationStats(
-        total_donations=stats.total_donations or 0,
-        total_amount=float(stats.total_amount or 0),
-        average_donation=float(stats.average_donation or 0),
-        recent_donations=recent_donations or 0
-    )
+    # Running totals kept by the donation ingestion path; one primary-key lookup
+    return DonationStats.from_rollup(await db.get(CampaignDonationStats, campaign_id))
 
 @router.get("/my-donations", response_model=List[DonationResponse])
 async def get_my_donations(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     skip: int = 0,
     limit: int = 50
 ):
     """Get current user's donations"""
-    donations = db.query(Donation).filter(
-        Donation.donor_id == current_user.id,
-        Donation.payment_status == "completed"
-    ).offset(skip).limit(limit).all()
+    result = await db.execute(
+        select(Donation).where(
+            Donation.donor_id == current_user.id,
+            Donation.payment_status == "completed"
+        ).offset(skip).limit(limit)
+    )
     
-    return donations
+    return result.scalars().all()
 
 @router.post("/webhook")
 async def stripe_webhook(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Handle Stripe webhooks for payment events"""
     try:
@@ -167,22 +172,11 @@ async def stripe_webhook(
         # Verify webhook signature
         event = PaymentService.verify_webhook_signature(payload, sig_header)
         
-        # Handle different event types
-        if event['type'] == 'payment_intent.succeeded':
-            payment_intent = event['data']['object']
-            await PaymentService.handle_payment_success(
-                db=db,
-                payment_intent_id=payment_intent['id']
-            )
-            logger.info(f"Webhook: Payment succeeded for {payment_intent['id']}")
-            
-        elif event['type'] == 'payment_intent.payment_failed':
-            payment_intent = event['data']['object']
-            await PaymentService.handle_payment_failure(
-                db=db,
-                payment_intent_id=payment_intent['id']
-            )
-            logger.info(f"Webhook: Payment failed for {payment_intent['id']}")
+        # Queue the signed payload and acknowledge right away; app.workers.webhook_processor
+        # records the donations in batches
+        if event['type'] in DONATION_EVENTS:
+            if not await enqueue_webhook_event(db, event):
+                logger.info(f"Webhook: {event['id']} already queued")
             
         return {"status": "success"}
         
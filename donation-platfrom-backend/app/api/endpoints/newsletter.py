@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.db.database import get_db
+from app.db.database import get_async_db
 from app.schemas.newsletter import (
     NewsletterSubscriptionCreate,
     NewsletterSubscriptionResponse,
     NewsletterUnsubscribeRequest,
-    NewsletterStats
+    NewsletterStats,
+    EmailDeliveryJobResponse
 )
 from app.services.newsletter_service import (
     subscribe_to_newsletter,
@@ -15,9 +16,12 @@ from app.services.newsletter_service import (
     get_newsletter_subscription,
     get_newsletter_stats,
     get_subscribers_paginated,
-    get_active_subscribers
+    count_active_subscribers,
+    count_active_subscribers_by_language
 )
+from app.services.delivery_job_service import get_delivery_jobs, get_delivery_job
 from app.auth.jwt import get_current_user
+from app.auth.unsubscribe import verify_unsubscribe_token
 from app.db.models.user import User
 
 router = APIRouter(tags=["newsletter"])
@@ -25,14 +29,14 @@ router = APIRouter(tags=["newsletter"])
 @router.post("/subscribe", response_model=NewsletterSubscriptionResponse)
 async def subscribe_newsletter(
     subscription_data: NewsletterSubscriptionCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Subscribe to newsletter."""
-    subscription = subscribe_to_newsletter(db, subscription_data)
+    subscription = await subscribe_to_newsletter(db, subscription_data)
     
     if subscription is None:
         # Email already subscribed and active
-        existing = get_newsletter_subscription(db, subscription_data.email)
+        existing = await get_newsletter_subscription(db, subscription_data.email)
         if existing and existing.is_active:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -50,10 +54,25 @@ async def subscribe_newsletter(
 @router.post("/unsubscribe")
 async def unsubscribe_newsletter(
     unsubscribe_data: NewsletterUnsubscribeRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Unsubscribe from newsletter."""
-    success = unsubscribe_from_newsletter(db, unsubscribe_data.email)
+    """Unsubscribe from newsletter by email or by the signed token from an email link."""
+    email = unsubscribe_data.email
+    if unsubscribe_data.token:
+        email = verify_unsubscribe_token(unsubscribe_data.token)
+        if email is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid unsubscribe link"
+            )
+    
+    if not email:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Either email or token is required"
+        )
+    
+    success = await unsubscribe_from_newsletter(db, email)
     
     if not success:
         raise HTTPException(
@@ -66,10 +85,10 @@ async def unsubscribe_newsletter(
 @router.get("/subscription/{email}", response_model=NewsletterSubscriptionResponse)
 async def get_subscription_status(
     email: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get subscription status for an email."""
-    subscription = get_newsletter_subscription(db, email)
+    subscription = await get_newsletter_subscription(db, email)
     
     if not subscription:
         raise HTTPException(
@@ -81,7 +100,7 @@ async def get_subscription_status(
 
 @router.get("/stats", response_model=NewsletterStats)
 async def get_newsletter_statistics(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get newsletter statistics (admin only)."""
@@ -91,13 +110,13 @@ async def get_newsletter_statistics(
             detail="Only administrators can access newsletter statistics"
         )
     
-    return get_newsletter_stats(db)
+    return await get_newsletter_stats(db)
 
 @router.get("/subscribers", response_model=List[NewsletterSubscriptionResponse])
 async def get_newsletter_subscribers(
     page: int = 1,
     page_size: int = 50,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get newsletter subscribers (admin only)."""
@@ -110,12 +129,53 @@ async def get_newsletter_subscribers(
     if page_size > 100:
         page_size = 100  # Limit page size
     
-    subscribers = get_subscribers_paginated(db, page, page_size)
+    subscribers = await get_subscribers_paginated(db, page, page_size)
     return subscribers
 
+@router.get("/delivery-jobs", response_model=List[EmailDeliveryJobResponse])
+async def list_delivery_jobs(
+    page: int = 1,
+    page_size: int = 20,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get newsletter delivery jobs with progress and ETA (admin only)."""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can access delivery jobs"
+        )
+    
+    if page_size > 100:
+        page_size = 100  # Limit page size
+    
+    return await get_delivery_jobs(db, page, page_size)
+
+@router.get("/delivery-jobs/{job_id}", response_model=EmailDeliveryJobResponse)
+async def get_delivery_job_progress(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get progress and ETA of a newsletter delivery job (admin only)."""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can access delivery jobs"
+        )
+    
+    job = await get_delivery_job(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Delivery job not found"
+        )
+    
+    return job
+
 @router.post("/test-email")
 async def test_email_notification(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Test email notification system (admin only)."""
@@ -126,14 +186,15 @@ async def test_email_notification(
         )
     
     try:
-        from app.services.email_service import email_service
+        from app.services.outbox_service import enqueue_campaign_notification
         from app.db.models.campaign import Campaign
         from datetime import datetime, timedelta
         
-        # Get active subscribers
-        subscribers = get_active_subscribers(db)
+        # Count active subscribers
+        subscribers_by_language = await count_active_subscribers_by_language(db)
+        subscriber_count = sum(subscribers_by_language.values())
         
-        if not subscribers:
+        if not subscriber_count:
             return {"message": "No newsletter subscribers found. Subscribe first to test emails."}
         
         # Create a mock campaign for testing
@@ -149,15 +210,16 @@ async def test_email_notification(
         
         print(f"🧪 Testing email notification system...")
         print(f"   Admin: {current_user.email}")
-        print(f"   Subscribers found: {len(subscribers)}")
+        print(f"   Subscribers found: {subscriber_count}")
         
-        # Send test notification
-        email_service.send_new_campaign_notification(db, mock_campaign)
+        # Queue test notification for the email dispatcher
+        enqueue_campaign_notification(db, "new_campaign", mock_campaign, persisted=False)
+        await db.commit()
         
         return {
-            "message": f"Test email notification triggered for {len(subscribers)} subscribers",
-            "subscribers": len(subscribers),
-            "emails": [sub.email for sub in subscribers],
+            "message": f"Test email notification queued for {subscriber_count} subscribers",
+            "subscribers": subscriber_count,
+            "subscribers_by_language": subscribers_by_language,
             "test_campaign": {
                 "title": mock_campaign.title,
                 "description": mock_campaign.description
@@ -173,7 +235,7 @@ async def test_email_notification(
 
 @router.post("/test-campaign")
 async def create_test_campaign(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a real test campaign to trigger email notifications (admin only)."""
@@ -202,19 +264,19 @@ async def create_test_campaign(
         )
         
         # Create the campaign (this will trigger the email notification)
-        campaign = create_campaign(db, campaign_data, current_user.id)
+        campaign = await create_campaign(db, campaign_data, current_user.id)
         
         # Get subscriber count
-        subscribers = get_active_subscribers(db)
+        subscriber_count = await count_active_subscribers(db)
         
         return {
-            "message": f"Test campaign created successfully! Email notifications sent to {len(subscribers)} subscribers.",
+            "message": f"Test campaign created successfully! Email notifications queued for {subscriber_count} subscribers.",
             "campaign": {
                 "id": campaign.id,
                 "title": campaign.title,
                 "status": campaign.status
             },
-            "subscribers_notified": len(subscribers)
+            "subscribers_notified": subscriber_count
         }
         
     except Exception as e:
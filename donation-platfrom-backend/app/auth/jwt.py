@@ -4,10 +4,10 @@ from typing import Optional
 from jose import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.db.database import get_db
+from app.db.database import get_async_db
 from app.db.models.user import User
 
 # OAuth2 scheme for token extraction from request - updated for proper Swagger integration
@@ -36,7 +36,7 @@ def verify_token(token: str):
     except jwt.JWTError:
         return None
         
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_async_db)):
     """Get the current user from the token."""
     # Extract token from credentials
     token = credentials.credentials
@@ -60,7 +60,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         )
         
     # Get user from database
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.get(User, int(user_id))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, 
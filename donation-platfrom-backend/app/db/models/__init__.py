@@ -3,4 +3,10 @@ from app.db.models.campaign import Campaign, CampaignStatus
 from app.db.models.donation import Donation
 from app.db.models.category import Category
 from app.db.models.newsletter import NewsletterSubscription
+from app.db.models.outbox import EmailOutbox
+from app.db.models.delivery_job import EmailDeliveryJob
+from app.db.models.amount_shard import CampaignAmountShard
+from app.db.models.donation_stats import CampaignDonationStats, PendingCampaignStats
+from app.db.models.activity_rollup import ActivityRollup, PendingActivity
+from app.db.models.webhook_event import WebhookEvent
 from app.db.models.association import campaign_categories
\ No newline at end of file
@@ -0,0 +1,37 @@
+from sqlalchemy import Boolean, Column, Integer, Float, String, DateTime, ForeignKey, text
+
+from app.db.database import Base
+
+# Bucket sizes, as date_trunc fields
+GRANULARITIES = ("day", "hour", "month")
+
+class ActivityRollup(Base):
+    """Completed donations and new users per UTC hour, day and month, for the dashboard charts.
+
+    Folded in from pending_activity by `python -m app.workers.activity_rollup_folder`; rebuild
+    it from the raw tables with `python -m app.workers.activity_rollup_backfill`.
+    """
+    __tablename__ = "activity_rollups"
+
+    granularity = Column(String(5), primary_key=True)  # hour, day or month
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)  # date_trunc(granularity, ..., 'UTC')
+    donation_count = Column(Integer, nullable=False, server_default=text("0"))
+    donation_amount = Column(Float, nullable=False, server_default=text("0"))
+    donor_count = Column(Integer, nullable=False, server_default=text("0"))  # Distinct signed-in donors
+    new_users = Column(Integer, nullable=False, server_default=text("0"))
+
+class PendingActivity(Base):
+    """A completed donation or a new user not yet counted in the activity rollups.
+
+    Written by the transaction that records the donation or user, so no request ever locks
+    the shared time buckets; the folder counts the rows in id order.
+    """
+    __tablename__ = "pending_activity"
+
+    id = Column(Integer, primary_key=True)
+    donation_id = Column(Integer, ForeignKey("donations.id", ondelete="CASCADE"), nullable=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True)  # A signup
+    # The donor as of queueing, so an attribution racing a fold is never missed
+    donor_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    # Counted already; only its donor, attributed after the fact, is pending
+    donor_only = Column(Boolean, nullable=False, server_default=text("false"))
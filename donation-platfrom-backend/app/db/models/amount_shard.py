@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, SmallInteger, Float, ForeignKey
+
+from app.db.database import Base
+
+class CampaignAmountShard(Base):
+    """Part of a campaign's donation total not yet folded into campaigns.current_amount.
+
+    Used when CAMPAIGN_AMOUNT_SHARDS is set: donations add to a random shard row instead of
+    all updating the campaign row, and the shards are folded back into the campaign total.
+    """
+    __tablename__ = "campaign_amount_shards"
+
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(SmallInteger, primary_key=True)
+    amount = Column(Float, default=0.0, nullable=False)
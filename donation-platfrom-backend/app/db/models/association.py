@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Table
+from sqlalchemy import Column, Integer, ForeignKey, Table, Index
 from app.db.database import Base
 
 # Association table for many-to-many relationship between campaigns and categories
@@ -6,5 +6,7 @@ campaign_categories = Table(
     'campaign_categories',
     Base.metadata,
     Column('campaign_id', Integer, ForeignKey('campaigns.id'), primary_key=True),
-    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True)
+    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True),
+    # The primary key covers lookups by campaign; this one covers lookups by category
+    Index('ix_campaign_categories_category_id', 'category_id')
 )
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Enum, Computed, Index, DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred, query_expression
 import enum
 
 from app.db.database import Base
@@ -13,8 +14,37 @@ class CampaignStatus(str, enum.Enum):
     COMPLETED = "completed"
     CANCELLED = "cancelled"
 
+# Postgres text search configuration per campaign language; anything else uses "simple"
+SEARCH_CONFIGS = {
+    "en": "english",
+    "fr": "french",
+    "es": "spanish",
+    "ru": "russian",
+    "ar": "arabic",
+}
+
+def search_config_sql(lang_column: str = "lang") -> str:
+    """SQL expression picking the text search configuration for a language column."""
+    cases = " ".join(f"WHEN '{lang}' THEN '{config}'::regconfig" for lang, config in SEARCH_CONFIGS.items())
+    return f"CASE {lang_column} {cases} ELSE 'simple'::regconfig END"
+
+_SEARCH_DOCUMENT = (
+    f"setweight(to_tsvector({search_config_sql()}, coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector({search_config_sql()}, coalesce(description, '')), 'B') || "
+    f"setweight(to_tsvector({search_config_sql()}, coalesce(markdown_text, '')), 'C')"
+)
+
 class Campaign(Base):
     __tablename__ = "campaigns"
+    __table_args__ = (
+        Index("ix_campaigns_search_vector", "search_vector", postgresql_using="gin"),
+        # Trigram index for fuzzy title suggestions (pg_trgm)
+        Index("ix_campaigns_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        # Listings filter by status/lang/creator and page by (created_at, id) descending
+        Index("ix_campaigns_status_lang_created", "status", "lang", "created_at", "id"),
+        Index("ix_campaigns_creator_created", "creator_id", "created_at", "id"),
+        Index("ix_campaigns_created", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
@@ -32,9 +62,23 @@ class Campaign(Base):
     creator_id = Column(Integer, ForeignKey("users.id"))
     
     # Relationships
-    creator = relationship("User", backref="campaigns")
+    # Serialized relationships must be eager-loaded (see campaign_service.campaign_loaders);
+    # raise_on_sql turns an accidental per-row lazy load into an error instead of an N+1
+    creator = relationship("User", backref="campaigns", lazy="raise_on_sql")
     donations = relationship("Donation", back_populates="campaign")
-    categories = relationship("Category", secondary=campaign_categories, back_populates="campaigns")
+    categories = relationship("Category", secondary=campaign_categories, back_populates="campaigns", lazy="raise_on_sql")
+    # Running donation totals, written by the donation paths only (see donation_stats_service)
+    donation_stats = relationship("CampaignDonationStats", uselist=False, viewonly=True, lazy="raise_on_sql")
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Full-text search document kept up to date by Postgres; deferred so normal loads skip it
+    search_vector = deferred(Column(TSVECTOR, Computed(_SEARCH_DOCUMENT, persisted=True)))
+    
+    # Filled only by search queries (see campaign_service.search_campaigns)
+    search_rank = query_expression()
+    search_snippet = query_expression()
+
+# The trigram operator class comes from the pg_trgm extension
+event.listen(Campaign.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
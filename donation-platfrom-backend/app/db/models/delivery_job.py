@@ -0,0 +1,59 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+class EmailDeliveryJob(Base):
+    """Progress of one newsletter blast, checkpointed after every recipient chunk so it can resume."""
+    __tablename__ = "email_delivery_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    outbox_id = Column(Integer, ForeignKey("email_outbox.id", ondelete="CASCADE"), unique=True, nullable=False)
+    notification = Column(String(50), nullable=False)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="SET NULL"), nullable=True, index=True)
+    status = Column(String(20), default="running", nullable=False, index=True)  # running, interrupted, completed, failed
+
+    # Recipients are sent in (language, subscriber id) order; this is the last one fully sent
+    last_language = Column(String(5), nullable=True)
+    last_subscriber_id = Column(Integer, nullable=True)
+
+    total_recipients = Column(Integer, default=0, nullable=False)  # Active subscribers when the job started
+    sent_count = Column(Integer, default=0, nullable=False)
+    failed_count = Column(Integer, default=0, nullable=False)
+    runs = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    # Throughput of the current run, used for the ETA
+    run_started_at = Column(DateTime(timezone=True), nullable=True)
+    run_start_count = Column(Integer, default=0, nullable=False)
+    checkpointed_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    @property
+    def processed_count(self) -> int:
+        return self.sent_count + self.failed_count
+
+    @property
+    def progress_percent(self) -> float:
+        if self.status == "completed" or not self.total_recipients:
+            return 100.0 if self.status == "completed" else 0.0
+        return round(min(self.processed_count / self.total_recipients, 1.0) * 100, 1)
+
+    @property
+    def eta_seconds(self):
+        """Estimated seconds left at the current run's rate, or None when unknown."""
+        if self.status != "running" or not self.run_started_at or not self.checkpointed_at:
+            return None
+        elapsed = (self.checkpointed_at - self.run_started_at).total_seconds()
+        processed = self.processed_count - self.run_start_count
+        if elapsed <= 0 or processed <= 0:
+            return None
+        remaining = max(self.total_recipients - self.processed_count, 0)
+        # Account for time already spent since the last checkpoint
+        since_checkpoint = (datetime.now(timezone.utc) - self.checkpointed_at).total_seconds()
+        return max(round(remaining * elapsed / processed - since_checkpoint), 0)
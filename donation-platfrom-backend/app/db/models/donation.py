@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, ForeignKey, Boolean, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -6,6 +6,23 @@ from app.db.database import Base
 
 class Donation(Base):
     __tablename__ = "donations"
+    __table_args__ = (
+        # Completed donations of a campaign by date (donor lists, campaign stats); amount makes sums index-only
+        Index(
+            "ix_donations_campaign_completed_created", "campaign_id", "created_at",
+            postgresql_where=text("payment_status = 'completed'"), postgresql_include=["amount"]
+        ),
+        # A donor's completed donations
+        Index(
+            "ix_donations_donor_completed_created", "donor_id", "created_at",
+            postgresql_where=text("payment_status = 'completed'")
+        ),
+        # Completed donations in a date range (analytics)
+        Index(
+            "ix_donations_completed_created", "created_at",
+            postgresql_where=text("payment_status = 'completed'"), postgresql_include=["amount"]
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     amount = Column(Float, nullable=False)
@@ -13,11 +30,11 @@ class Donation(Base):
     message = Column(Text)
     is_anonymous = Column(Boolean, default=False)
     payment_status = Column(String(20), default="pending")  # pending, completed, failed
-    payment_id = Column(String(255))  # External payment gateway ID
+    payment_id = Column(String(255), unique=True, index=True)  # External payment gateway ID; one donation per payment
     
     # Foreign keys
-    donor_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Can be null for anonymous donations
-    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False)
+    donor_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)  # Can be null for anonymous donations
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False, index=True)
     
     # Relationships
     donor = relationship("User", backref="donations")
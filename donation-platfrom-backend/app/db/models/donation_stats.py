@@ -0,0 +1,53 @@
+from sqlalchemy import Boolean, Column, Integer, Float, Date, DateTime, ForeignKey, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from app.db.database import Base
+
+# Days covered by the rolling recent_counts window
+RECENT_DAYS = 7
+
+class CampaignDonationStats(Base):
+    """Running totals of a campaign's completed donations, for the campaign stats endpoint.
+
+    Updated in the transaction that records each donation, or with CAMPAIGN_AMOUNT_SHARDS
+    set, folded in from pending_campaign_stats along with the amount shards. Rebuild it from
+    the donations table with `python -m app.workers.donation_stats_reconciler`.
+    """
+    __tablename__ = "campaign_donation_stats"
+
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), primary_key=True)
+    donation_count = Column(Integer, default=0, nullable=False)
+    total_amount = Column(Float, default=0.0, nullable=False)
+    donor_count = Column(Integer, default=0, nullable=False)  # Distinct signed-in donors
+    last_donation_at = Column(DateTime(timezone=True), nullable=True)
+    # Donations per UTC day: recent_counts[1] is recent_day, recent_counts[7] six days earlier
+    recent_day = Column(Date, nullable=True)
+    recent_counts = Column(
+        ARRAY(Integer), nullable=False, server_default=text("'{0,0,0,0,0,0,0}'::integer[]")
+    )
+
+    def recent_donation_count(self, today: Optional[date] = None) -> int:
+        """Donations in the last RECENT_DAYS UTC days."""
+        if self.recent_day is None:
+            return 0
+        today = today or datetime.now(timezone.utc).date()
+        age = (today - self.recent_day).days
+        return sum(self.recent_counts[:max(RECENT_DAYS - age, 0)])
+
+class PendingCampaignStats(Base):
+    """A completed donation not yet counted in its campaign's stats.
+
+    Used when CAMPAIGN_AMOUNT_SHARDS is set, so concurrent donations to one campaign don't
+    all update its stats row; the rows are folded into the stats with the amount shards.
+    """
+    __tablename__ = "pending_campaign_stats"
+
+    id = Column(Integer, primary_key=True)
+    donation_id = Column(Integer, ForeignKey("donations.id", ondelete="CASCADE"), nullable=False, index=True)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False, index=True)
+    # The donor as of queueing, so an attribution racing a fold is never missed
+    donor_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    # Counted already; only its donor, attributed after the fact, is pending
+    donor_only = Column(Boolean, nullable=False, server_default=text("false"))
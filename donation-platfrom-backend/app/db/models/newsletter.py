@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, text
 from sqlalchemy.sql import func
 from app.db.database import Base
 
 class NewsletterSubscription(Base):
     __tablename__ = "newsletter_subscriptions"
+    __table_args__ = (
+        # Newsletter blasts stream active subscribers in (language, id) order
+        Index("ix_newsletter_subscriptions_active_language", "language", "id", postgresql_where=text("is_active")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, index=True, nullable=False)
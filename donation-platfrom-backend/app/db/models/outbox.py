@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index, text
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+class EmailOutbox(Base):
+    """Email notifications written in the same transaction as the change that triggers them."""
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Dispatchers claim the oldest due entry; sent entries pile up and stay out of this index
+        Index("ix_email_outbox_due", "id", postgresql_where=text("status IN ('pending', 'processing')")),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    notification = Column(String(50), nullable=False)  # new_campaign, campaign_completed
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="SET NULL"), nullable=True, index=True)
+    payload = Column(JSON, nullable=False)  # Campaign snapshot rendered into the email
+    status = Column(String(20), default="pending", nullable=False, index=True)  # pending, processing, sent, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Lease of the dispatcher processing the entry; once it passes, the entry can be claimed again
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
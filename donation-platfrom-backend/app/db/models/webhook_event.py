@@ -0,0 +1,23 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Text, DateTime, JSON, Index, text
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+class WebhookEvent(Base):
+    """Verified Stripe webhook event waiting to be ingested by the webhook processor."""
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        # Processors claim the oldest pending events; processed ones stay out of this index
+        Index("ix_webhook_events_pending", "id", postgresql_where=text("status = 'pending'")),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    event_id = Column(String(255), unique=True, nullable=False)  # Stripe event id; redeliveries are dropped
+    event_type = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)  # The event's data.object (the PaymentIntent)
+    status = Column(String(20), default="pending", nullable=False)  # pending, processed, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
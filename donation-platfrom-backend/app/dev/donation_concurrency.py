@@ -0,0 +1,116 @@
+"""Hammer one campaign with concurrent donations and check that no update is lost.
+
+Creates a throwaway active campaign whose target is reached halfway through, applies
+the donations from parallel transactions and verifies the final total and that exactly
+one completion email was queued. The campaign is deleted afterwards.
+
+    python -m app.dev.donation_concurrency -n 2000 -c 20
+    python -m app.dev.donation_concurrency -n 2000 -c 20 --shards 8
+    python -m app.dev.donation_concurrency -n 500 -c 20 --baseline   # old read-modify-write
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from sqlalchemy import delete, func, select
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal, SessionLocal, async_engine
+from app.db.models.campaign import Campaign, CampaignStatus
+from app.db.models.outbox import EmailOutbox
+from app.services.campaign_service import update_campaign_amount
+from app.workers.amount_folder import fold_all
+
+AMOUNT = 5.0
+
+
+async def _donate(campaign_id: int):
+    async with AsyncSessionLocal() as db:
+        await update_campaign_amount(db, campaign_id, AMOUNT)
+        await db.commit()
+
+
+async def _donate_read_modify_write(campaign_id: int):
+    """What update_campaign_amount used to do: read the row, add in Python, write it back."""
+    async with AsyncSessionLocal() as db:
+        campaign = await db.get(Campaign, campaign_id)
+        campaign.current_amount += AMOUNT
+        await db.commit()
+
+
+async def _run(campaign_id: int, total: int, concurrency: int, baseline: bool) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    donate = _donate_read_modify_write if baseline else _donate
+
+    async def one():
+        async with semaphore:
+            await donate(campaign_id)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    if settings.CAMPAIGN_AMOUNT_SHARDS > 1:
+        await fold_all()
+    await async_engine.dispose()
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent donation counter benchmark")
+    parser.add_argument("-n", "--total", type=int, default=2000, help="Number of donations")
+    parser.add_argument("-c", "--concurrency", type=int, default=20, help="Parallel transactions")
+    parser.add_argument("--shards", type=int, default=None, help="Override CAMPAIGN_AMOUNT_SHARDS")
+    parser.add_argument("--baseline", action="store_true", help="Use the old read-modify-write update")
+    args = parser.parse_args()
+
+    if args.shards is not None:
+        settings.CAMPAIGN_AMOUNT_SHARDS = args.shards
+
+    db = SessionLocal()
+    try:
+        campaign = Campaign(
+            title="Concurrency benchmark",
+            description="Temporary campaign for app.dev.donation_concurrency",
+            target_amount=AMOUNT * args.total / 2,
+            current_amount=0.0,
+            status=CampaignStatus.ACTIVE,
+            lang="en"
+        )
+        db.add(campaign)
+        db.commit()
+        campaign_id = campaign.id
+
+        elapsed = asyncio.run(_run(campaign_id, args.total, args.concurrency, args.baseline))
+
+        db.expire_all()
+        campaign = db.get(Campaign, campaign_id)
+        expected = AMOUNT * args.total
+        completions = db.scalar(
+            select(func.count(EmailOutbox.id)).where(
+                EmailOutbox.campaign_id == campaign_id, EmailOutbox.notification == "campaign_completed"
+            )
+        )
+        mode = "baseline read-modify-write" if args.baseline else (
+            f"{settings.CAMPAIGN_AMOUNT_SHARDS} shards" if settings.CAMPAIGN_AMOUNT_SHARDS > 1 else "atomic UPDATE"
+        )
+        print(f"{mode}: {args.total} donations, concurrency {args.concurrency}, "
+              f"{elapsed:.2f}s ({args.total / elapsed:,.0f} donations/s)")
+        print(f"   total {campaign.current_amount:,.2f} / expected {expected:,.2f} "
+              f"({round((expected - campaign.current_amount) / AMOUNT)} lost), status {campaign.status.value}, "
+              f"{completions} completion email(s) queued")
+
+        ok = campaign.current_amount == expected and campaign.status == CampaignStatus.COMPLETED
+        ok = ok and (args.baseline or completions == 1)
+        print("✅ No lost updates" if ok else "❌ Lost updates or wrong completion handling")
+        return 0 if ok else 1
+    finally:
+        db.rollback()
+        db.execute(delete(EmailOutbox).where(EmailOutbox.campaign_id == campaign_id))
+        db.execute(delete(Campaign).where(Campaign.id == campaign_id))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""Benchmark EmailService throughput against a local SMTP sink.
+
+    python -m app.dev.smtp_sink --port 8025 &
+    python -m app.dev.email_benchmark -n 5000 --pool-size 8 --rate 0
+"""
+import argparse
+import time
+
+from app.services.email_service import EmailService
+from app.services.template_loader import template_loader
+
+
+def run(total: int, host: str, port: int, pool_size: int, rate: float, batch_size: int):
+    service = EmailService(smtp_server=host, smtp_port=port, use_tls=False, pool_size=pool_size, rate_limit=rate)
+    context = {
+        'campaign_title': 'Benchmark Campaign',
+        'campaign_description': 'Synthetic campaign used to benchmark the email sender.',
+        'target_amount': '10,000.00',
+        'current_amount': '2,500.00',
+        'end_date': 'December 31, 2030',
+        'campaign_url': 'http://localhost:5173/campaigns/1',
+        'website_url': 'http://localhost:5173',
+        'unsubscribe_url': 'http://localhost:5173/unsubscribe'
+    }
+    html_content = template_loader.get_template("en", "new_campaign", "html").render(context)
+    text_content = template_loader.get_template("en", "new_campaign", "txt").render(context)
+    recipients = [f"subscriber{i}@example.com" for i in range(total)]
+
+    started = time.perf_counter()
+    for i in range(0, total, batch_size):
+        service.send_email(recipients[i:i + batch_size], "Benchmark", html_content, text_content)
+    elapsed = time.perf_counter() - started
+    service.close()
+
+    print(f"\nTotal: {total} messages in {elapsed:.2f}s ({total / elapsed:.1f} msg/s) "
+          f"with {pool_size} connections, rate cap {rate or 'unlimited'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Email sender throughput benchmark")
+    parser.add_argument("-n", "--total", type=int, default=2000)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0, help="Messages per second cap, 0 for unlimited")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    run(args.total, args.host, args.port, args.pool_size, args.rate, args.batch_size)
@@ -0,0 +1,85 @@
+"""Local stand-in for the Stripe Payment Intents API.
+
+Run it and point the backend at it to exercise the donation flow offline:
+
+    python -m app.dev.fake_stripe --port 12111
+    STRIPE_API_BASE=http://localhost:12111 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Simulated network round-trip to Stripe, in milliseconds
+LATENCY_MS = float(os.getenv("FAKE_STRIPE_LATENCY_MS", "0"))
+# Status assigned to new payment intents ("succeeded" lets /confirm-payment complete)
+INTENT_STATUS = os.getenv("FAKE_STRIPE_INTENT_STATUS", "succeeded")
+
+app = FastAPI(title="Fake Stripe API")
+payment_intents: Dict[str, Dict[str, Any]] = {}
+
+
+def parse_form(items) -> Dict[str, Any]:
+    """Decode Stripe's form encoding (metadata[key]=value) into nested dicts."""
+    params: Dict[str, Any] = {}
+    for key, value in items:
+        if "[" in key and key.endswith("]"):
+            parent, child = key[:-1].split("[", 1)
+            params.setdefault(parent, {})[child] = value
+        else:
+            params[key] = value
+    return params
+
+
+async def simulate_latency():
+    if LATENCY_MS:
+        await asyncio.sleep(LATENCY_MS / 1000)
+
+
+@app.post("/v1/payment_intents")
+async def create_payment_intent(request: Request):
+    await simulate_latency()
+    params = parse_form((await request.form()).multi_items())
+    intent_id = f"pi_fake_{uuid.uuid4().hex[:24]}"
+    intent = {
+        "id": intent_id,
+        "object": "payment_intent",
+        "amount": int(params.get("amount", 0)),
+        "currency": params.get("currency", "usd"),
+        "client_secret": f"{intent_id}_secret_{uuid.uuid4().hex[:16]}",
+        "created": int(time.time()),
+        "description": params.get("description"),
+        "livemode": False,
+        "metadata": params.get("metadata", {}),
+        "receipt_email": params.get("receipt_email"),
+        "status": INTENT_STATUS,
+    }
+    payment_intents[intent_id] = intent
+    return intent
+
+
+@app.get("/v1/payment_intents/{intent_id}")
+async def retrieve_payment_intent(intent_id: str):
+    await simulate_latency()
+    intent = payment_intents.get(intent_id)
+    if intent is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": {"type": "invalid_request_error", "message": f"No such payment_intent: '{intent_id}'"}}
+        )
+    return intent
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a local fake Stripe API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=12111)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,78 @@
+"""Benchmark building personalized newsletter messages (no SMTP involved).
+
+    python -m app.dev.message_benchmark -n 100000
+    python -m app.dev.message_benchmark -n 100000 --baseline 10000
+"""
+import argparse
+import time
+from collections import namedtuple
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from app.services.email_service import EmailService
+from app.services.mime_message import PersonalizedMessage
+from app.services.template_loader import template_loader
+
+Recipient = namedtuple("Recipient", ["email", "name"])
+
+
+def _campaign_context():
+    return {
+        'campaign_title': 'Benchmark Campaign',
+        'campaign_description': 'Synthetic campaign used to benchmark message building.',
+        'target_amount': '10,000.00',
+        'current_amount': '2,500.00',
+        'end_date': 'December 31, 2030',
+        'campaign_url': 'http://localhost:5173/campaigns/1',
+        'website_url': 'http://localhost:5173'
+    }
+
+
+def _report(label: str, count: int, elapsed: float):
+    print(f"{label}: {count} messages in {elapsed:.2f}s ({count / elapsed:,.0f} msg/s)")
+
+
+def run(total: int, language: str, baseline: int):
+    service = EmailService(use_tls=False)
+    context = _campaign_context()
+    html_template = template_loader.get_template(language, "new_campaign", "html")
+    text_template = template_loader.get_template(language, "new_campaign", "txt")
+    subject = template_loader.get_localized_subject(language, "new_campaign", context['campaign_title'])
+    # Every other subscriber has a matching user account with a name
+    recipients = [
+        Recipient(f"subscriber{i}@example.com", f"Subscriber {i}" if i % 2 else None)
+        for i in range(total)
+    ]
+
+    started = time.perf_counter()
+    message = PersonalizedMessage(service.from_email, subject, html_template.partial(context), text_template.partial(context))
+    size = 0
+    for r in recipients:
+        size += len(service.build_personalized(message, language, r.email, r.name))
+    _report("Personalized (shared parts, spliced fragments)", total, time.perf_counter() - started)
+    print(f"   average message size {size / total:,.0f} bytes")
+
+    if baseline:
+        # Previous approach, made per recipient: full render and a fresh MIME tree for each subscriber
+        started = time.perf_counter()
+        for r in recipients[:baseline]:
+            greeting = template_loader.get_greeting(language, r.name)
+            recipient_context = dict(context, greeting=greeting, unsubscribe_url=service.unsubscribe_url(r.email))
+            mime = MIMEMultipart("alternative")
+            mime["Subject"] = subject
+            mime["From"] = service.from_email
+            mime["To"] = r.email
+            mime.attach(MIMEText(text_template.render(recipient_context), "plain", "utf-8"))
+            mime.attach(MIMEText(html_template.render(recipient_context), "html", "utf-8"))
+            mime.as_string()
+        _report("Baseline (full MIME rebuild per recipient)", baseline, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Personalized message build benchmark")
+    parser.add_argument("-n", "--total", type=int, default=100000)
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--baseline", type=int, default=0, help="Also time N messages built with MIMEMultipart")
+    args = parser.parse_args()
+
+    run(args.total, args.language, args.baseline)
@@ -0,0 +1,52 @@
+"""Measure payment-intent throughput of one worker against the fake Stripe server.
+
+    python -m app.dev.fake_stripe --port 12111 &
+    STRIPE_API_BASE=http://localhost:12111 python -m app.dev.payment_load_test -n 2000 -c 100
+"""
+import argparse
+import asyncio
+import time
+
+from app.services.payment_gateway import payment_gateway
+from app.services.payment_service import PaymentService
+
+
+async def run(total: int, concurrency: int, campaign_id: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            await PaymentService.create_payment_intent(
+                campaign_id=campaign_id,
+                amount=10 + i % 90,
+                donor_email=f"donor{i}@example.com",
+                donor_name=f"Donor {i}"
+            )
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    await payment_gateway.close()
+
+    latencies.sort()
+    print(f"Gateway: {payment_gateway.api_base or 'https://api.stripe.com'}")
+    print(f"Created {total} payment intents in {elapsed:.2f}s with concurrency {concurrency}")
+    print(f"Throughput: {total / elapsed:.1f} intents/s")
+    print(f"Latency p50: {latencies[len(latencies) // 2] * 1000:.1f}ms, "
+          f"p99: {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Payment intent throughput benchmark")
+    parser.add_argument("-n", "--total", type=int, default=1000)
+    parser.add_argument("-c", "--concurrency", type=int, default=50)
+    parser.add_argument("--campaign-id", type=int, default=1)
+    args = parser.parse_args()
+
+    if not payment_gateway.api_base:
+        raise SystemExit("Set STRIPE_API_BASE to the fake Stripe server before running the load test.")
+
+    asyncio.run(run(args.total, args.concurrency, args.campaign_id))
@@ -0,0 +1,49 @@
+"""Local SMTP sink that accepts and discards mail, for benchmarking the email sender.
+
+Requires aiosmtpd (`pip install aiosmtpd`), which is not a runtime dependency.
+
+    python -m app.dev.smtp_sink --port 8025
+    SMTP_SERVER=localhost SMTP_PORT=8025 SMTP_USE_TLS=false python -m app.workers.email_dispatcher
+"""
+import argparse
+import time
+
+
+class CountingHandler:
+    """Counts delivered messages and reports the receive rate."""
+
+    def __init__(self, report_every: int):
+        self.report_every = report_every
+        self.received = 0
+        self.started = None
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.started is None:
+            self.started = time.perf_counter()
+        self.received += 1
+        if self.received % self.report_every == 0:
+            elapsed = time.perf_counter() - self.started
+            print(f"📥 {self.received} messages received ({self.received / elapsed:.1f} msg/s)")
+        return "250 Message accepted for delivery"
+
+
+if __name__ == "__main__":
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        raise SystemExit("aiosmtpd is required for the SMTP sink: pip install aiosmtpd")
+
+    parser = argparse.ArgumentParser(description="Run a local SMTP sink")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--report-every", type=int, default=1000)
+    args = parser.parse_args()
+
+    controller = Controller(CountingHandler(args.report_every), hostname=args.host, port=args.port)
+    controller.start()
+    print(f"SMTP sink listening on {args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        controller.stop()
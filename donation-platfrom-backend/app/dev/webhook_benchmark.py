@@ -0,0 +1,199 @@
+"""Measure webhook intake and batched ingestion throughput against the fake Stripe server.
+
+Creates payment intents on the fake gateway for a throwaway campaign, delivers a signed
+payment_intent.succeeded event for each (plus some redeliveries) to the webhook endpoint,
+then drains the queue with the webhook processor. Checks that every donation is counted
+once and that exactly one completion email was queued. The campaign is deleted afterwards
+and the activity rollups of the current month are rebuilt without its donations.
+
+    python -m app.dev.fake_stripe --port 12111 &
+    STRIPE_API_BASE=http://localhost:12111 python -m app.dev.webhook_benchmark -n 5000 -c 100
+    STRIPE_API_BASE=http://localhost:12111 python -m app.dev.webhook_benchmark -n 5000 -c 100 --inline
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import delete, func, select
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal, SessionLocal, async_engine
+from app.db.models.campaign import Campaign, CampaignStatus
+from app.db.models.donation import Donation
+from app.db.models.outbox import EmailOutbox
+from app.db.models.webhook_event import WebhookEvent
+from app.main import app
+from app.services.activity_rollup_service import activity_rebuild_statements
+from app.services.payment_gateway import payment_gateway
+from app.services.payment_service import PaymentService
+from app.workers.webhook_processor import drain
+
+AMOUNT = 25.0
+WEBHOOK_SECRET = "whsec_benchmark"
+
+
+def _signed_event(payment_intent) -> tuple:
+    """Body and headers of a payment_intent.succeeded delivery, signed like Stripe does."""
+    body = json.dumps({
+        "id": f"evt_{uuid.uuid4().hex[:24]}",
+        "object": "event",
+        "type": "payment_intent.succeeded",
+        "data": {"object": payment_intent}
+    })
+    timestamp = int(time.time())
+    signature = hmac.new(WEBHOOK_SECRET.encode(), f"{timestamp}.{body}".encode(), hashlib.sha256).hexdigest()
+    return body, {"stripe-signature": f"t={timestamp},v1={signature}", "content-type": "application/json"}
+
+
+def _percentile(latencies: list, fraction: float) -> float:
+    return sorted(latencies)[max(int(len(latencies) * fraction) - 1, 0)] * 1000
+
+
+async def _gather_limited(concurrency: int, jobs) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(job):
+        async with semaphore:
+            started = time.perf_counter()
+            await job()
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(job) for job in jobs))
+    return latencies
+
+
+async def _create_intents(campaign_id: int, total: int, concurrency: int) -> list:
+    intents = []
+
+    async def create():
+        intent = await payment_gateway.create_payment_intent({
+            'amount': int(AMOUNT * 100),
+            'currency': 'usd',
+            'metadata': {'campaign_id': str(campaign_id), 'is_anonymous': 'False', 'message': ''}
+        })
+        intents.append(intent)
+
+    await _gather_limited(concurrency, [create] * total)
+    return intents
+
+
+async def _run(campaign_id: int, args) -> bool:
+    intents = await _create_intents(campaign_id, args.total, args.concurrency)
+    # Stripe delivers at least once; resend a share of the events to exercise deduplication
+    deliveries = intents + intents[:int(len(intents) * args.redeliver)]
+
+    if args.inline:
+        # The pre-queue behaviour: each delivery recorded in its own transaction
+        async def ingest(intent):
+            async with AsyncSessionLocal() as db:
+                await PaymentService.record_completed_donation(db, PaymentService.donation_values(intent, "completed", None))
+
+        started = time.perf_counter()
+        latencies = await _gather_limited(args.concurrency, [lambda intent=intent: ingest(intent) for intent in deliveries])
+        elapsed = time.perf_counter() - started
+        print(f"Inline ingestion: {len(deliveries)} deliveries in {elapsed:.2f}s "
+              f"({len(deliveries) / elapsed:,.0f}/s), p50 {_percentile(latencies, 0.5):.1f}ms, "
+              f"p99 {_percentile(latencies, 0.99):.1f}ms")
+        return True
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        statuses = []
+
+        async def deliver(intent):
+            body, headers = _signed_event(intent)
+            response = await client.post(f"{settings.API_V1_STR}/donations/webhook", content=body, headers=headers)
+            statuses.append(response.status_code)
+
+        started = time.perf_counter()
+        latencies = await _gather_limited(args.concurrency, [lambda intent=intent: deliver(intent) for intent in deliveries])
+        elapsed = time.perf_counter() - started
+    print(f"Intake: {len(deliveries)} deliveries in {elapsed:.2f}s ({len(deliveries) / elapsed:,.0f}/s), "
+          f"p50 {_percentile(latencies, 0.5):.1f}ms, p99 {_percentile(latencies, 0.99):.1f}ms")
+    if any(code != 200 for code in statuses):
+        print(f"❌ {sum(code != 200 for code in statuses)} deliveries were rejected")
+        return False
+
+    started = time.perf_counter()
+    processed = await drain(args.batch_size)
+    elapsed = time.perf_counter() - started
+    print(f"Processor: {processed} events in {elapsed:.2f}s ({processed / elapsed:,.0f}/s), batch size {args.batch_size}")
+    return True
+
+
+async def _main(campaign_id: int, args) -> bool:
+    try:
+        return await _run(campaign_id, args)
+    finally:
+        await payment_gateway.close()
+        await async_engine.dispose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Webhook intake and ingestion benchmark")
+    parser.add_argument("-n", "--total", type=int, default=2000, help="Number of payments")
+    parser.add_argument("-c", "--concurrency", type=int, default=50, help="Parallel deliveries")
+    parser.add_argument("--batch-size", type=int, default=settings.WEBHOOK_BATCH_SIZE, help="Processor batch size")
+    parser.add_argument("--redeliver", type=float, default=0.1, help="Share of events delivered twice")
+    parser.add_argument("--inline", action="store_true", help="Record each delivery in its own transaction instead")
+    args = parser.parse_args()
+
+    if not payment_gateway.api_base:
+        raise SystemExit("Set STRIPE_API_BASE to the fake Stripe server before running the benchmark.")
+    settings.STRIPE_WEBHOOK_SECRET = WEBHOOK_SECRET
+
+    db = SessionLocal()
+    started = datetime.now(timezone.utc)
+    try:
+        campaign = Campaign(
+            title="Webhook benchmark",
+            description="Temporary campaign for app.dev.webhook_benchmark",
+            target_amount=AMOUNT * args.total / 2,
+            current_amount=0.0,
+            status=CampaignStatus.ACTIVE,
+            lang="en"
+        )
+        db.add(campaign)
+        db.commit()
+        campaign_id = campaign.id
+
+        ok = asyncio.run(_main(campaign_id, args))
+
+        db.expire_all()
+        campaign = db.get(Campaign, campaign_id)
+        donations = db.scalar(select(func.count(Donation.id)).where(Donation.campaign_id == campaign_id))
+        completions = db.scalar(
+            select(func.count(EmailOutbox.id)).where(
+                EmailOutbox.campaign_id == campaign_id, EmailOutbox.notification == "campaign_completed"
+            )
+        )
+        expected = AMOUNT * args.total
+        print(f"   {donations} donations, total {campaign.current_amount:,.2f} / expected {expected:,.2f}, "
+              f"status {campaign.status.value}, {completions} completion email(s) queued")
+
+        ok = ok and donations == args.total and campaign.current_amount == expected and completions == 1
+        print("✅ Every payment counted once" if ok else "❌ Missing, duplicated or miscounted donations")
+        return 0 if ok else 1
+    finally:
+        db.rollback()
+        db.execute(delete(WebhookEvent).where(WebhookEvent.payload["metadata"]["campaign_id"].as_string() == str(campaign_id)))
+        db.execute(delete(EmailOutbox).where(EmailOutbox.campaign_id == campaign_id))
+        db.execute(delete(Donation).where(Donation.campaign_id == campaign_id))
+        db.execute(delete(Campaign).where(Campaign.id == campaign_id))
+        # Take the deleted donations back out of the time-series buckets
+        for statement in activity_rebuild_statements(started):
+            db.execute(statement)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
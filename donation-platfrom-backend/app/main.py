@@ -6,6 +6,7 @@ import os
 
 from app.api.api import api_router
 from app.db.init_db import init_db
+from app.services.payment_gateway import payment_gateway
 
 app = FastAPI(
     title="Donation Platform API",
@@ -54,6 +55,11 @@ app.mount("/uploads", StaticFiles(directory=uploads_dir), name="uploads")
 async def startup_event():
     init_db()
 
+# Release pooled payment gateway connections on shutdown
+@app.on_event("shutdown")
+async def shutdown_event():
+    await payment_gateway.close()
+
 # Include API router
 app.include_router(api_router)
 
@@ -1,22 +1,25 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List, Generic, TypeVar
 from datetime import datetime
+from sqlalchemy import inspect
 from app.db.models.campaign import CampaignStatus
 from app.schemas.category import Category
+from app.schemas.donation import DonationStats
 
 # Generic type for pagination
 T = TypeVar('T')
 
 class PaginationMeta(BaseModel):
     """Pagination metadata for frontend"""
-    current_page: int
+    current_page: Optional[int] = None  # None when paging by cursor
     page_size: int
-    total_items: int
-    total_pages: int
+    total_items: Optional[int] = None  # None when the total count was skipped
+    total_pages: Optional[int] = None
     has_next: bool
     has_previous: bool
     next_page: Optional[int] = None
     previous_page: Optional[int] = None
+    next_cursor: Optional[str] = None  # Pass as `cursor` to fetch the next page without OFFSET
 
 class PaginatedResponse(BaseModel, Generic[T]):
     """Generic paginated response"""
@@ -60,6 +63,19 @@ class CampaignResponse(CampaignBase):
     class Config:
         from_attributes = True
         
+class CampaignCreator(BaseModel):
+    """Public fields of the user who created a campaign"""
+    id: int
+    username: str
+    full_name: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+class AdminCampaignResponse(CampaignResponse):
+    """Campaign with its creator, for admin listings"""
+    creator: Optional[CampaignCreator] = None
+        
 class CampaignDetailResponse(CampaignResponse):
     """Schema for detailed campaign response that may include additional data"""
     # Could be extended to include donor information, comments, etc.
@@ -69,4 +85,60 @@ class CampaignDetailResponse(CampaignResponse):
 class PaginatedCampaignsResponse(BaseModel):
     """Paginated campaigns response"""
     items: List[CampaignResponse]
-    pagination: PaginationMeta
\ No newline at end of file
+    pagination: PaginationMeta
+
+class PaginatedAdminCampaignsResponse(BaseModel):
+    """Paginated campaigns response with creator data"""
+    items: List[AdminCampaignResponse]
+    pagination: PaginationMeta
+
+class CampaignListItem(BaseModel):
+    """Campaign in a listing; only the fields selected for the request are set (sparse fieldset)"""
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    markdown_text: Optional[str] = None
+    target_amount: Optional[float] = None
+    current_amount: Optional[float] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    image_path: Optional[str] = None
+    status: Optional[CampaignStatus] = None
+    lang: Optional[str] = None
+    creator_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    categories: Optional[List[Category]] = None
+    donation_stats: Optional[DonationStats] = None
+    # Search results only: relevance and an HTML-escaped excerpt with matches wrapped in <mark>
+    search_rank: Optional[float] = None
+    snippet: Optional[str] = None
+    
+    @classmethod
+    def from_campaign(cls, campaign, fields) -> "CampaignListItem":
+        values = {field: getattr(campaign, field) for field in ("id", *fields)}
+        if "donation_stats" in values:
+            values["donation_stats"] = DonationStats.from_rollup(values["donation_stats"])
+        return cls.model_validate(values, from_attributes=True)
+    
+    @classmethod
+    def from_search_result(cls, campaign, fields) -> "CampaignListItem":
+        item = cls.from_campaign(campaign, fields)
+        # A blank keyword lists campaigns without ranking; don't lazy-load the expressions then
+        if "search_rank" not in inspect(campaign).unloaded:
+            item.search_rank = campaign.search_rank
+            item.snippet = campaign.search_snippet
+        return item
+
+class CampaignSuggestion(BaseModel):
+    """Title suggestion for search-as-you-type"""
+    id: int
+    title: str
+    
+    class Config:
+        from_attributes = True
+
+class PaginatedCampaignListResponse(BaseModel):
+    """Paginated campaign listing with sparse fields; serialize with response_model_exclude_unset"""
+    items: List[CampaignListItem]
+    pagination: PaginationMeta
@@ -37,4 +37,28 @@ class DonationStats(BaseModel):
     total_donations: int
     total_amount: float
     average_donation: float
-    recent_donations: int
\ No newline at end of file
+    recent_donations: int
+    unique_donors: int = 0
+    last_donation_at: Optional[datetime] = None
+
+    @classmethod
+    def from_rollup(cls, stats, **fields) -> "DonationStats":
+        """Build from a campaign_donation_stats row; None (no donations yet) gives zeros."""
+        if stats is None:
+            return cls(
+                total_donations=0, total_amount=0, average_donation=0, recent_donations=0,
+                unique_donors=0, last_donation_at=None, **fields
+            )
+        return cls(
+            **fields,
+            total_donations=stats.donation_count,
+            total_amount=stats.total_amount,
+            average_donation=stats.total_amount / stats.donation_count if stats.donation_count else 0,
+            recent_donations=stats.recent_donation_count(),
+            unique_donors=stats.donor_count,
+            last_donation_at=stats.last_donation_at
+        )
+
+
+class CampaignDonationStatsItem(DonationStats):
+    campaign_id: int
\ No newline at end of file
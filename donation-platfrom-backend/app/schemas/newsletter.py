@@ -21,10 +21,32 @@ class NewsletterSubscriptionResponse(NewsletterSubscriptionBase):
         from_attributes = True
 
 class NewsletterUnsubscribeRequest(BaseModel):
-    email: EmailStr
+    email: Optional[EmailStr] = None
+    token: Optional[str] = Field(default=None, description="Signed token from the unsubscribe link in newsletter emails")
 
 class NewsletterStats(BaseModel):
     total_subscribers: int
     active_subscribers: int
     inactive_subscribers: int
     recent_subscriptions: int  # last 30 days
+
+class EmailDeliveryJobResponse(BaseModel):
+    id: int
+    outbox_id: int
+    notification: str
+    campaign_id: Optional[int] = None
+    status: str
+    total_recipients: int
+    sent_count: int
+    failed_count: int
+    progress_percent: float
+    eta_seconds: Optional[int] = None
+    runs: int
+    last_error: Optional[str] = None
+    run_started_at: Optional[datetime] = None
+    checkpointed_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
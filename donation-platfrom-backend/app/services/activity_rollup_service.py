@@ -0,0 +1,262 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, cast, delete, exists, func, literal, literal_column, or_, select, text, union_all
+from sqlalchemy.dialects.postgresql import INTERVAL, insert as pg_insert
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import ClauseElement
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Tuple
+
+from app.db.models.activity_rollup import ActivityRollup, GRANULARITIES, PendingActivity
+from app.db.models.donation import Donation
+from app.db.models.user import User
+
+_COUNTERS = ("donation_count", "donation_amount", "donor_count", "new_users")
+
+def _sql_value(value):
+    """A SQL expression as is, or a Python value as a bound literal."""
+    return value if isinstance(value, ClauseElement) else literal(value)
+
+def sql_bucket(granularity: str, timestamp):
+    """Start of the UTC bucket holding a timestamptz SQL expression.
+
+    The granularity (one of GRANULARITIES) is rendered inline, so the same bucket expression
+    in a SELECT list and its GROUP BY compare equal.
+    """
+    return func.date_trunc(literal_column(f"'{granularity}'"), timestamp, literal_column("'UTC'"))
+
+def bucket_start(granularity: str, timestamp: datetime) -> datetime:
+    """Start of the UTC bucket holding `timestamp`; matches `sql_bucket`."""
+    timestamp = timestamp.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if granularity == "hour":
+        return timestamp
+    timestamp = timestamp.replace(hour=0)
+    return timestamp if granularity == "day" else timestamp.replace(day=1)
+
+def _bucket_width(granularity):
+    """Interval of one bucket, e.g. for a granularity column."""
+    return cast(literal("1 ").concat(granularity), INTERVAL)
+
+def _add_to_buckets(insert):
+    """Make an INSERT into activity_rollups add its counters to existing buckets."""
+    return insert.on_conflict_do_update(
+        index_elements=[ActivityRollup.granularity, ActivityRollup.bucket_start],
+        set_={name: getattr(ActivityRollup, name) + insert.excluded[name] for name in _COUNTERS}
+    )
+
+def donation_activity_insert(donation_id, donor_id):
+    """INSERT queueing a recorded donation for the activity rollups.
+
+    Arguments may be SQL expressions, e.g. columns of an INSERT ... RETURNING CTE. Nothing
+    shared is locked; the folder adds the donation to its buckets later.
+    """
+    return pg_insert(PendingActivity).from_select(
+        ["donation_id", "donor_id"], select(_sql_value(donation_id), _sql_value(donor_id))
+    )
+
+def new_user_activity_insert(user_id: int):
+    """INSERT queueing a new user for the activity rollups; run it in the transaction adding the user."""
+    return pg_insert(PendingActivity).values(user_id=user_id)
+
+async def add_donation_activity(db: AsyncSession, donations: Iterable[Tuple[int, Optional[int]]]) -> None:
+    """Queue (donation_id, donor_id) donations for the activity rollups in the caller's transaction."""
+    rows = [{"donation_id": donation_id, "donor_id": donor_id} for donation_id, donor_id in donations]
+    if rows:
+        await db.execute(pg_insert(PendingActivity).values(rows))
+
+async def count_new_activity_donor(db: AsyncSession, donor_id: int, donation_id: int) -> None:
+    """Queue the donor attributed to a recorded donation, as with `count_new_donor`.
+
+    Nothing is queued if the donation already was with this donor; otherwise the folder
+    counts the donor in each bucket where they are new, and leaves the donation alone.
+    """
+    queued = exists().where(PendingActivity.donation_id == donation_id, PendingActivity.donor_id == donor_id)
+    await db.execute(pg_insert(PendingActivity).from_select(
+        ["donation_id", "donor_id", "donor_only"],
+        select(literal(donation_id), literal(donor_id), literal(True)).where(~queued)
+    ))
+
+def _batch_buckets(batch):
+    """Counters a batch of pending rows adds to each bucket.
+
+    A donor is new to a bucket if none of their completed donations in it is counted
+    already, i.e. has no pending row; the batch's own rows are still pending to the
+    statement taking them.
+    """
+    counted_before = aliased(Donation)
+    new = ~batch.c.donor_only
+    parts = []
+    for granularity in GRANULARITIES:
+        start = sql_bucket(granularity, Donation.created_at)
+        donor_counted = exists().where(
+            counted_before.donor_id == batch.c.donor_id,
+            counted_before.payment_status == "completed",
+            counted_before.created_at >= start,
+            counted_before.created_at < start + _bucket_width(literal(granularity)),
+            ~exists().where(PendingActivity.donation_id == counted_before.id)
+        )
+        parts.append(
+            select(
+                literal(granularity).label("granularity"),
+                start.label("bucket_start"),
+                func.count(Donation.id).filter(new).label("donation_count"),
+                func.coalesce(func.sum(Donation.amount).filter(new), 0).label("donation_amount"),
+                func.count(func.distinct(batch.c.donor_id)).filter(~donor_counted).label("donor_count"),
+                literal(0).label("new_users")
+            )
+            .select_from(batch.join(
+                Donation, and_(Donation.id == batch.c.donation_id, Donation.payment_status == "completed")
+            ))
+            .group_by(start)
+        )
+        start = sql_bucket(granularity, User.created_at)
+        parts.append(
+            select(literal(granularity), start, literal(0), literal(0.0), literal(0), func.count(User.id))
+            .select_from(batch.join(User, User.id == batch.c.user_id))
+            .group_by(start)
+        )
+    rows = union_all(*parts).subquery()
+    return (
+        select(rows.c.granularity, rows.c.bucket_start, *(func.sum(rows.c[name]) for name in _COUNTERS))
+        .group_by(rows.c.granularity, rows.c.bucket_start)
+    )
+
+async def fold_activity_rollups(db: AsyncSession, limit: int) -> int:
+    """Count up to `limit` pending donations and users in their buckets, in the caller's transaction.
+
+    The rollup table is locked against other folds and rebuilds, not against readers, so
+    folds never overlap. Rows are taken in id order; returns how many were folded.
+    """
+    await db.execute(text("LOCK TABLE activity_rollups IN SHARE ROW EXCLUSIVE MODE"))
+    queued = aliased(PendingActivity)
+    batch = (
+        delete(PendingActivity)
+        .where(PendingActivity.id.in_(select(queued.id).order_by(queued.id).limit(limit)))
+        .returning(PendingActivity.donation_id, PendingActivity.user_id, PendingActivity.donor_id, PendingActivity.donor_only)
+        .cte("batch")
+    )
+    folded = _add_to_buckets(pg_insert(ActivityRollup).from_select(
+        ["granularity", "bucket_start", *_COUNTERS], _batch_buckets(batch)
+    )).cte("folded")
+    return await db.scalar(select(func.count()).select_from(batch).add_cte(folded))
+
+def _only(aggregate, criterion):
+    """An aggregate over the rows matching `criterion`, or over all rows if it is None."""
+    return aggregate if criterion is None else aggregate.filter(criterion)
+
+def _actual_buckets(since: Optional[datetime] = None, folded_only: bool = False):
+    """Buckets recomputed from the donations and users tables, from the month holding `since`.
+
+    With `folded_only`, donations and users still waiting for the folder are left out.
+    """
+    start = bucket_start("month", since) if since is not None else None
+    completed = [Donation.payment_status == "completed"]
+    if start is not None:
+        completed.append(Donation.created_at >= start)
+    counted = folded = signed_up = None
+    if folded_only:
+        pending = PendingActivity
+        counted = ~exists().where(pending.donation_id == Donation.id, ~pending.donor_only)
+        folded = ~exists().where(pending.donation_id == Donation.id)
+        signed_up = ~exists().where(pending.user_id == User.id)
+    donations = union_all(*(
+        select(
+            literal(granularity).label("granularity"),
+            sql_bucket(granularity, Donation.created_at).label("bucket_start"),
+            _only(func.count(Donation.id), counted).label("donation_count"),
+            _only(func.sum(Donation.amount), counted).label("donation_amount"),
+            _only(func.count(func.distinct(Donation.donor_id)), folded).label("donor_count")
+        ).where(*completed).group_by(sql_bucket(granularity, Donation.created_at))
+        for granularity in GRANULARITIES
+    )).subquery()
+    users = union_all(*(
+        select(
+            literal(granularity).label("granularity"),
+            sql_bucket(granularity, User.created_at).label("bucket_start"),
+            _only(func.count(User.id), signed_up).label("new_users")
+        ).where(*([User.created_at >= start] if start is not None else [])).group_by(sql_bucket(granularity, User.created_at))
+        for granularity in GRANULARITIES
+    )).subquery()
+    return select(
+        func.coalesce(donations.c.granularity, users.c.granularity).label("granularity"),
+        func.coalesce(donations.c.bucket_start, users.c.bucket_start).label("bucket_start"),
+        func.coalesce(donations.c.donation_count, 0).label("donation_count"),
+        func.coalesce(donations.c.donation_amount, 0).label("donation_amount"),
+        func.coalesce(donations.c.donor_count, 0).label("donor_count"),
+        func.coalesce(users.c.new_users, 0).label("new_users")
+    ).select_from(
+        donations.outerjoin(
+            users,
+            and_(donations.c.granularity == users.c.granularity, donations.c.bucket_start == users.c.bucket_start),
+            full=True
+        )
+    )
+
+def _stored_scope(since: Optional[datetime] = None) -> list:
+    return [ActivityRollup.bucket_start >= bucket_start("month", since)] if since is not None else []
+
+def _pending_scope(since: Optional[datetime] = None) -> list:
+    if since is None:
+        return []
+    start = bucket_start("month", since)
+    return [or_(
+        PendingActivity.donation_id.in_(select(Donation.id).where(Donation.created_at >= start)),
+        PendingActivity.user_id.in_(select(User.id).where(User.created_at >= start))
+    )]
+
+def activity_rebuild_statements(since: Optional[datetime] = None) -> list:
+    """Statements recomputing the buckets from the month holding `since` (or all of them).
+
+    The pending rows of the donations and users recomputed are cleared, since the rebuild
+    counts them.
+    """
+    rebuilt = pg_insert(ActivityRollup).from_select(
+        ["granularity", "bucket_start", *_COUNTERS], _actual_buckets(since)
+    )
+    return [
+        delete(ActivityRollup).where(*_stored_scope(since)),
+        rebuilt,
+        delete(PendingActivity).where(*_pending_scope(since))
+    ]
+
+async def rebuild_activity_rollups(db: AsyncSession, since: Optional[datetime] = None) -> None:
+    """Recompute the buckets from the raw tables and commit.
+
+    The rollup table is locked against folds meanwhile, and every statement sees one snapshot
+    taken after the lock, so the pending rows cleared are exactly those of the donations and
+    users the rebuild counts. Call it before anything else in the session's transaction.
+    """
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    await db.execute(text("LOCK TABLE activity_rollups IN EXCLUSIVE MODE"))
+    for statement in activity_rebuild_statements(since):
+        await db.execute(statement)
+    await db.commit()
+
+async def find_activity_drift(db: AsyncSession, since: Optional[datetime] = None) -> List:
+    """Buckets whose stored counters disagree with the raw tables.
+
+    Rows have granularity, bucket_start, the stored counters and the actual ones. Donations
+    and users still waiting for the folder are left out of the actual counters.
+    """
+    actual = _actual_buckets(since, folded_only=True).subquery()
+    stored = select(ActivityRollup).where(*_stored_scope(since)).subquery()
+    mismatch = [
+        func.coalesce(stored.c[name], 0).is_distinct_from(func.coalesce(actual.c[name], 0))
+        for name in ("donation_count", "donor_count", "new_users")
+    ]
+    mismatch.append(func.abs(func.coalesce(stored.c.donation_amount, 0) - func.coalesce(actual.c.donation_amount, 0)) > 0.005)
+    result = await db.execute(
+        select(
+            func.coalesce(stored.c.granularity, actual.c.granularity).label("granularity"),
+            func.coalesce(stored.c.bucket_start, actual.c.bucket_start).label("bucket_start"),
+            *(stored.c[name] for name in _COUNTERS),
+            *(actual.c[name].label(f"actual_{name}") for name in _COUNTERS)
+        )
+        .select_from(stored.outerjoin(
+            actual,
+            and_(stored.c.granularity == actual.c.granularity, stored.c.bucket_start == actual.c.bucket_start),
+            full=True
+        ))
+        .where(or_(*mismatch))
+        .order_by(text("granularity"), text("bucket_start"))
+    )
+    return result.all()
@@ -1,105 +1,199 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, text, extract
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, or_, select, true
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from collections import defaultdict
+import asyncio
 
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.db.models.activity_rollup import ActivityRollup
+from app.db.models.association import campaign_categories
 from app.db.models.campaign import Campaign, CampaignStatus
 from app.db.models.donation import Donation
+from app.db.models.donation_stats import CampaignDonationStats
 from app.db.models.category import Category
 from app.db.models.user import User
 from app.db.models.newsletter import NewsletterSubscription
 
+def _utc_midnight(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
 class AnalyticsService:
     """Service for generating analytics data for the admin dashboard."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_overview_stats(self) -> Dict[str, Any]:
-        """Get overview statistics for the dashboard."""
-        # Total campaigns by status
-        total_campaigns = self.db.query(Campaign).count()
-        active_campaigns = self.db.query(Campaign).filter(Campaign.status == CampaignStatus.ACTIVE).count()
-        completed_campaigns = self.db.query(Campaign).filter(Campaign.status == CampaignStatus.COMPLETED).count()
-        draft_campaigns = self.db.query(Campaign).filter(Campaign.status == CampaignStatus.DRAFT).count()
-        pending_campaigns = self.db.query(Campaign).filter(Campaign.status == CampaignStatus.PENDING).count()
-        
-        # Total donations and amount
-        donation_stats = self.db.query(
-            func.count(Donation.id).label('total_donations'),
-            func.coalesce(func.sum(Donation.amount), 0).label('total_amount')
-        ).filter(Donation.payment_status == 'completed').first()
-        
-        # Total users
-        total_users = self.db.query(User).count()
-        
-        # Newsletter subscribers
-        active_subscribers = self.db.query(NewsletterSubscription).filter(
-            NewsletterSubscription.is_active == True
-        ).count()
+    async def get_overview_stats(self, use_rollups: bool = True) -> Dict[str, Any]:
+        """Get overview statistics for the dashboard.
+
+        Everything comes from one statement: each table is scanned once with COUNT ... FILTER
+        per figure. Donation totals are summed from the per-campaign stats rollup unless
+        `use_rollups` is False, in which case they are aggregated from the donations table.
+        """
+        thirty_days_ago = func.now() - timedelta(days=30)
+        completed = Donation.payment_status == 'completed'
         
-        # Recent activity (last 30 days)
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        recent_campaigns = self.db.query(Campaign).filter(
-            Campaign.created_at >= thirty_days_ago
-        ).count()
+        campaigns = select(
+            func.count(Campaign.id).label('total'),
+            func.count(Campaign.id).filter(Campaign.status == CampaignStatus.ACTIVE).label('active'),
+            func.count(Campaign.id).filter(Campaign.status == CampaignStatus.COMPLETED).label('completed'),
+            func.count(Campaign.id).filter(Campaign.status == CampaignStatus.DRAFT).label('draft'),
+            func.count(Campaign.id).filter(Campaign.status == CampaignStatus.PENDING).label('pending'),
+            func.count(Campaign.id).filter(Campaign.created_at >= thirty_days_ago).label('recent')
+        ).subquery()
         
-        recent_donations = self.db.query(Donation).filter(
-            Donation.created_at >= thirty_days_ago,
-            Donation.payment_status == 'completed'
-        ).count()
+        if use_rollups:
+            donations = select(
+                func.coalesce(func.sum(CampaignDonationStats.donation_count), 0).label('total_donations'),
+                func.coalesce(func.sum(CampaignDonationStats.total_amount), 0).label('total_amount'),
+                # The rollup only keeps a week of daily counts; 30 days is a range scan on the partial index
+                select(func.count(Donation.id)).where(completed, Donation.created_at >= thirty_days_ago)
+                .scalar_subquery().label('recent_donations')
+            ).subquery()
+        else:
+            donations = select(
+                func.count(Donation.id).label('total_donations'),
+                func.coalesce(func.sum(Donation.amount), 0).label('total_amount'),
+                func.count(Donation.id).filter(Donation.created_at >= thirty_days_ago).label('recent_donations')
+            ).where(completed).subquery()
+        
+        total_users = select(func.count(User.id)).scalar_subquery()
+        active_subscribers = select(func.count(NewsletterSubscription.id)).where(
+            NewsletterSubscription.is_active == True
+        ).scalar_subquery()
+        
+        # Both derived tables are single rows, so the join is just a way to read them together
+        stats = (await self.db.execute(
+            select(
+                campaigns,
+                donations,
+                total_users.label('total_users'),
+                active_subscribers.label('active_subscribers')
+            ).select_from(campaigns.join(donations, true()))
+        )).one()
         
         # Calculate average donation
         avg_donation = 0
-        if donation_stats.total_donations > 0:
-            avg_donation = donation_stats.total_amount / donation_stats.total_donations
+        if stats.total_donations > 0:
+            avg_donation = stats.total_amount / stats.total_donations
         
         return {
             'campaigns': {
-                'total': total_campaigns,
-                'active': active_campaigns,
-                'completed': completed_campaigns,
-                'draft': draft_campaigns,
-                'pending': pending_campaigns,
-                'recent': recent_campaigns
+                'total': stats.total,
+                'active': stats.active,
+                'completed': stats.completed,
+                'draft': stats.draft,
+                'pending': stats.pending,
+                'recent': stats.recent
             },
             'donations': {
-                'total_count': donation_stats.total_donations or 0,
-                'total_amount': donation_stats.total_amount or 0,
+                'total_count': stats.total_donations or 0,
+                'total_amount': stats.total_amount or 0,
                 'average_amount': round(avg_donation, 2),
-                'recent_count': recent_donations
+                'recent_count': stats.recent_donations
             },
             'users': {
-                'total': total_users
+                'total': stats.total_users
             },
             'newsletter': {
-                'active_subscribers': active_subscribers
+                'active_subscribers': stats.active_subscribers
             }
         }
     
-    def get_donation_trends(self, days: int = 30) -> List[Dict[str, Any]]:
-        """Get donation trends over the specified number of days."""
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=days-1)
+    async def get_weekly_overview(self, weeks: int = 16) -> Dict[str, Any]:
+        """Get weekly donation totals, donors and active campaigns for the last `weeks` weeks.
+
+        The weeks come from generate_series and are joined by key to the weekly donation and
+        campaign buckets; the running campaign count is a window sum. One statement in all.
+        """
+        first_week = func.date_trunc('week', func.now() - timedelta(weeks=weeks))
+        
+        week_starts = select(
+            func.generate_series(first_week, func.date_trunc('week', func.now()), timedelta(weeks=1)).label('week_start')
+        ).cte('week_starts')
+        
+        donation_week = func.date_trunc('week', Donation.created_at)
+        weekly_donations = select(
+            donation_week.label('week_start'),
+            func.sum(Donation.amount).label('amount'),
+            func.count(func.distinct(Donation.donor_id)).label('donors')
+        ).where(
+            Donation.payment_status == 'completed',
+            Donation.created_at >= first_week
+        ).group_by(donation_week).cte('weekly_donations')
         
-        # Query donations grouped by date
-        donations_by_date = self.db.query(
-            func.date(Donation.created_at).label('date'),
-            func.count(Donation.id).label('count'),
-            func.coalesce(func.sum(Donation.amount), 0).label('amount')
-        ).filter(
-            Donation.created_at >= start_date,
+        # Campaigns created before the first week are counted in it, so the running sum starts there
+        campaign_week = func.greatest(func.date_trunc('week', Campaign.created_at), first_week)
+        weekly_campaigns = select(
+            campaign_week.label('week_start'),
+            func.count(Campaign.id).label('created')
+        ).where(
+            Campaign.status.in_([CampaignStatus.ACTIVE, CampaignStatus.COMPLETED])
+        ).group_by(campaign_week).cte('weekly_campaigns')
+        
+        total_campaigns = select(func.count(Campaign.id)).scalar_subquery()
+        total_donors = select(func.count(func.distinct(Donation.donor_id))).where(
             Donation.payment_status == 'completed'
-        ).group_by(func.date(Donation.created_at)).all()
+        ).scalar_subquery()
+        
+        rows = (await self.db.execute(
+            select(
+                week_starts.c.week_start,
+                func.coalesce(weekly_donations.c.amount, 0).label('donations'),
+                func.coalesce(weekly_donations.c.donors, 0).label('donors'),
+                func.sum(func.coalesce(weekly_campaigns.c.created, 0)).over(order_by=week_starts.c.week_start).label('campaigns'),
+                total_campaigns.label('total_campaigns'),
+                total_donors.label('total_donors')
+            ).select_from(
+                week_starts
+                .outerjoin(weekly_donations, weekly_donations.c.week_start == week_starts.c.week_start)
+                .outerjoin(weekly_campaigns, weekly_campaigns.c.week_start == week_starts.c.week_start)
+            ).order_by(week_starts.c.week_start)
+        )).all()
+        
+        weekly_stats = [
+            {
+                'period': row.week_start.strftime('%Y-%m-%d'),
+                'donations': float(row.donations),
+                'campaigns': int(row.campaigns),
+                'donors': row.donors
+            }
+            for row in rows
+        ]
+        
+        return {
+            'weekly_stats': weekly_stats,
+            'total_donations': sum(week['donations'] for week in weekly_stats),
+            'total_campaigns': rows[0].total_campaigns if rows else 0,
+            'total_donors': rows[0].total_donors if rows else 0
+        }
+    
+    async def get_donation_trends(self, days: int = 30) -> List[Dict[str, Any]]:
+        """Get donation trends over the specified number of UTC days, from the daily rollup."""
+        end_date = datetime.now(timezone.utc).date()
+        start_date = end_date - timedelta(days=days-1)
+        
+        # One row per day with donations, read from the daily buckets
+        donations_by_date = (await self.db.execute(
+            select(
+                ActivityRollup.bucket_start,
+                ActivityRollup.donation_count,
+                ActivityRollup.donation_amount
+            ).where(
+                ActivityRollup.granularity == 'day',
+                ActivityRollup.bucket_start >= _utc_midnight(start_date)
+            )
+        )).all()
         
         # Create a dictionary for quick lookup
         donations_dict = {
-            donation.date: {
-                'count': donation.count,
-                'amount': float(donation.amount)
+            bucket.bucket_start.astimezone(timezone.utc).date(): {
+                'count': bucket.donation_count,
+                'amount': float(bucket.donation_amount)
             }
-            for donation in donations_by_date
+            for bucket in donations_by_date
         }
         
         # Generate data for all days in range
@@ -116,12 +210,14 @@ class AnalyticsService:
         
         return result
     
-    def get_campaign_status_distribution(self) -> List[Dict[str, Any]]:
+    async def get_campaign_status_distribution(self) -> List[Dict[str, Any]]:
         """Get campaign distribution by status."""
-        status_counts = self.db.query(
-            Campaign.status,
-            func.count(Campaign.id).label('count')
-        ).group_by(Campaign.status).all()
+        status_counts = (await self.db.execute(
+            select(
+                Campaign.status,
+                func.count(Campaign.id).label('count')
+            ).group_by(Campaign.status)
+        )).all()
         
         # Define colors and labels for each status
         status_config = {
@@ -144,53 +240,52 @@ class AnalyticsService:
         
         return result
     
-    def get_category_distribution(self) -> List[Dict[str, Any]]:
-        """Get campaign distribution by category."""
-        # Query campaigns with their categories
-        category_counts = self.db.query(
-            Category.name,
-            Category.color,
-            func.count(Campaign.id).label('count')
-        ).join(
-            Campaign.categories
-        ).group_by(Category.id, Category.name, Category.color).all()
+    async def get_category_distribution(self) -> List[Dict[str, Any]]:
+        """Get campaign count and amount raised (sum of current_amount) per category, in one grouped query."""
+        category_counts = (await self.db.execute(
+            select(
+                Category.name,
+                Category.color,
+                func.count(Campaign.id).label('count'),
+                func.coalesce(func.sum(Campaign.current_amount), 0).label('amount')
+            ).select_from(Category).join(
+                campaign_categories, campaign_categories.c.category_id == Category.id
+            ).join(
+                Campaign, Campaign.id == campaign_categories.c.campaign_id
+            ).group_by(Category.id, Category.name, Category.color)
+        )).all()
         
         result = []
-        for category_name, color, count in category_counts:
+        for category_name, color, count, amount in category_counts:
             result.append({
                 'category': category_name,
                 'count': count,
+                'amount': float(amount),
                 'fill': color or '#64748b'  # Fallback color if none set
             })
         
         return result
     
-    def get_monthly_revenue_trends(self, months: int = 12) -> List[Dict[str, Any]]:
-        """Get monthly revenue trends."""
-        # Calculate start date
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=months * 30)
-        
-        # Query donations grouped by month
-        monthly_revenue = self.db.query(
-            extract('year', Donation.created_at).label('year'),
-            extract('month', Donation.created_at).label('month'),
-            func.coalesce(func.sum(Donation.amount), 0).label('revenue'),
-            func.count(Donation.id).label('donation_count')
-        ).filter(
-            Donation.created_at >= start_date,
-            Donation.payment_status == 'completed'
-        ).group_by(
-            extract('year', Donation.created_at),
-            extract('month', Donation.created_at)
-        ).order_by(
-            extract('year', Donation.created_at),
-            extract('month', Donation.created_at)
-        ).all()
+    async def get_monthly_revenue_trends(self, months: int = 12) -> List[Dict[str, Any]]:
+        """Get monthly revenue trends from the monthly rollup."""
+        # Whole UTC months, starting with the one that was current about `months` months ago
+        start_month = (datetime.now(timezone.utc) - timedelta(days=months * 30)).date().replace(day=1)
+        
+        monthly_revenue = (await self.db.execute(
+            select(
+                ActivityRollup.bucket_start,
+                ActivityRollup.donation_amount,
+                ActivityRollup.donation_count
+            ).where(
+                ActivityRollup.granularity == 'month',
+                ActivityRollup.bucket_start >= _utc_midnight(start_month),
+                ActivityRollup.donation_count > 0
+            ).order_by(ActivityRollup.bucket_start)
+        )).all()
         
         result = []
-        for year, month, revenue, count in monthly_revenue:
-            month_name = datetime(int(year), int(month), 1).strftime('%b %Y')
+        for month_start, revenue, count in monthly_revenue:
+            month_name = month_start.astimezone(timezone.utc).strftime('%b %Y')
             result.append({
                 'month': month_name,
                 'revenue': float(revenue),
@@ -199,24 +294,26 @@ class AnalyticsService:
         
         return result
     
-    def get_top_campaigns(self, limit: int = 5) -> List[Dict[str, Any]]:
+    async def get_top_campaigns(self, limit: int = 5) -> List[Dict[str, Any]]:
         """Get top campaigns by donation amount."""
-        top_campaigns = self.db.query(
-            Campaign.id,
-            Campaign.title,
-            Campaign.target_amount,
-            Campaign.current_amount,
-            Campaign.status,
-            func.count(Donation.id).label('donation_count')
-        ).join(
-            Donation, Campaign.id == Donation.campaign_id
-        ).filter(
-            Donation.payment_status == 'completed'
-        ).group_by(
-            Campaign.id
-        ).order_by(
-            Campaign.current_amount.desc()
-        ).limit(limit).all()
+        top_campaigns = (await self.db.execute(
+            select(
+                Campaign.id,
+                Campaign.title,
+                Campaign.target_amount,
+                Campaign.current_amount,
+                Campaign.status,
+                func.count(Donation.id).label('donation_count')
+            ).join(
+                Donation, Campaign.id == Donation.campaign_id
+            ).where(
+                Donation.payment_status == 'completed'
+            ).group_by(
+                Campaign.id
+            ).order_by(
+                Campaign.current_amount.desc()
+            ).limit(limit)
+        )).all()
         
         result = []
         for campaign in top_campaigns:
@@ -236,25 +333,36 @@ class AnalyticsService:
         
         return result
     
-    def get_user_growth(self, days: int = 30) -> List[Dict[str, Any]]:
-        """Get user registration trends."""
-        end_date = datetime.now().date()
+    async def get_user_growth(self, days: int = 30) -> List[Dict[str, Any]]:
+        """Get user registration trends over the specified number of UTC days, from the daily rollup."""
+        end_date = datetime.now(timezone.utc).date()
         start_date = end_date - timedelta(days=days-1)
         
-        # Query user registrations grouped by date
-        users_by_date = self.db.query(
-            func.date(User.created_at).label('date'),
-            func.count(User.id).label('new_users')
-        ).filter(
-            User.created_at >= start_date
-        ).group_by(func.date(User.created_at)).all()
+        # New users per day in the range, plus everyone who signed up before it
+        users_by_date = (await self.db.execute(
+            select(ActivityRollup.bucket_start, ActivityRollup.new_users).where(
+                ActivityRollup.granularity == 'day',
+                ActivityRollup.bucket_start >= _utc_midnight(start_date)
+            )
+        )).all()
         
         # Create a dictionary for quick lookup
-        users_dict = {user.date: user.new_users for user in users_by_date}
+        users_dict = {bucket.bucket_start.astimezone(timezone.utc).date(): bucket.new_users for bucket in users_by_date}
         
-        # Generate data for all days in range
+        # Generate data for all days in range; months before the range are summed from the monthly buckets
         result = []
-        cumulative_users = self.db.query(User).filter(User.created_at < start_date).count()
+        cumulative_users = await self.db.scalar(
+            select(func.coalesce(func.sum(ActivityRollup.new_users), 0)).where(
+                or_(
+                    and_(ActivityRollup.granularity == 'month', ActivityRollup.bucket_start < _utc_midnight(start_date.replace(day=1))),
+                    and_(
+                        ActivityRollup.granularity == 'day',
+                        ActivityRollup.bucket_start >= _utc_midnight(start_date.replace(day=1)),
+                        ActivityRollup.bucket_start < _utc_midnight(start_date)
+                    )
+                )
+            )
+        )
         
         for i in range(days):
             date = start_date + timedelta(days=i)
@@ -270,16 +378,42 @@ class AnalyticsService:
         
         return result
 
-def get_analytics_data(db: Session) -> Dict[str, Any]:
-    """Get all analytics data for the admin dashboard."""
-    analytics = AnalyticsService(db)
+# Dashboard sections: name -> (report, value used when the section is unavailable)
+ANALYTICS_SECTIONS = {
+    'overview': (lambda analytics: analytics.get_overview_stats(), {}),
+    'donation_trends': (lambda analytics: analytics.get_donation_trends(30), []),
+    'campaign_status': (lambda analytics: analytics.get_campaign_status_distribution(), []),
+    'category_distribution': (lambda analytics: analytics.get_category_distribution(), []),
+    'monthly_revenue': (lambda analytics: analytics.get_monthly_revenue_trends(12), []),
+    'top_campaigns': (lambda analytics: analytics.get_top_campaigns(5), []),
+    'user_growth': (lambda analytics: analytics.get_user_growth(30), []),
+}
+
+async def _run_section(name: str, report, timeout: float):
+    """Run one dashboard section on its own pooled connection."""
+    async with AsyncSessionLocal() as db:
+        return await asyncio.wait_for(report(AnalyticsService(db)), timeout)
+
+async def get_analytics_data(timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Get all analytics data for the admin dashboard.
+
+    The sections run concurrently, each on its own session, so the latency is that of the
+    slowest one. A section that fails or takes longer than `timeout` seconds gets its empty
+    value and is listed under 'unavailable' instead of failing the whole dashboard.
+    """
+    timeout = timeout or settings.ANALYTICS_SECTION_TIMEOUT
+    results = await asyncio.gather(
+        *(_run_section(name, report, timeout) for name, (report, _) in ANALYTICS_SECTIONS.items()),
+        return_exceptions=True
+    )
     
-    return {
-        'overview': analytics.get_overview_stats(),
-        'donation_trends': analytics.get_donation_trends(30),
-        'campaign_status': analytics.get_campaign_status_distribution(),
-        'category_distribution': analytics.get_category_distribution(),
-        'monthly_revenue': analytics.get_monthly_revenue_trends(12),
-        'top_campaigns': analytics.get_top_campaigns(5),
-        'user_growth': analytics.get_user_growth(30)
-    }
+    data = {'unavailable': []}
+    for (name, (_, empty)), result in zip(ANALYTICS_SECTIONS.items(), results):
+        if isinstance(result, BaseException):
+            reason = "timed out" if isinstance(result, asyncio.TimeoutError) else repr(result)
+            print(f"❌ Analytics section {name} unavailable: {reason}")
+            data[name] = empty
+            data['unavailable'].append(name)
+        else:
+            data[name] = result
+    return data
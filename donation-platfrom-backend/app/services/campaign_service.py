@@ -1,13 +1,155 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only, selectinload, with_expression
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSQUERY
+from sqlalchemy import and_, case, cast, func, literal, literal_column, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql import ClauseElement
 from typing import List, Optional, Tuple
 from datetime import datetime
+from functools import reduce
+import base64
+import binascii
+import json
 import math
+import random
 
-from app.db.models.campaign import Campaign, CampaignStatus
+from app.core.config import settings
+from app.db.models.amount_shard import CampaignAmountShard
+from app.db.models.campaign import Campaign, CampaignStatus, SEARCH_CONFIGS, search_config_sql
 from app.schemas.campaign import CampaignCreate, CampaignUpdate, PaginationMeta
+from app.services.donation_stats_service import fold_campaign_stats, get_campaigns_with_pending_stats
+from app.services.outbox_service import enqueue_campaign_notification
 
-def create_campaign(db: Session, campaign_data: CampaignCreate, creator_id: int):
+# Fields selectable with `fields=` on campaign listings
+CAMPAIGN_FIELDS = (
+    "title", "description", "markdown_text", "target_amount", "current_amount", "start_date",
+    "end_date", "image_path", "status", "lang", "creator_id", "created_at", "updated_at", "categories",
+    "donation_stats"
+)
+# What campaign cards render; notably excludes the markdown_text body
+CAMPAIGN_CARD_FIELDS = (
+    "title", "description", "target_amount", "current_amount", "start_date", "end_date",
+    "image_path", "status", "lang", "created_at", "categories", "donation_stats"
+)
+
+def resolve_fields(fields: Optional[str], default: Tuple[str, ...] = CAMPAIGN_FIELDS) -> Tuple[str, ...]:
+    """Parse a comma-separated `fields=` value; raises ValueError on unknown fields."""
+    if not fields:
+        return default
+    requested = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip() and f.strip() != "id"))
+    unknown = [f for f in requested if f not in CAMPAIGN_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown campaign fields: {', '.join(unknown)}")
+    return requested
+
+def campaign_loaders(with_creator: bool = False, fields: Optional[Tuple[str, ...]] = None) -> list:
+    """Loader options for relationships serialized by the campaign schemas.
+
+    Categories are batch-loaded with one extra SELECT ... IN for the whole page, and the
+    creator (many-to-one) is joined into the main query, so a listing costs a constant
+    number of queries regardless of page size. With `fields`, only those columns (plus the
+    id and created_at keyset) are selected and categories are loaded only if requested;
+    requested donation stats are joined into the main query as well.
+    """
+    if fields is None:
+        options = [selectinload(Campaign.categories)]
+    else:
+        columns = {"created_at", *fields} - {"categories", "donation_stats"}
+        options = [load_only(*(getattr(Campaign, name) for name in sorted(columns)))]
+        if "categories" in fields:
+            options.append(selectinload(Campaign.categories))
+        if "donation_stats" in fields:
+            options.append(joinedload(Campaign.donation_stats))
+    if with_creator:
+        options.append(joinedload(Campaign.creator))
+    return options
+
+async def _reload_campaign(db: AsyncSession, campaign_id: int) -> Optional[Campaign]:
+    """Reload a campaign with server-generated values and its categories after a commit."""
+    result = await db.execute(
+        select(Campaign)
+        .options(*campaign_loaders())
+        .where(Campaign.id == campaign_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+def encode_cursor(campaign: Campaign) -> str:
+    """Opaque keyset cursor pointing just after `campaign` in (created_at, id) descending order."""
+    raw = json.dumps([campaign.created_at.isoformat(), campaign.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor from `encode_cursor`; raises ValueError if it is malformed."""
+    try:
+        created_at, campaign_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), int(campaign_id)
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+async def _paginate(
+    db: AsyncSession,
+    query,
+    page: int,
+    page_size: int,
+    cursor: Optional[str] = None,
+    include_total: Optional[bool] = None,
+    with_creator: bool = False,
+    fields: Optional[Tuple[str, ...]] = None
+) -> Tuple[List[Campaign], PaginationMeta]:
+    """Run a campaign query with page-number or keyset (cursor) pagination metadata.
+
+    With a cursor the page starts after the cursor's (created_at, id) instead of using OFFSET,
+    and the total count is skipped unless `include_total` is set. `has_next` comes from fetching
+    one extra row, so it never needs the count.
+    """
+    keyset = decode_cursor(cursor) if cursor else None
+    if include_total is None:
+        include_total = keyset is None
+    
+    # Get total count
+    total_items = None
+    if include_total:
+        total_items = await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+    
+    query = query.options(*campaign_loaders(with_creator, fields)).order_by(Campaign.created_at.desc(), Campaign.id.desc())
+    if keyset:
+        query = query.where(tuple_(Campaign.created_at, Campaign.id) < tuple_(*keyset))
+    else:
+        query = query.offset((page - 1) * page_size)
+    
+    # Get paginated results plus one row to detect the next page
+    result = await db.execute(query.limit(page_size + 1))
+    campaigns = result.scalars().all()
+    has_next = len(campaigns) > page_size
+    campaigns = campaigns[:page_size]
+    
+    # Create pagination metadata
+    pagination = _pagination_meta(page, page_size, total_items, has_next, keyset is not None)
+    pagination.next_cursor = encode_cursor(campaigns[-1]) if has_next else None
+    
+    return campaigns, pagination
+
+def _pagination_meta(
+    page: int,
+    page_size: int,
+    total_items: Optional[int],
+    has_next: bool,
+    keyset: bool = False
+) -> PaginationMeta:
+    """Pagination metadata for a page fetched with one extra row to detect `has_next`."""
+    return PaginationMeta(
+        current_page=None if keyset else page,
+        page_size=page_size,
+        total_items=total_items,
+        total_pages=(math.ceil(total_items / page_size) if total_items > 0 else 1) if total_items is not None else None,
+        has_next=has_next,
+        has_previous=keyset or page > 1,
+        next_page=page + 1 if has_next and not keyset else None,
+        previous_page=page - 1 if page > 1 and not keyset else None
+    )
+
+async def create_campaign(db: AsyncSession, campaign_data: CampaignCreate, creator_id: int):
     """Create a new campaign."""
     # Create campaign instance
     db_campaign = Campaign(
@@ -25,138 +167,104 @@ def create_campaign(db: Session, campaign_data: CampaignCreate, creator_id: int)
     
     # Save to DB
     db.add(db_campaign)
-    db.commit()
-    db.refresh(db_campaign)
+    await db.flush()
     
-    # Send email notification if campaign is active (only for newly published campaigns)
+    # Queue email notification if campaign is active (only for newly published campaigns)
     if db_campaign.status == CampaignStatus.ACTIVE:
-        try:
-            from app.services.email_service import email_service
-            email_service.send_new_campaign_notification(db, db_campaign)
-        except Exception as e:
-            print(f"Failed to send new campaign notification: {e}")
+        enqueue_campaign_notification(db, "new_campaign", db_campaign)
     
-    return db_campaign
+    await db.commit()
+    return await _reload_campaign(db, db_campaign.id)
 
-def get_campaign_by_id(db: Session, campaign_id: int):
+async def get_campaign_by_id(db: AsyncSession, campaign_id: int):
     """Get a campaign by ID."""
-    return db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    result = await db.execute(
+        select(Campaign)
+        .options(*campaign_loaders())
+        .where(Campaign.id == campaign_id)
+    )
+    return result.scalar_one_or_none()
 
-def get_campaigns_paginated(
-    db: Session, 
+async def get_campaigns_paginated(
+    db: AsyncSession, 
     page: int = 1,
     page_size: int = 10,
     status: Optional[CampaignStatus] = None,
-    lang: Optional[str] = None
+    lang: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: Optional[bool] = None,
+    with_creator: bool = False,
+    fields: Optional[Tuple[str, ...]] = None
 ) -> Tuple[List[Campaign], PaginationMeta]:
     """Get campaigns with proper pagination metadata and optional language filter."""
     # Build base query
-    query = db.query(Campaign)
+    query = select(Campaign)
     
     if status:
-        query = query.filter(Campaign.status == status)
+        query = query.where(Campaign.status == status)
     
     if lang:
-        query = query.filter(Campaign.lang == lang)
-    
-    # Get total count
-    total_items = query.count()
-    
-    # Calculate pagination values
-    total_pages = math.ceil(total_items / page_size) if total_items > 0 else 1
-    skip = (page - 1) * page_size
-    
-    # Get paginated results
-    campaigns = query.order_by(Campaign.created_at.desc()).offset(skip).limit(page_size).all()
+        query = query.where(Campaign.lang == lang)
     
-    # Create pagination metadata
-    pagination = PaginationMeta(
-        current_page=page,
-        page_size=page_size,
-        total_items=total_items,
-        total_pages=total_pages,
-        has_next=page < total_pages,
-        has_previous=page > 1,
-        next_page=page + 1 if page < total_pages else None,
-        previous_page=page - 1 if page > 1 else None
-    )
-    
-    return campaigns, pagination
+    return await _paginate(db, query, page, page_size, cursor, include_total, with_creator, fields)
 
-def get_campaigns_by_creator_paginated(
-    db: Session, 
+async def get_campaigns_by_creator_paginated(
+    db: AsyncSession, 
     creator_id: int,
     page: int = 1,
     page_size: int = 10,
-    lang: Optional[str] = None
+    lang: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: Optional[bool] = None,
+    fields: Optional[Tuple[str, ...]] = None
 ) -> Tuple[List[Campaign], PaginationMeta]:
     """Get campaigns by creator with proper pagination metadata and optional language filter."""
     # Build base query
-    query = db.query(Campaign).filter(Campaign.creator_id == creator_id)
+    query = select(Campaign).where(Campaign.creator_id == creator_id)
     
     if lang:
-        query = query.filter(Campaign.lang == lang)
+        query = query.where(Campaign.lang == lang)
     
-    # Get total count
-    total_items = query.count()
-    
-    # Calculate pagination values
-    total_pages = math.ceil(total_items / page_size) if total_items > 0 else 1
-    skip = (page - 1) * page_size
-    
-    # Get paginated results
-    campaigns = query.order_by(Campaign.created_at.desc()).offset(skip).limit(page_size).all()
-    
-    # Create pagination metadata
-    pagination = PaginationMeta(
-        current_page=page,
-        page_size=page_size,
-        total_items=total_items,
-        total_pages=total_pages,
-        has_next=page < total_pages,
-        has_previous=page > 1,
-        next_page=page + 1 if page < total_pages else None,
-        previous_page=page - 1 if page > 1 else None
-    )
-    
-    return campaigns, pagination
+    return await _paginate(db, query, page, page_size, cursor, include_total, fields=fields)
 
-def get_campaigns(
-    db: Session, 
+async def get_campaigns(
+    db: AsyncSession, 
     skip: int = 0, 
     limit: int = 100,
     status: Optional[CampaignStatus] = None,
     lang: Optional[str] = None
 ) -> List[Campaign]:
     """Get all campaigns with optional filtering by status and language (legacy method)."""
-    query = db.query(Campaign)
+    query = select(Campaign).options(*campaign_loaders())
     
     if status:
-        query = query.filter(Campaign.status == status)
+        query = query.where(Campaign.status == status)
     
     if lang:
-        query = query.filter(Campaign.lang == lang)
+        query = query.where(Campaign.lang == lang)
     
-    return query.order_by(Campaign.created_at.desc()).offset(skip).limit(limit).all()
+    result = await db.execute(query.order_by(Campaign.created_at.desc()).offset(skip).limit(limit))
+    return result.scalars().all()
 
-def get_campaigns_by_creator(
-    db: Session, 
+async def get_campaigns_by_creator(
+    db: AsyncSession, 
     creator_id: int,
     skip: int = 0, 
     limit: int = 100,
     lang: Optional[str] = None
 ) -> List[Campaign]:
     """Get all campaigns created by a specific user (legacy method)."""
-    query = db.query(Campaign).filter(Campaign.creator_id == creator_id)
+    query = select(Campaign).options(*campaign_loaders()).where(Campaign.creator_id == creator_id)
     
     if lang:
-        query = query.filter(Campaign.lang == lang)
+        query = query.where(Campaign.lang == lang)
     
-    return query.order_by(Campaign.created_at.desc()).offset(skip).limit(limit).all()
+    result = await db.execute(query.order_by(Campaign.created_at.desc()).offset(skip).limit(limit))
+    return result.scalars().all()
 
-def update_campaign(db: Session, campaign_id: int, campaign_data: CampaignUpdate):
+async def update_campaign(db: AsyncSession, campaign_id: int, campaign_data: CampaignUpdate):
     """Update an existing campaign."""
-    db_campaign = get_campaign_by_id(db, campaign_id)
+    db_campaign = await get_campaign_by_id(db, campaign_id)
     if not db_campaign:
         return None
     
@@ -171,118 +279,293 @@ def update_campaign(db: Session, campaign_id: int, campaign_data: CampaignUpdate
     # Update the updated_at timestamp
     db_campaign.updated_at = datetime.now()
     
-    # Save changes
-    db.commit()
-    db.refresh(db_campaign)
+    # Queue email notifications based on status changes
+    # If campaign was just published (changed from non-active to active)
+    if previous_status != CampaignStatus.ACTIVE and db_campaign.status == CampaignStatus.ACTIVE:
+        enqueue_campaign_notification(db, "new_campaign", db_campaign)
     
-    # Send email notifications based on status changes
-    try:
-        from app.services.email_service import email_service
-        
-        # If campaign was just published (changed from non-active to active)
-        if previous_status != CampaignStatus.ACTIVE and db_campaign.status == CampaignStatus.ACTIVE:
-            email_service.send_new_campaign_notification(db, db_campaign)
-        
-        # If campaign was just completed
-        elif previous_status != CampaignStatus.COMPLETED and db_campaign.status == CampaignStatus.COMPLETED:
-            email_service.send_campaign_completed_notification(db, db_campaign)
-    except Exception as e:
-        print(f"Failed to send campaign update notification: {e}")
-    
-    return db_campaign
-
-def delete_campaign(db: Session, campaign_id: int):
+    # If campaign was just completed
+    elif previous_status != CampaignStatus.COMPLETED and db_campaign.status == CampaignStatus.COMPLETED:
+        enqueue_campaign_notification(db, "campaign_completed", db_campaign)
+    
+    # Save changes together with any queued notification
+    await db.commit()
+    return await _reload_campaign(db, campaign_id)
+
+async def delete_campaign(db: AsyncSession, campaign_id: int):
     """Delete a campaign."""
-    db_campaign = get_campaign_by_id(db, campaign_id)
+    # Relationships touched by the unit of work must be loaded up front in async mode
+    db_campaign = await db.get(
+        Campaign,
+        campaign_id,
+        options=[selectinload(Campaign.categories), selectinload(Campaign.donations)]
+    )
     if not db_campaign:
         return False
     
-    db.delete(db_campaign)
-    db.commit()
+    await db.delete(db_campaign)
+    await db.commit()
     
     return True
 
-def update_campaign_amount(db: Session, campaign_id: int, amount: float):
-    """Update the current_amount of a campaign when a donation is made."""
-    db_campaign = get_campaign_by_id(db, campaign_id)
-    if not db_campaign:
-        return None
+async def update_campaign_amount(db: AsyncSession, campaign_id: int, amount: float) -> bool:
+    """Add a donation to the campaign total in the caller's transaction (nothing is committed).
+
+    The increment and the ACTIVE -> COMPLETED transition happen in a single UPDATE, so
+    concurrent donations never lose updates. With CAMPAIGN_AMOUNT_SHARDS set, the amount
+    goes to a random shard row first and is folded into the campaign when its row is free.
+    Returns False if the campaign does not exist.
+    """
+    row = (await db.execute(select(campaign_total_cte(campaign_id, amount)))).first()
+    if row is None:
+        return False
     
-    # Store previous status for comparison
-    previous_status = db_campaign.status
+    await apply_campaign_total(db, row)
+    return True
+
+def _sql_value(value):
+    """A SQL expression as is, or a Python value as a bound literal."""
+    return value if isinstance(value, ClauseElement) else literal(value)
+
+def campaign_total_cte(campaign_id, amount):
+    """CTE adding a donation amount to a campaign total, per CAMPAIGN_AMOUNT_SHARDS.
+
+    Either `campaign_increment_cte` or an upsert into a random shard row. Arguments may be
+    SQL expressions; the CTE returns the campaign as `id`. Hand the resulting row to
+    `apply_campaign_total` in the same transaction.
+    """
+    if settings.CAMPAIGN_AMOUNT_SHARDS > 1:
+        shard = random.randrange(settings.CAMPAIGN_AMOUNT_SHARDS)
+        insert = pg_insert(CampaignAmountShard).from_select(
+            ["campaign_id", "shard", "amount"],
+            select(_sql_value(campaign_id), literal(shard), _sql_value(amount))
+        )
+        return (
+            insert.on_conflict_do_update(
+                index_elements=[CampaignAmountShard.campaign_id, CampaignAmountShard.shard],
+                set_={"amount": CampaignAmountShard.amount + insert.excluded.amount}
+            )
+            .returning(CampaignAmountShard.campaign_id.label("id"))
+            .cte("campaign_total")
+        )
+    return campaign_increment_cte(campaign_id, amount)
+
+async def apply_campaign_total(db: AsyncSession, row) -> None:
+    """Finish a `campaign_total_cte` increment: fold the shards, or queue the completion email."""
+    if settings.CAMPAIGN_AMOUNT_SHARDS > 1:
+        await fold_campaign_amount_shards(db, row.id)
+    else:
+        queue_completion_email(db, row)
+
+# Columns returned by the increment for the completion email snapshot
+_SNAPSHOT_COLUMNS = ("id", "title", "description", "target_amount", "current_amount", "end_date", "lang", "status")
+
+def campaign_increment_cte(campaign_id, amount):
+    """Data-modifying CTE that adds `amount` to a campaign total in a single UPDATE.
+
+    An ACTIVE campaign reaching its target becomes COMPLETED in the same statement. Both
+    arguments may be SQL expressions, e.g. columns of an INSERT ... RETURNING CTE, so the
+    increment can ride along with the statement that records the donation. The CTE returns
+    the snapshot columns plus `previous_status`; pass the row to `queue_completion_email`.
+    """
+    # Lock the row first so the status returned is the one this UPDATE replaces
+    previous = (
+        select(Campaign.id, Campaign.status, _sql_value(amount).label("amount"))
+        .where(Campaign.id == campaign_id)
+        .with_for_update(of=Campaign, key_share=True)
+        .cte("previous")
+    )
+    new_amount = func.coalesce(Campaign.current_amount, 0.0) + previous.c.amount
+    return (
+        update(Campaign)
+        .where(Campaign.id == previous.c.id)
+        .values(
+            current_amount=new_amount,
+            status=case(
+                (
+                    and_(Campaign.status == CampaignStatus.ACTIVE, new_amount >= Campaign.target_amount),
+                    literal(CampaignStatus.COMPLETED, Campaign.status.type)
+                ),
+                else_=Campaign.status
+            )
+        )
+        .returning(*(getattr(Campaign, name) for name in _SNAPSHOT_COLUMNS), previous.c.status.label("previous_status"))
+        .cte("campaign_total")
+    )
+
+def queue_completion_email(db: AsyncSession, row) -> None:
+    """Queue the completion notification if the increment in `row` just completed the campaign."""
+    if row.previous_status != CampaignStatus.COMPLETED and row.status == CampaignStatus.COMPLETED:
+        campaign = Campaign(**{name: getattr(row, name) for name in _SNAPSHOT_COLUMNS})
+        enqueue_campaign_notification(db, "campaign_completed", campaign)
+
+async def _increment_campaign_amount(db: AsyncSession, campaign_id: int, amount: float) -> bool:
+    """Atomically add `amount` and complete an active campaign that reaches its target."""
+    total = campaign_increment_cte(campaign_id, amount)
+    row = (await db.execute(select(total))).first()
+    if row is None:
+        return False
     
-    # Add the donation amount to the current amount
-    db_campaign.current_amount += amount
-    
-    # Check if target is met and update status if needed
-    if db_campaign.current_amount >= db_campaign.target_amount and db_campaign.status == CampaignStatus.ACTIVE:
-        db_campaign.status = CampaignStatus.COMPLETED
-        
-    # Save changes
-    db.commit()
-    db.refresh(db_campaign)
-    
-    # Send completion notification if campaign just completed
-    if previous_status != CampaignStatus.COMPLETED and db_campaign.status == CampaignStatus.COMPLETED:
-        try:
-            from app.services.email_service import email_service
-            email_service.send_campaign_completed_notification(db, db_campaign)
-        except Exception as e:
-            print(f"Failed to send campaign completion notification: {e}")
-    
-    return db_campaign
-
-def search_campaigns(
-    db: Session, 
+    queue_completion_email(db, row)
+    return True
+
+async def fold_campaign_amount_shards(db: AsyncSession, campaign_id: int) -> float:
+    """Move a campaign's shard amounts into current_amount, in the caller's transaction.
+
+    Never waits: if another transaction holds the campaign row (it is folding) or a shard
+    row (a donation in flight), those are skipped and picked up by a later fold. The
+    campaign's pending donation stats are folded under the same lock.
+    Returns the folded amount.
+    """
+    locked = await db.scalar(
+        select(Campaign.id).where(Campaign.id == campaign_id).with_for_update(skip_locked=True, key_share=True)
+    )
+    if locked is None:
+        return 0.0
+    
+    pending = (
+        select(CampaignAmountShard.campaign_id, CampaignAmountShard.shard, CampaignAmountShard.amount)
+        .where(CampaignAmountShard.campaign_id == campaign_id, CampaignAmountShard.amount != 0)
+        .with_for_update(skip_locked=True)
+        .subquery()
+    )
+    result = await db.execute(
+        update(CampaignAmountShard)
+        .where(CampaignAmountShard.campaign_id == pending.c.campaign_id, CampaignAmountShard.shard == pending.c.shard)
+        .values(amount=0)
+        .returning(pending.c.amount)
+        .execution_options(synchronize_session=False)
+    )
+    folded = sum(result.scalars().all())
+    if folded:
+        await _increment_campaign_amount(db, campaign_id, folded)
+    await fold_campaign_stats(db, campaign_id)
+    return folded
+
+async def get_campaigns_with_unfolded_amounts(db: AsyncSession) -> List[int]:
+    """IDs of campaigns that have donations waiting in shard rows or for their stats."""
+    result = await db.execute(
+        select(CampaignAmountShard.campaign_id).where(CampaignAmountShard.amount != 0).distinct()
+    )
+    return sorted(set(result.scalars().all()) | set(await get_campaigns_with_pending_stats(db)))
+
+# ts_headline options for search snippets; matches are wrapped in <mark> in HTML-escaped text
+SNIPPET_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+def _search_tsquery(keyword: str, lang: Optional[str]):
+    """Parse a search box keyword with the text search configuration of `lang`.
+
+    Without a language, the keyword is parsed with every configuration and the queries are
+    OR-ed, so each campaign matches against the stems of its own language.
+    """
+    configs = [SEARCH_CONFIGS.get(lang, "simple")] if lang else [*SEARCH_CONFIGS.values(), "simple"]
+    queries = [func.websearch_to_tsquery(cast(literal(config), REGCONFIG), keyword) for config in configs]
+    return reduce(lambda a, b: a.op("||", return_type=TSQUERY)(b), queries)
+
+def _html_escape_sql(expr):
+    return func.replace(func.replace(func.replace(expr, "&", "&amp;"), "<", "&lt;"), ">", "&gt;")
+
+async def search_campaigns(
+    db: AsyncSession, 
     keyword: str,
     page: int = 1,
     page_size: int = 10,
     status: Optional[CampaignStatus] = None,
-    lang: Optional[str] = None
+    lang: Optional[str] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+    include_total: bool = True
 ) -> Tuple[List[Campaign], PaginationMeta]:
-    """Search campaigns by keyword with proper pagination metadata and optional language filter."""
-    # Build base query
-    query = db.query(Campaign)
-    
-    # Apply search filter if keyword provided
-    if keyword and keyword.strip():
-        search_term = f"%{keyword.strip()}%"
-        query = query.filter(
-            or_(
-                Campaign.title.ilike(search_term),
-                Campaign.description.ilike(search_term),
-                Campaign.markdown_text.ilike(search_term)
-            )
-        )
-    
-    # Apply status filter if provided
+    """Full-text search over campaigns, best matches first, with an optional language filter.
+
+    Matching uses the GIN-indexed `search_vector` column (title weighted above description
+    above content). Ranking runs over the matches only, and the highlighted `search_snippet`
+    is computed just for the rows of the requested page. A blank keyword lists campaigns.
+    """
+    # Build base filters
+    filters = []
     if status:
-        query = query.filter(Campaign.status == status)
-    
-    # Apply language filter if provided
+        filters.append(Campaign.status == status)
     if lang:
-        query = query.filter(Campaign.lang == lang)
+        filters.append(Campaign.lang == lang)
+    
+    if not keyword or not keyword.strip():
+        return await _paginate(db, select(Campaign).where(*filters), page, page_size, include_total=include_total, fields=fields)
+    
+    tsquery = _search_tsquery(keyword.strip(), lang)
+    rank = func.ts_rank_cd(Campaign.search_vector, tsquery)
+    matches = select(Campaign.id, rank.label("rank"), Campaign.created_at).where(
+        Campaign.search_vector.bool_op("@@")(tsquery), *filters
+    )
     
     # Get total count
-    total_items = query.count()
+    total_items = None
+    if include_total:
+        total_items = await db.scalar(select(func.count()).select_from(matches.subquery()))
+    
+    # Rank the matches and keep one page of ids (plus one row to detect the next page)
+    ranked = (
+        matches
+        .order_by(rank.desc(), Campaign.created_at.desc(), Campaign.id.desc())
+        .offset((page - 1) * page_size)
+        .limit(page_size + 1)
+        .subquery()
+    )
     
-    # Calculate pagination values
-    total_pages = math.ceil(total_items / page_size) if total_items > 0 else 1
-    skip = (page - 1) * page_size
+    document = _html_escape_sql(func.coalesce(Campaign.description, "") + " " + func.coalesce(Campaign.markdown_text, ""))
+    snippet = func.ts_headline(
+        literal_column(search_config_sql("campaigns.lang"), REGCONFIG), document, tsquery, SNIPPET_OPTIONS
+    )
+    query = (
+        select(Campaign)
+        .join(ranked, ranked.c.id == Campaign.id)
+        .options(
+            *campaign_loaders(fields=fields),
+            with_expression(Campaign.search_rank, ranked.c.rank),
+            with_expression(Campaign.search_snippet, snippet)
+        )
+        .order_by(ranked.c.rank.desc(), ranked.c.created_at.desc(), ranked.c.id.desc())
+    )
+    result = await db.execute(query)
+    campaigns = result.scalars().all()
+    has_next = len(campaigns) > page_size
     
-    # Get paginated results
-    campaigns = query.order_by(Campaign.created_at.desc()).offset(skip).limit(page_size).all()
+    return campaigns[:page_size], _pagination_meta(page, page_size, total_items, has_next)
+
+# Minimum pg_trgm word similarity for a title to be suggested; low enough to survive a typo or two
+SUGGEST_SIMILARITY_THRESHOLD = 0.4
+
+async def suggest_campaigns(db: AsyncSession, query: str, lang: Optional[str] = None, limit: int = 8):
+    """Top title matches for search-as-you-type, tolerant of typos.
+
+    Titles that start with the query come first, then fuzzy matches by trigram word
+    similarity. Both conditions are served by the trigram GIN index on the title.
+    Only active campaigns are suggested; returns (id, title) rows.
+    """
+    query = query.strip()
+    if not query:
+        return []
+    
+    # `<%` uses this threshold; set_config(..., true) keeps it local to the transaction
+    await db.execute(
+        text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+        {"threshold": str(SUGGEST_SIMILARITY_THRESHOLD)}
+    )
     
-    # Create pagination metadata
-    pagination = PaginationMeta(
-        current_page=page,
-        page_size=page_size,
-        total_items=total_items,
-        total_pages=total_pages,
-        has_next=page < total_pages,
-        has_previous=page > 1,
-        next_page=page + 1 if page < total_pages else None,
-        previous_page=page - 1 if page > 1 else None
+    prefix = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    is_prefix = Campaign.title.ilike(prefix, escape="\\")
+    similarity = func.word_similarity(query, Campaign.title)
+    
+    stmt = (
+        select(Campaign.id, Campaign.title)
+        .where(
+            Campaign.status == CampaignStatus.ACTIVE,
+            is_prefix | literal(query).op("<%")(Campaign.title)
+        )
+        .order_by(case((is_prefix, 0), else_=1), similarity.desc(), func.length(Campaign.title), Campaign.id)
+        .limit(limit)
     )
+    if lang:
+        stmt = stmt.where(Campaign.lang == lang)
     
-    return campaigns, pagination
\ No newline at end of file
+    result = await db.execute(stmt)
+    return result.all()
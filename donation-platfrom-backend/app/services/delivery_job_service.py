@@ -0,0 +1,81 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, update
+from typing import List, Optional
+from datetime import datetime, timezone
+
+from app.db.models.delivery_job import EmailDeliveryJob
+from app.db.models.newsletter import NewsletterSubscription
+from app.db.models.outbox import EmailOutbox
+
+def start_delivery_job(db: Session, entry: EmailOutbox) -> EmailDeliveryJob:
+    """Create the job for an outbox entry, or pick up the existing one to resume from its checkpoint."""
+    job = db.execute(
+        select(EmailDeliveryJob).where(EmailDeliveryJob.outbox_id == entry.id)
+    ).scalar_one_or_none()
+
+    if job is None:
+        total = db.scalar(
+            select(func.count(NewsletterSubscription.id)).where(NewsletterSubscription.is_active == True)
+        )
+        job = EmailDeliveryJob(
+            outbox_id=entry.id,
+            notification=entry.notification,
+            campaign_id=entry.campaign_id,
+            total_recipients=total or 0,
+            sent_count=0,
+            failed_count=0,
+            runs=0
+        )
+        db.add(job)
+    elif job.last_subscriber_id is not None:
+        print(f"↩️  Resuming delivery job #{job.id} after subscriber #{job.last_subscriber_id} "
+              f"({job.sent_count + job.failed_count}/{job.total_recipients} done)")
+
+    now = datetime.now(timezone.utc)
+    job.status = "running"
+    job.runs += 1
+    job.run_started_at = now
+    job.run_start_count = job.sent_count + job.failed_count
+    job.checkpointed_at = now
+    db.commit()
+    return job
+
+def record_chunk(db: Session, job: EmailDeliveryJob, language: str, last_subscriber_id: int, sent: int, failed: int):
+    """Checkpoint a fully processed chunk so a restart continues after it.
+
+    Runs in the caller's transaction (nothing is committed); `job` may be detached.
+    """
+    db.execute(
+        update(EmailDeliveryJob)
+        .where(EmailDeliveryJob.id == job.id)
+        .values(
+            last_language=language,
+            last_subscriber_id=last_subscriber_id,
+            sent_count=EmailDeliveryJob.sent_count + sent,
+            failed_count=EmailDeliveryJob.failed_count + failed,
+            checkpointed_at=datetime.now(timezone.utc)
+        )
+    )
+
+def finish_delivery_job(db: Session, job: EmailDeliveryJob, error: Optional[Exception] = None, final: bool = True):
+    """Close the current run in the caller's transaction; an interrupted job resumes when its outbox entry is retried."""
+    if error is None:
+        values = {"status": "completed", "completed_at": datetime.now(timezone.utc), "last_error": None}
+    else:
+        values = {"status": "failed" if final else "interrupted", "last_error": str(error)}
+    db.execute(update(EmailDeliveryJob).where(EmailDeliveryJob.id == job.id).values(**values))
+
+async def get_delivery_jobs(db: AsyncSession, page: int = 1, page_size: int = 20) -> List[EmailDeliveryJob]:
+    """Get delivery jobs, newest first."""
+    result = await db.execute(
+        select(EmailDeliveryJob)
+        .order_by(EmailDeliveryJob.id.desc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+    )
+    return result.scalars().all()
+
+async def get_delivery_job(db: AsyncSession, job_id: int) -> Optional[EmailDeliveryJob]:
+    """Get a delivery job by ID."""
+    return await db.get(EmailDeliveryJob, job_id)
@@ -0,0 +1,352 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Date, and_, case, cast, delete, exists, func, literal, select, text, update
+from sqlalchemy.dialects.postgresql import array, insert as pg_insert
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import ClauseElement
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.models.donation import Donation
+from app.db.models.donation_stats import CampaignDonationStats, PendingCampaignStats, RECENT_DAYS
+
+# Most campaigns one batch stats request may ask for (a listing page is at most 100)
+MAX_STATS_BATCH = 100
+
+def _sql_value(value):
+    """A SQL expression as is, or a Python value as a bound literal."""
+    return value if isinstance(value, ClauseElement) else literal(value)
+
+def utc_day(timestamp):
+    """UTC calendar day of a timestamptz SQL expression."""
+    return cast(func.timezone("UTC", timestamp), Date)
+
+def _slide_window(today, added):
+    """recent_counts moved forward to `today`, with `added` donations counted on that day.
+
+    Slot i holds the count of day recent_day - (i - 1); after a gap of n days every count
+    moves n slots to the right and the ones pushed past the end are dropped.
+    """
+    counts = CampaignDonationStats.recent_counts
+    # A transaction that began before midnight (a negative gap) counts on recent_day
+    gap = func.least(func.greatest(today - func.coalesce(CampaignDonationStats.recent_day, today), 0), RECENT_DAYS)
+    first = case((gap == 0, func.coalesce(counts[1], 0)), else_=0) + added
+    # Slots 2.. are the old counts from slot 2 (same day) or slot 1 (later day) on, after gap - 1 zeros
+    rest = func.array_cat(
+        func.array_fill(0, array([func.greatest(gap - 1, 0)])),
+        counts[2 - func.least(gap, 1):RECENT_DAYS - gap]
+    )
+    return func.array_prepend(first, rest)
+
+def campaign_stats_upsert(campaign_id, count, amount):
+    """INSERT ... ON CONFLICT adding `count` donations worth `amount` to a campaign's stats.
+
+    Arguments may be SQL expressions, e.g. columns of an INSERT ... RETURNING CTE, so the
+    stats can be updated by the statement that records the donation. Signed-in donors are
+    counted separately with `count_new_donor`.
+    """
+    stats = CampaignDonationStats
+    today = utc_day(func.now())
+    insert = pg_insert(stats).from_select(
+        ["campaign_id", "donation_count", "total_amount", "donor_count", "last_donation_at", "recent_day", "recent_counts"],
+        select(
+            _sql_value(campaign_id), _sql_value(count), _sql_value(amount), literal(0), func.now(), today,
+            func.array_prepend(_sql_value(count), func.array_fill(0, array([RECENT_DAYS - 1])))
+        )
+    )
+    return insert.on_conflict_do_update(
+        index_elements=[stats.campaign_id],
+        set_={
+            "donation_count": stats.donation_count + insert.excluded.donation_count,
+            "total_amount": stats.total_amount + insert.excluded.total_amount,
+            "last_donation_at": insert.excluded.last_donation_at,
+            "recent_day": func.greatest(stats.recent_day, today),
+            "recent_counts": _slide_window(today, insert.excluded.donation_count),
+        }
+    )
+
+def _sharded() -> bool:
+    """Whether stats are folded with the amount shards instead of updated by each donation."""
+    return settings.CAMPAIGN_AMOUNT_SHARDS > 1
+
+def campaign_stats_cte(donation_id, campaign_id, amount, donor_id):
+    """CTE counting a recorded donation in its campaign's stats, per CAMPAIGN_AMOUNT_SHARDS.
+
+    Either `campaign_stats_upsert`, or with sharded totals a pending row that is folded into
+    the stats along with the amount shards, so donations to one campaign never queue on its
+    stats row. Arguments may be SQL expressions; the CTE returns `campaign_id`.
+    """
+    if _sharded():
+        return (
+            pg_insert(PendingCampaignStats)
+            .from_select(
+                ["donation_id", "campaign_id", "donor_id"],
+                select(_sql_value(donation_id), _sql_value(campaign_id), _sql_value(donor_id))
+            )
+            .returning(PendingCampaignStats.campaign_id)
+            .cte("campaign_stats")
+        )
+    return campaign_stats_upsert(campaign_id, 1, amount).returning(CampaignDonationStats.campaign_id).cte("campaign_stats")
+
+async def add_campaign_stats(db: AsyncSession, donations: Iterable[Tuple[int, int, float, Optional[int]]]) -> None:
+    """Count (donation_id, campaign_id, amount, donor_id) donations in their campaigns' stats, in the caller's transaction.
+
+    One upsert per campaign, in id order so concurrent batches never deadlock; with sharded
+    totals, one INSERT of pending rows for the whole batch.
+    """
+    donations = list(donations)
+    if not donations:
+        return
+    if _sharded():
+        await db.execute(pg_insert(PendingCampaignStats).values([
+            {"donation_id": donation_id, "campaign_id": campaign_id, "donor_id": donor_id}
+            for donation_id, campaign_id, _, donor_id in donations
+        ]))
+        return
+    counts: Dict[int, int] = defaultdict(int)
+    totals: Dict[int, float] = defaultdict(float)
+    for _, campaign_id, amount, _ in donations:
+        counts[campaign_id] += 1
+        totals[campaign_id] += amount
+    for campaign_id in sorted(counts):
+        await db.execute(campaign_stats_upsert(campaign_id, counts[campaign_id], totals[campaign_id]))
+
+async def count_new_donor(db: AsyncSession, campaign_id: int, donor_id: int, donation_id: int) -> None:
+    """Count the donor if `donation_id` is their first completed donation to the campaign.
+
+    Run it after the stats upsert for that donation: the stats row is locked by then, so this
+    statement sees every other donation to the campaign that was committed before it. With
+    sharded totals the donor is left to the fold: unless the donation was queued with this
+    donor, it is queued again for its donor only.
+    """
+    if _sharded():
+        pending = PendingCampaignStats
+        queued = exists().where(pending.donation_id == donation_id, pending.donor_id == donor_id)
+        await db.execute(
+            pg_insert(pending).from_select(
+                ["donation_id", "campaign_id", "donor_id", "donor_only"],
+                select(literal(donation_id), literal(campaign_id), literal(donor_id), literal(True)).where(~queued)
+            )
+        )
+        return
+    stats = CampaignDonationStats
+    earlier = exists().where(
+        Donation.campaign_id == campaign_id,
+        Donation.donor_id == donor_id,
+        Donation.payment_status == "completed",
+        Donation.id != donation_id
+    )
+    await db.execute(
+        update(stats)
+        .where(stats.campaign_id == campaign_id, ~earlier)
+        .values(donor_count=stats.donor_count + 1)
+    )
+
+def _shift_window(counts, day: date, to_day: date) -> List[int]:
+    """A recent_counts window ending on `day` moved forward to end on `to_day`."""
+    gap = min(max((to_day - day).days, 0), RECENT_DAYS)
+    return [0] * gap + list(counts)[:RECENT_DAYS - gap]
+
+async def fold_campaign_stats(db: AsyncSession, campaign_id: int) -> int:
+    """Count a campaign's pending donations in its stats, in the caller's transaction.
+
+    Call it holding the campaign row lock, as `fold_campaign_amount_shards` does, so folds of
+    one campaign never overlap. A donor is new if none of their completed donations to the
+    campaign is counted already. Returns how many pending rows were folded.
+    """
+    stats = CampaignDonationStats
+    pending = PendingCampaignStats
+    # Lock the stats row before taking the pending rows, in the same order as a rebuild
+    current = (await db.execute(
+        select(stats).where(stats.campaign_id == campaign_id).with_for_update()
+        .execution_options(populate_existing=True)
+    )).scalar_one_or_none()
+
+    batch = (
+        delete(pending).where(pending.campaign_id == campaign_id)
+        .returning(pending.donation_id, pending.donor_id, pending.donor_only)
+        .cte("batch")
+    )
+    # Pending rows, the batch included, are still visible to the rest of the statement
+    counted_before = aliased(Donation)
+    new_donors = (
+        select(func.count(func.distinct(batch.c.donor_id)))
+        .where(
+            batch.c.donor_id.is_not(None),
+            ~exists().where(
+                counted_before.campaign_id == campaign_id,
+                counted_before.donor_id == batch.c.donor_id,
+                counted_before.payment_status == "completed",
+                ~exists().where(pending.donation_id == counted_before.id)
+            )
+        )
+        .scalar_subquery()
+    )
+    today = utc_day(func.now())
+    new = ~batch.c.donor_only
+    row = (await db.execute(
+        select(
+            func.count(batch.c.donation_id).label("pending"),
+            func.count(Donation.id).filter(new).label("donation_count"),
+            func.coalesce(func.sum(Donation.amount).filter(new), 0).label("total_amount"),
+            func.max(Donation.created_at).filter(new).label("last_donation_at"),
+            today.label("today"),
+            array([
+                func.count(Donation.id).filter(new, utc_day(Donation.created_at) == today - offset)
+                for offset in range(RECENT_DAYS)
+            ]).label("recent_counts"),
+            new_donors.label("donor_count")
+        )
+        .select_from(batch.outerjoin(
+            Donation, and_(Donation.id == batch.c.donation_id, Donation.payment_status == "completed")
+        ))
+    )).one()
+    if not row.donation_count and not row.donor_count:
+        return row.pending
+
+    recent_day = max(row.today, current.recent_day or row.today) if current else row.today
+    recent_counts = _shift_window(row.recent_counts, row.today, recent_day)
+    if current is not None and current.recent_day is not None:
+        old_counts = _shift_window(current.recent_counts, current.recent_day, recent_day)
+        recent_counts = [a + b for a, b in zip(recent_counts, old_counts)]
+    last_donation_at = max(
+        (at for at in (row.last_donation_at, current.last_donation_at if current else None) if at is not None),
+        default=None
+    )
+    values = {
+        "donation_count": (current.donation_count if current else 0) + row.donation_count,
+        "total_amount": (current.total_amount if current else 0.0) + row.total_amount,
+        "donor_count": (current.donor_count if current else 0) + row.donor_count,
+        "last_donation_at": last_donation_at,
+        "recent_day": recent_day,
+        "recent_counts": recent_counts,
+    }
+    await db.execute(
+        pg_insert(stats).values(campaign_id=campaign_id, **values)
+        .on_conflict_do_update(index_elements=[stats.campaign_id], set_=values)
+    )
+    return row.pending
+
+async def get_campaigns_with_pending_stats(db: AsyncSession) -> List[int]:
+    """IDs of campaigns that have donations waiting to be counted in their stats."""
+    result = await db.execute(select(PendingCampaignStats.campaign_id).distinct())
+    return result.scalars().all()
+
+def parse_campaign_ids(campaign_ids: str) -> List[int]:
+    """Parse a comma-separated `campaign_ids=` value; raises ValueError if it is invalid."""
+    try:
+        ids = list(dict.fromkeys(int(part) for part in campaign_ids.split(",") if part.strip()))
+    except ValueError:
+        raise ValueError("campaign_ids must be a comma-separated list of integers")
+    if not ids:
+        raise ValueError("campaign_ids must not be empty")
+    if len(ids) > MAX_STATS_BATCH:
+        raise ValueError(f"At most {MAX_STATS_BATCH} campaign_ids per request")
+    return ids
+
+async def get_campaign_stats(db: AsyncSession, campaign_ids: List[int]) -> Dict[int, CampaignDonationStats]:
+    """Stats rows of several campaigns in one query; campaigns without donations are missing."""
+    result = await db.scalars(
+        select(CampaignDonationStats).where(CampaignDonationStats.campaign_id.in_(campaign_ids))
+    )
+    return {stats.campaign_id: stats for stats in result}
+
+def stats_rebuild_statements(campaign_id: Optional[int] = None) -> list:
+    """Statements recomputing campaign stats from the donations table, for one or all campaigns."""
+    stats = CampaignDonationStats
+    completed = Donation.payment_status == "completed"
+    scope = [Donation.campaign_id == campaign_id] if campaign_id is not None else []
+    today = utc_day(func.now())
+    day = utc_day(Donation.created_at)
+    recent = array([
+        func.count(Donation.id).filter(day == today - offset) for offset in range(RECENT_DAYS)
+    ])
+
+    totals = pg_insert(stats).from_select(
+        ["campaign_id", "donation_count", "total_amount", "donor_count", "last_donation_at", "recent_day", "recent_counts"],
+        select(
+            Donation.campaign_id,
+            func.count(Donation.id),
+            func.sum(Donation.amount),
+            func.count(func.distinct(Donation.donor_id)),
+            func.max(Donation.created_at),
+            today,
+            recent
+        ).where(completed, *scope).group_by(Donation.campaign_id)
+    )
+    rebuild = totals.on_conflict_do_update(
+        index_elements=[stats.campaign_id],
+        set_={name: totals.excluded[name] for name in (
+            "donation_count", "total_amount", "donor_count", "last_donation_at", "recent_day", "recent_counts"
+        )}
+    )
+    # Campaigns whose completed donations are all gone
+    orphaned = delete(stats).where(
+        ~exists().where(Donation.campaign_id == stats.campaign_id, completed),
+        *([stats.campaign_id == campaign_id] if campaign_id is not None else [])
+    )
+    # Donations waiting for a fold are counted by the rebuild
+    folded = delete(PendingCampaignStats).where(
+        *([PendingCampaignStats.campaign_id == campaign_id] if campaign_id is not None else [])
+    )
+    return [rebuild, orphaned, folded]
+
+async def rebuild_campaign_stats(db: AsyncSession, campaign_id: Optional[int] = None) -> None:
+    """Recompute campaign stats from the donations table and commit.
+
+    The stats table is locked against writes for the duration, so a donation recorded
+    meanwhile is either part of the rebuild or added on top of it, never lost or counted twice.
+    Every statement sees one snapshot, taken after the lock, so the pending rows cleared are
+    exactly those of the donations the rebuild counts. Call it before anything else in the
+    session's transaction.
+    """
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    await db.execute(text("LOCK TABLE campaign_donation_stats IN EXCLUSIVE MODE"))
+    for statement in stats_rebuild_statements(campaign_id):
+        await db.execute(statement)
+    await db.commit()
+
+async def find_stats_drift(db: AsyncSession, campaign_id: Optional[int] = None) -> List:
+    """Campaigns whose stats row disagrees with their completed donations.
+
+    Rows have campaign_id, the stored count/amount/donors and the actual ones. Donations
+    still waiting for a fold are left out of the actual figures.
+    """
+    stats = CampaignDonationStats
+    pending = PendingCampaignStats
+    counted = ~exists().where(pending.donation_id == Donation.id, ~pending.donor_only)
+    folded = ~exists().where(pending.donation_id == Donation.id)
+    actual = (
+        select(
+            Donation.campaign_id,
+            func.count(Donation.id).filter(counted).label("donation_count"),
+            func.coalesce(func.sum(Donation.amount).filter(counted), 0).label("total_amount"),
+            func.count(func.distinct(Donation.donor_id)).filter(folded).label("donor_count")
+        )
+        .where(Donation.payment_status == "completed", *([Donation.campaign_id == campaign_id] if campaign_id is not None else []))
+        .group_by(Donation.campaign_id)
+        .subquery()
+    )
+    stored = (
+        select(stats)
+        .where(*([stats.campaign_id == campaign_id] if campaign_id is not None else []))
+        .subquery()
+    )
+    result = await db.execute(
+        select(
+            func.coalesce(stored.c.campaign_id, actual.c.campaign_id).label("campaign_id"),
+            stored.c.donation_count, stored.c.total_amount, stored.c.donor_count,
+            actual.c.donation_count.label("actual_donation_count"),
+            actual.c.total_amount.label("actual_total_amount"),
+            actual.c.donor_count.label("actual_donor_count")
+        )
+        .select_from(stored.outerjoin(actual, stored.c.campaign_id == actual.c.campaign_id, full=True))
+        .where(
+            func.coalesce(stored.c.donation_count, 0).is_distinct_from(func.coalesce(actual.c.donation_count, 0))
+            | (func.abs(func.coalesce(stored.c.total_amount, 0) - func.coalesce(actual.c.total_amount, 0)) > 0.005)
+            | func.coalesce(stored.c.donor_count, 0).is_distinct_from(func.coalesce(actual.c.donor_count, 0))
+        )
+        .order_by(text("campaign_id"))
+    )
+    return result.all()
@@ -1,181 +1,252 @@
 import smtplib
-import ssl
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html import escape
+from typing import Callable, Iterable, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from collections import defaultdict
 
 from app.core.config import settings
-from app.services.newsletter_service import get_active_subscribers
-from app.services.template_loader import template_loader
+from app.auth.unsubscribe import create_unsubscribe_token
+from app.services.newsletter_service import iter_active_subscriber_chunks
+from app.services.mime_message import PersonalizedMessage
+from app.services.smtp_pool import SMTPConnectionPool, RateLimiter
+from app.services.template_loader import template_loader, compile_template
 from app.db.models.campaign import Campaign
 
+# (language, last subscriber id, sent, failed) reported after each recipient chunk
+ChunkCallback = Callable[[str, int, int, int], None]
+
 class EmailService:
-    def __init__(self):
-        self.smtp_server = getattr(settings, 'SMTP_SERVER', 'smtp.gmail.com')
-        self.smtp_port = getattr(settings, 'SMTP_PORT', 587)
+    def __init__(
+        self,
+        smtp_server: Optional[str] = None,
+        smtp_port: Optional[int] = None,
+        use_tls: Optional[bool] = None,
+        pool_size: Optional[int] = None,
+        rate_limit: Optional[float] = None
+    ):
+        self.smtp_server = smtp_server or getattr(settings, 'SMTP_SERVER', 'smtp.gmail.com')
+        self.smtp_port = smtp_port or getattr(settings, 'SMTP_PORT', 587)
         self.smtp_username = getattr(settings, 'SMTP_USERNAME', '')
         self.smtp_password = getattr(settings, 'SMTP_PASSWORD', '')
         self.from_email = getattr(settings, 'FROM_EMAIL', 'noreply@qalbwahed.org')
+        self.use_tls = settings.SMTP_USE_TLS if use_tls is None else use_tls
+        self.pool_size = pool_size or settings.SMTP_POOL_SIZE
+        self.batch_size = settings.SMTP_BATCH_SIZE
         
-    def _create_smtp_connection(self):
-        """Create SMTP connection with SSL."""
-        context = ssl.create_default_context()
-        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-        server.starttls(context=context)
-        if self.smtp_username and self.smtp_password:
-            server.login(self.smtp_username, self.smtp_password)
-        return server
+        # Connections and the rate cap are shared by every batch this process sends
+        self.pool = SMTPConnectionPool(
+            self.smtp_server,
+            self.smtp_port,
+            username=self.smtp_username,
+            password=self.smtp_password,
+            use_tls=self.use_tls,
+            size=self.pool_size
+        )
+        self.rate_limiter = RateLimiter(settings.SMTP_RATE_LIMIT if rate_limit is None else rate_limit)
+        self._executor: Optional[ThreadPoolExecutor] = None
     
-    def send_email(self, to_emails: List[str], subject: str, html_content: str, text_content: Optional[str] = None):
-        """Send email to multiple recipients."""
-        if not self.smtp_username or not self.smtp_password:
+    def _is_configured(self) -> bool:
+        """Credentials are required for TLS relays; local plain-SMTP relays and sinks run without them."""
+        return not self.use_tls or bool(self.smtp_username and self.smtp_password)
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="smtp-sender")
+        return self._executor
+    
+    def _deliver(self, to_email: str, message: str) -> bool:
+        """Send one message on a pooled connection, reconnecting once if the session dropped."""
+        for attempt in range(2):
+            self.rate_limiter.wait()
+            try:
+                with self.pool.connection() as server:
+                    server.sendmail(self.from_email, to_email, message)
+                return True
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError) as e:
+                if attempt:
+                    print(f"   ❌ Connection error sending to {to_email}: {e}")
+            except smtplib.SMTPException as e:
+                # Refused recipients and 4xx/5xx replies are about the message; retrying won't help
+                print(f"   ❌ Failed to send to {to_email}: {e}")
+                return False
+            except OSError as e:
+                if attempt:
+                    print(f"   ❌ Connection error sending to {to_email}: {e}")
+        return False
+    
+    def _send_messages(self, subject: str, recipient_count: int, messages: Iterable[Tuple[str, str]]) -> int:
+        """Deliver (to_email, message) pairs over concurrent pooled SMTP connections; returns how many were sent."""
+        if not self._is_configured():
             print("⚠️  SMTP credentials not configured. Email not sent.")
             print("   Please set SMTP_USERNAME and SMTP_PASSWORD environment variables.")
-            print(f"   Would have sent email to {len(to_emails)} recipients with subject: '{subject}'")
-            return False
+            print(f"   Would have sent email to {recipient_count} recipients with subject: '{subject}'")
+            return 0
             
-        print(f"📧 Sending email to {len(to_emails)} recipients...")
+        print(f"📧 Sending email to {recipient_count} recipients...")
         print(f"   Subject: {subject}")
-        print(f"   SMTP Server: {self.smtp_server}:{self.smtp_port}")
+        print(f"   SMTP Server: {self.smtp_server}:{self.smtp_port} ({self.pool_size} connections)")
         print(f"   From: {self.from_email}")
+        
+        started = time.perf_counter()
+        executor = self._get_executor()
+        futures = [executor.submit(self._deliver, to_email, message) for to_email, message in messages]
+        sent = sum(1 for future in futures if future.result())
+        elapsed = time.perf_counter() - started
+        
+        rate = sent / elapsed if elapsed > 0 else float(sent)
+        print(f"📧 Sent {sent}/{recipient_count} emails in {elapsed:.2f}s ({rate:.1f} msg/s)")
+        return sent
+    
+    def send_email(self, to_emails: List[str], subject: str, html_content: str, text_content: Optional[str] = None):
+        """Send the same email to multiple recipients."""
+        message = PersonalizedMessage(
+            self.from_email,
+            subject,
+            compile_template(html_content),
+            compile_template(text_content) if text_content else None
+        )
+        sent = self._send_messages(subject, len(to_emails), ((to_email, message.build(to_email, {})) for to_email in to_emails))
+        return sent == len(to_emails)
+    
+    def unsubscribe_url(self, email: str) -> str:
+        """Signed one-click unsubscribe link for a subscriber."""
+        return f"{settings.FRONTEND_URL}/unsubscribe?token={create_unsubscribe_token(email)}"
+    
+    def build_personalized(self, message: PersonalizedMessage, language: str, email: str, name: Optional[str] = None) -> str:
+        """Render a message for one recipient with their greeting and unsubscribe link."""
+        greeting = template_loader.get_greeting(language, name)
+        unsubscribe_url = self.unsubscribe_url(email)
+        return message.build(
+            email,
+            {'greeting': greeting, 'unsubscribe_url': unsubscribe_url},
+            {'greeting': escape(greeting), 'unsubscribe_url': unsubscribe_url},
+            unsubscribe_url
+        )
+    
+    def send_personalized(self, recipients, message: PersonalizedMessage, language: str) -> int:
+        """Send a message to recipients (rows with email and name), personalized per recipient; returns how many were sent."""
+        return self._send_messages(
+            message.subject,
+            len(recipients),
+            ((r.email, self.build_personalized(message, language, r.email, r.name)) for r in recipients)
+        )
+    
+    def close(self):
+        """Stop sender threads and close pooled SMTP connections."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.pool.close()
+    
+    def _send_to_subscribers(
+        self,
+        session_factory: Callable[[], Session],
+        template_name: str,
+        campaign: Campaign,
+        context: dict,
+        after: Optional[Tuple[str, int]] = None,
+        on_chunk: Optional[ChunkCallback] = None
+    ):
+        """Read active subscribers in language-grouped chunks and send each chunk personalized messages.
+
+        Each chunk is read on its own short session from `session_factory`. `after` resumes from a
+        (language, subscriber id) checkpoint; `on_chunk(language, last_id, sent, failed)` is called
+        once each chunk has been handed to the SMTP server, and is where the caller checkpoints.
+        """
+        messages = {}  # language -> PersonalizedMessage, or None when the template is missing
+        sent_by_language = defaultdict(int)
+        
+        for language, chunk in iter_active_subscriber_chunks(session_factory, self.batch_size, after):
+            if language not in messages:
+                html_template = template_loader.get_template(language, template_name, "html")
+                text_template = template_loader.get_template(language, template_name, "txt")
+                if html_template:
+                    # Render the shared campaign fields once per language
+                    messages[language] = PersonalizedMessage(
+                        self.from_email,
+                        template_loader.get_localized_subject(language, template_name, campaign.title),
+                        html_template.partial(context),
+                        text_template.partial(context) if text_template else None
+                    )
+                else:
+                    print(f"   ⚠️  Template not found for language: {language}")
+                    messages[language] = None
             
-        try:
-            server = self._create_smtp_connection()
-            
-            for to_email in to_emails:
-                message = MIMEMultipart("alternative")
-                message["Subject"] = subject
-                message["From"] = self.from_email
-                message["To"] = to_email
-                
-                # Add text and HTML parts
-                if text_content:
-                    text_part = MIMEText(text_content, "plain", "utf-8")
-                    message.attach(text_part)
-                
-                html_part = MIMEText(html_content, "html", "utf-8")
-                message.attach(html_part)
-                
-                server.sendmail(self.from_email, to_email, message.as_string())
-                print(f"   ✅ Email sent to: {to_email}")
-            
-            server.quit()
-            print(f"📧 Successfully sent emails to {len(to_emails)} recipients")
-            return True
-        except Exception as e:
-            print(f"❌ Error sending email: {e}")
-            return False
+            message = messages[language]
+            sent = 0
+            if message is not None:
+                print(f"   Processing {len(chunk)} subscribers for language: {language}")
+                sent = self.send_personalized(chunk, message, language)
+                sent_by_language[language] += sent
+            if on_chunk is not None:
+                on_chunk(language, chunk[-1].id, sent, len(chunk) - sent)
+        
+        if not messages:
+            print("   No subscribers found, skipping email notification")
+        else:
+            print(f"   Emails sent by language: {dict(sent_by_language)}")
     
-    def send_new_campaign_notification(self, db: Session, campaign: Campaign):
+    def send_new_campaign_notification(
+        self,
+        session_factory: Callable[[], Session],
+        campaign: Campaign,
+        after: Optional[Tuple[str, int]] = None,
+        on_chunk: Optional[ChunkCallback] = None
+    ):
         """Send notification to newsletter subscribers about a new campaign."""
-        subscribers = get_active_subscribers(db)
         print(f"📧 New campaign notification triggered for: {campaign.title}")
-        print(f"   Found {len(subscribers)} active newsletter subscribers")
-        
-        if not subscribers:
-            print("   No subscribers found, skipping email notification")
-            return
-        
-        # Group subscribers by language for batch processing
-        subscribers_by_language = defaultdict(list)
-        for subscriber in subscribers:
-            language = subscriber.language or "en"
-            subscribers_by_language[language].append(subscriber)
-        
-        print(f"   Subscribers grouped by language: {dict((lang, len(subs)) for lang, subs in subscribers_by_language.items())}")
         
-        # Send emails for each language group
-        for language, lang_subscribers in subscribers_by_language.items():
-            subscriber_emails = [sub.email for sub in lang_subscribers]
-            print(f"   Processing {len(subscriber_emails)} subscribers for language: {language}")
-            
-            # Get localized subject
-            subject = template_loader.get_localized_subject(language, "new_campaign", campaign.title)
-            
-            # Prepare template context
-            context = {
-                'campaign_title': campaign.title,
-                'campaign_description': campaign.description,
-                'target_amount': f"{campaign.target_amount:,.2f}",
-                'current_amount': f"{campaign.current_amount:,.2f}",
-                'end_date': campaign.end_date.strftime('%B %d, %Y') if campaign.end_date else 'No end date',
-                'campaign_url': f"http://localhost:5173/campaigns/{campaign.id}",
-                'website_url': "http://localhost:5173",
-                'unsubscribe_url': "http://localhost:5173/unsubscribe?email={{email}}"
-            }
-            
-            # Load and render templates
-            html_template = template_loader.load_template(language, "new_campaign", "html")
-            text_template = template_loader.load_template(language, "new_campaign", "txt")
-            
-            if html_template:
-                html_content = template_loader.render_template(html_template, context)
-                text_content = template_loader.render_template(text_template, context) if text_template else None
-                
-                # Send email in batches to avoid overwhelming the SMTP server
-                batch_size = 50
-                for i in range(0, len(subscriber_emails), batch_size):
-                    batch = subscriber_emails[i:i + batch_size]
-                    self.send_email(batch, subject, html_content, text_content)
-            else:
-                print(f"   ⚠️  Template not found for language: {language}")
+        # Shared template context; greeting and unsubscribe_url are filled per recipient
+        context = {
+            'campaign_title': campaign.title,
+            'campaign_description': campaign.description,
+            'target_amount': f"{campaign.target_amount:,.2f}",
+            'current_amount': f"{campaign.current_amount:,.2f}",
+            'end_date': campaign.end_date.strftime('%B %d, %Y') if campaign.end_date else 'No end date',
+            'campaign_url': f"{settings.FRONTEND_URL}/campaigns/{campaign.id}",
+            'website_url': settings.FRONTEND_URL
+        }
+        self._send_to_subscribers(session_factory, "new_campaign", campaign, context, after, on_chunk)
     
-    def send_campaign_completed_notification(self, db: Session, campaign: Campaign):
+    def send_campaign_completed_notification(
+        self,
+        session_factory: Callable[[], Session],
+        campaign: Campaign,
+        after: Optional[Tuple[str, int]] = None,
+        on_chunk: Optional[ChunkCallback] = None
+    ):
         """Send notification when a campaign is completed."""
-        subscribers = get_active_subscribers(db)
         print(f"📧 Campaign completion notification triggered for: {campaign.title}")
-        print(f"   Found {len(subscribers)} active newsletter subscribers")
         
-        if not subscribers:
-            print("   No subscribers found, skipping email notification")
-            return
-        
-        # Group subscribers by language for batch processing
-        subscribers_by_language = defaultdict(list)
-        for subscriber in subscribers:
-            language = subscriber.language or "en"
-            subscribers_by_language[language].append(subscriber)
-        
-        print(f"   Subscribers grouped by language: {dict((lang, len(subs)) for lang, subs in subscribers_by_language.items())}")
+        # Calculate success rate
+        success_rate = ((campaign.current_amount / campaign.target_amount) * 100) if campaign.target_amount > 0 else 0
         
-        # Send emails for each language group
-        for language, lang_subscribers in subscribers_by_language.items():
-            subscriber_emails = [sub.email for sub in lang_subscribers]
-            print(f"   Processing {len(subscriber_emails)} subscribers for language: {language}")
-            
-            # Get localized subject
-            subject = template_loader.get_localized_subject(language, "campaign_completed", campaign.title)
-            
-            # Calculate success rate
-            success_rate = ((campaign.current_amount / campaign.target_amount) * 100) if campaign.target_amount > 0 else 0
-            
-            # Prepare template context
-            context = {
-                'campaign_title': campaign.title,
-                'target_amount': f"{campaign.target_amount:,.2f}",
-                'current_amount': f"{campaign.current_amount:,.2f}",
-                'success_rate': f"{success_rate:.1f}",
-                'website_url': "http://localhost:5173",
-                'unsubscribe_url': "http://localhost:5173/unsubscribe?email={{email}}"
-            }
-            
-            # Load and render templates
-            html_template = template_loader.load_template(language, "campaign_completed", "html")
-            text_template = template_loader.load_template(language, "campaign_completed", "txt")
-            
-            if html_template:
-                html_content = template_loader.render_template(html_template, context)
-                text_content = template_loader.render_template(text_template, context) if text_template else None
-                
-                # Send email in batches
-                batch_size = 50
-                for i in range(0, len(subscriber_emails), batch_size):
-                    batch = subscriber_emails[i:i + batch_size]
-                    self.send_email(batch, subject, html_content, text_content)
-            else:
-                print(f"   ⚠️  Template not found for language: {language}")
+        # Shared template context; greeting and unsubscribe_url are filled per recipient
+        context = {
+            'campaign_title': campaign.title,
+            'target_amount': f"{campaign.target_amount:,.2f}",
+            'current_amount': f"{campaign.current_amount:,.2f}",
+            'success_rate': f"{success_rate:.1f}",
+            'website_url': settings.FRONTEND_URL
+        }
+        self._send_to_subscribers(session_factory, "campaign_completed", campaign, context, after, on_chunk)
+
+    def send_notification(
+        self,
+        session_factory: Callable[[], Session],
+        notification: str,
+        campaign: Campaign,
+        after: Optional[Tuple[str, int]] = None,
+        on_chunk: Optional[ChunkCallback] = None
+    ):
+        """Send a campaign notification by outbox notification type."""
+        senders = {
+            "new_campaign": self.send_new_campaign_notification,
+            "campaign_completed": self.send_campaign_completed_notification,
+        }
+        senders[notification](session_factory, campaign, after, on_chunk)
 
 # Create global email service instance
 email_service = EmailService()
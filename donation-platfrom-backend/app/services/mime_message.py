@@ -0,0 +1,65 @@
+import base64
+import uuid
+from email.header import Header
+from typing import Any, Dict, Optional
+
+from app.services.template_loader import CompiledTemplate
+
+_PART_HEADERS = (
+    'Content-Type: text/{subtype}; charset="utf-8"\n'
+    'MIME-Version: 1.0\n'
+    'Content-Transfer-Encoding: base64\n\n'
+)
+
+def _encode_header(value: str) -> str:
+    # RFC 2047 encoding only when needed; plain ASCII values are just folded
+    return Header(value, "us-ascii" if value.isascii() else "utf-8").encode()
+
+class PersonalizedMessage:
+    """multipart/alternative message whose headers, boundary and shared body text are built once.
+
+    Per recipient only the personalized fragments are rendered into the body parts, which are
+    then base64-encoded and spliced between the prebuilt headers and boundaries. The output
+    matches what `MIMEMultipart("alternative")` with utf-8 `MIMEText` parts produces.
+    """
+
+    def __init__(
+        self,
+        from_email: str,
+        subject: str,
+        html_template: CompiledTemplate,
+        text_template: Optional[CompiledTemplate] = None
+    ):
+        boundary = f"==============={uuid.uuid4().hex}=="
+        self.subject = subject
+        self.html_template = html_template
+        self.text_template = text_template
+        self._head = (
+            f'Content-Type: multipart/alternative; boundary="{boundary}"\n'
+            'MIME-Version: 1.0\n'
+            f'Subject: {_encode_header(subject)}\n'
+            f'From: {from_email}\n'
+        )
+        self._text_head = f"\n--{boundary}\n" + _PART_HEADERS.format(subtype="plain")
+        self._html_head = f"\n--{boundary}\n" + _PART_HEADERS.format(subtype="html")
+        self._tail = f"\n--{boundary}--\n"
+
+    def build(
+        self,
+        to_email: str,
+        context: Dict[str, Any],
+        html_context: Optional[Dict[str, Any]] = None,
+        unsubscribe_url: Optional[str] = None
+    ) -> str:
+        """Render the message for one recipient; `html_context` overrides `context` for the HTML part."""
+        out = [self._head, "To: ", to_email, "\n"]
+        if unsubscribe_url:
+            out += ["List-Unsubscribe: <", unsubscribe_url, ">\n"]
+        if self.text_template is not None:
+            out.append(self._text_head)
+            out.append(base64.encodebytes(self.text_template.render(context).encode("utf-8")).decode("ascii"))
+        out.append(self._html_head)
+        html = self.html_template.render(context if html_context is None else html_context)
+        out.append(base64.encodebytes(html.encode("utf-8")).decode("ascii"))
+        out.append(self._tail)
+        return "".join(out)
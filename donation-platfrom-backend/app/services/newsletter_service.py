@@ -1,17 +1,17 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, func, select, tuple_
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 
 from app.db.models.newsletter import NewsletterSubscription
+from app.db.models.user import User
 from app.schemas.newsletter import NewsletterSubscriptionCreate, NewsletterStats
 
-def subscribe_to_newsletter(db: Session, subscription_data: NewsletterSubscriptionCreate) -> Optional[NewsletterSubscription]:
+async def subscribe_to_newsletter(db: AsyncSession, subscription_data: NewsletterSubscriptionCreate) -> Optional[NewsletterSubscription]:
     """Subscribe an email to the newsletter."""
     # Check if email is already subscribed
-    existing_subscription = db.query(NewsletterSubscription).filter(
-        NewsletterSubscription.email == subscription_data.email
-    ).first()
+    existing_subscription = await get_newsletter_subscription(db, subscription_data.email)
     
     if existing_subscription:
         if existing_subscription.is_active:
@@ -24,8 +24,8 @@ def subscribe_to_newsletter(db: Session, subscription_data: NewsletterSubscripti
             existing_subscription.unsubscribed_at = None
             existing_subscription.source = subscription_data.source
             existing_subscription.language = subscription_data.language or "en"
-            db.commit()
-            db.refresh(existing_subscription)
+            await db.commit()
+            await db.refresh(existing_subscription)
             return existing_subscription
     
     # Create new subscription
@@ -36,50 +36,97 @@ def subscribe_to_newsletter(db: Session, subscription_data: NewsletterSubscripti
     )
     
     db.add(db_subscription)
-    db.commit()
-    db.refresh(db_subscription)
+    await db.commit()
+    await db.refresh(db_subscription)
     
     return db_subscription
 
-def unsubscribe_from_newsletter(db: Session, email: str) -> bool:
+async def unsubscribe_from_newsletter(db: AsyncSession, email: str) -> bool:
     """Unsubscribe an email from the newsletter."""
-    subscription = db.query(NewsletterSubscription).filter(
-        NewsletterSubscription.email == email
-    ).first()
+    subscription = await get_newsletter_subscription(db, email)
     
     if subscription and subscription.is_active:
         subscription.is_active = False
         subscription.unsubscribed_at = datetime.now()
-        db.commit()
+        await db.commit()
         return True
     
     return False
 
-def get_newsletter_subscription(db: Session, email: str) -> Optional[NewsletterSubscription]:
+async def get_newsletter_subscription(db: AsyncSession, email: str) -> Optional[NewsletterSubscription]:
     """Get newsletter subscription by email."""
-    return db.query(NewsletterSubscription).filter(
-        NewsletterSubscription.email == email
-    ).first()
+    result = await db.execute(
+        select(NewsletterSubscription).where(NewsletterSubscription.email == email)
+    )
+    return result.scalar_one_or_none()
+
+def iter_active_subscriber_chunks(
+    session_factory: Callable[[], Session],
+    chunk_size: int = 500,
+    after: Optional[Tuple[str, int]] = None
+) -> Iterator[Tuple[str, List[Row]]]:
+    """Yield active subscribers as (language, rows) chunks of at most `chunk_size`.
 
-def get_active_subscribers(db: Session) -> List[NewsletterSubscription]:
-    """Get all active newsletter subscribers."""
-    return db.query(NewsletterSubscription).filter(
+    Rows carry only id, email, language and name (from a matching user account). Each chunk
+    is its own keyset query, `(language, id) > checkpoint LIMIT n`, on a fresh session that is
+    closed before the chunk is yielded, so nothing stays open while it is sent. `after` is a
+    (language, subscriber id) checkpoint to resume from; the last row of each chunk is the next one.
+    """
+    query = select(
+        NewsletterSubscription.id,
+        NewsletterSubscription.email,
+        NewsletterSubscription.language,
+        User.full_name.label("name")
+    ).outerjoin(
+        User, User.email == NewsletterSubscription.email
+    ).where(
         NewsletterSubscription.is_active == True
-    ).all()
+    ).order_by(
+        NewsletterSubscription.language, NewsletterSubscription.id
+    ).limit(chunk_size)
+
+    while True:
+        page = query
+        if after is not None:
+            page = page.where(tuple_(NewsletterSubscription.language, NewsletterSubscription.id) > tuple_(*after))
+        with session_factory() as db:
+            rows = db.execute(page).all()
+        if not rows:
+            return
+        # Chunks hold one language; the rest of the page is read again with the next chunk
+        language = rows[0].language
+        chunk = [row for row in rows if row.language == language]
+        yield language, chunk
+        after = (language, chunk[-1].id)
+
+async def count_active_subscribers(db: AsyncSession) -> int:
+    """Count active newsletter subscribers."""
+    return await db.scalar(
+        select(func.count(NewsletterSubscription.id)).where(NewsletterSubscription.is_active == True)
+    )
 
-def get_newsletter_stats(db: Session) -> NewsletterStats:
+async def count_active_subscribers_by_language(db: AsyncSession) -> Dict[str, int]:
+    """Count active newsletter subscribers per preferred language."""
+    result = await db.execute(
+        select(NewsletterSubscription.language, func.count(NewsletterSubscription.id))
+        .where(NewsletterSubscription.is_active == True)
+        .group_by(NewsletterSubscription.language)
+    )
+    return dict(result.all())
+
+async def get_newsletter_stats(db: AsyncSession) -> NewsletterStats:
     """Get newsletter subscription statistics."""
-    total_subscribers = db.query(NewsletterSubscription).count()
-    active_subscribers = db.query(NewsletterSubscription).filter(
-        NewsletterSubscription.is_active == True
-    ).count()
+    total_subscribers = await db.scalar(select(func.count(NewsletterSubscription.id)))
+    active_subscribers = await count_active_subscribers(db)
     inactive_subscribers = total_subscribers - active_subscribers
     
     # Recent subscriptions (last 30 days)
     thirty_days_ago = datetime.now() - timedelta(days=30)
-    recent_subscriptions = db.query(NewsletterSubscription).filter(
-        NewsletterSubscription.subscribed_at >= thirty_days_ago
-    ).count()
+    recent_subscriptions = await db.scalar(
+        select(func.count(NewsletterSubscription.id)).where(
+            NewsletterSubscription.subscribed_at >= thirty_days_ago
+        )
+    )
     
     return NewsletterStats(
         total_subscribers=total_subscribers,
@@ -88,9 +135,12 @@ def get_newsletter_stats(db: Session) -> NewsletterStats:
         recent_subscriptions=recent_subscriptions
     )
 
-def get_subscribers_paginated(db: Session, page: int = 1, page_size: int = 50) -> List[NewsletterSubscription]:
+async def get_subscribers_paginated(db: AsyncSession, page: int = 1, page_size: int = 50) -> List[NewsletterSubscription]:
     """Get paginated list of newsletter subscribers."""
     offset = (page - 1) * page_size
-    return db.query(NewsletterSubscription).order_by(
-        NewsletterSubscription.subscribed_at.desc()
-    ).offset(offset).limit(page_size).all()
+    result = await db.execute(
+        select(NewsletterSubscription).order_by(
+            NewsletterSubscription.subscribed_at.desc()
+        ).offset(offset).limit(page_size)
+    )
+    return result.scalars().all()
@@ -0,0 +1,121 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_, select
+from typing import Any, Dict, Optional
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.db.models.campaign import Campaign
+from app.db.models.outbox import EmailOutbox
+
+def campaign_snapshot(campaign: Campaign) -> Dict[str, Any]:
+    """Capture the campaign fields used by the email templates."""
+    return {
+        'id': campaign.id,
+        'title': campaign.title,
+        'description': campaign.description,
+        'target_amount': campaign.target_amount,
+        'current_amount': campaign.current_amount or 0.0,
+        'end_date': campaign.end_date.isoformat() if campaign.end_date else None,
+        'lang': campaign.lang,
+    }
+
+def campaign_from_snapshot(payload: Dict[str, Any]) -> Campaign:
+    """Rebuild a detached campaign from an outbox payload for the email service."""
+    data = dict(payload)
+    if data.get('end_date'):
+        data['end_date'] = datetime.fromisoformat(data['end_date'])
+    return Campaign(**data)
+
+def enqueue_campaign_notification(db, notification: str, campaign: Campaign, persisted: bool = True) -> EmailOutbox:
+    """Add an outbox entry to the caller's transaction; it is sent once that transaction commits.
+
+    Works with both sync and async sessions since it only calls `db.add`.
+    """
+    entry = EmailOutbox(
+        notification=notification,
+        campaign_id=campaign.id if persisted else None,
+        payload=campaign_snapshot(campaign)
+    )
+    db.add(entry)
+    return entry
+
+class LeaseLost(Exception):
+    """An outbox entry's lease passed and another dispatcher may have claimed it."""
+
+def _lease_end() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+
+def claim_next_entry(db: Session) -> Optional[EmailOutbox]:
+    """Lease the oldest due outbox entry to this dispatcher and commit.
+
+    Due entries are pending ones whose retry time has come, and processing ones whose lease
+    passed because their dispatcher died; those resume from their delivery checkpoint. No row
+    stays locked while mail is sent: the dispatcher renews the lease with each checkpoint.
+    Claim with an expire_on_commit=False session so the entry stays readable afterwards.
+    """
+    now = datetime.now(timezone.utc)
+    entry = db.execute(
+        select(EmailOutbox)
+        .where(or_(
+            and_(EmailOutbox.status == "pending", EmailOutbox.available_at <= now),
+            and_(EmailOutbox.status == "processing", EmailOutbox.locked_until < now)
+        ))
+        .order_by(EmailOutbox.id)
+        .limit(1)
+        .with_for_update(skip_locked=True, key_share=True)
+    ).scalar_one_or_none()
+    if entry is None:
+        db.rollback()
+        return None
+
+    entry.status = "processing"
+    entry.locked_until = _lease_end()
+    db.commit()
+    return entry
+
+def _leased(db: Session, entry: EmailOutbox) -> EmailOutbox:
+    """Lock the entry in `db` if `entry` still holds its lease; raise LeaseLost otherwise."""
+    current = db.execute(
+        select(EmailOutbox)
+        .where(
+            EmailOutbox.id == entry.id,
+            EmailOutbox.status == "processing",
+            EmailOutbox.locked_until == entry.locked_until
+        )
+        .with_for_update(key_share=True)
+    ).scalar_one_or_none()
+    if current is None:
+        raise LeaseLost(f"Outbox entry #{entry.id} was claimed by another dispatcher")
+    return current
+
+def renew_lease(db: Session, entry: EmailOutbox):
+    """Extend the lease on a claimed entry in the caller's transaction (nothing is committed)."""
+    current = _leased(db, entry)
+    current.locked_until = entry.locked_until = _lease_end()
+    db.flush()
+
+def mark_sent(db: Session, entry: EmailOutbox):
+    """Record a successful delivery of a claimed entry in the caller's transaction."""
+    current = _leased(db, entry)
+    current.status = "sent"
+    current.processed_at = datetime.now(timezone.utc)
+    current.last_error = None
+    current.locked_until = None
+
+def mark_failed(db: Session, entry: EmailOutbox, error: Exception) -> bool:
+    """Record a failed attempt at a claimed entry in the caller's transaction.
+
+    The entry is retried with exponential backoff until it runs out of attempts. Returns
+    True if it failed for good.
+    """
+    current = _leased(db, entry)
+    current.attempts += 1
+    current.last_error = str(error)
+    current.locked_until = None
+    if current.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        current.status = "failed"
+        current.processed_at = datetime.now(timezone.utc)
+        return True
+    current.status = "pending"
+    current.available_at = datetime.now(timezone.utc) + timedelta(seconds=30 * 2 ** current.attempts)
+    return False
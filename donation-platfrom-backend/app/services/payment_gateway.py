@@ -0,0 +1,69 @@
+import ssl
+import httpx
+import stripe
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+
+class PooledHTTPXClient(stripe.HTTPXClient):
+    """Stripe HTTP client that keeps one keep-alive connection pool per worker."""
+
+    def __init__(self, timeout: float, max_connections: int):
+        super().__init__(timeout=timeout)
+        # Replace the default client so the pool size and keep-alive are explicit
+        self._client_async = httpx.AsyncClient(
+            verify=ssl.create_default_context(cafile=stripe.ca_bundle_path),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60.0
+            )
+        )
+
+
+class PaymentGateway:
+    """Non-blocking Stripe gateway with connection reuse, timeouts and retries.
+
+    Point `api_base` at another host (see app/dev/fake_stripe.py) to run the
+    donation flow without reaching the real Stripe API.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_base: Optional[str] = None,
+        timeout: float = 10.0,
+        max_network_retries: int = 2,
+        max_connections: int = 100
+    ):
+        self.api_base = api_base
+        self._http_client = PooledHTTPXClient(timeout=timeout, max_connections=max_connections)
+        self._client = stripe.StripeClient(
+            api_key,
+            base_addresses={"api": api_base} if api_base else {},
+            max_network_retries=max_network_retries,
+            http_client=self._http_client
+        )
+
+    async def create_payment_intent(self, params: Dict[str, Any]) -> stripe.PaymentIntent:
+        """Create a Payment Intent; retried POSTs reuse the same idempotency key."""
+        return await self._client.payment_intents.create_async(params=params)
+
+    async def retrieve_payment_intent(self, payment_intent_id: str) -> stripe.PaymentIntent:
+        """Retrieve a Payment Intent by ID."""
+        return await self._client.payment_intents.retrieve_async(payment_intent_id)
+
+    async def close(self):
+        """Close pooled connections."""
+        await self._http_client.close_async()
+
+
+# Global gateway instance shared by all requests of the worker
+payment_gateway = PaymentGateway(
+    api_key=settings.STRIPE_SECRET_KEY,
+    api_base=settings.STRIPE_API_BASE,
+    timeout=settings.STRIPE_TIMEOUT,
+    max_network_retries=settings.STRIPE_MAX_NETWORK_RETRIES,
+    max_connections=settings.STRIPE_MAX_CONNECTIONS
+)
@@ -1,12 +1,14 @@
 import stripe
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select, true, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
-from app.db.models import Donation, Campaign
-from app.services.campaign_service import update_campaign_amount
-
-# Initialize Stripe with secret key
-stripe.api_key = settings.STRIPE_SECRET_KEY
+from app.db.models import Donation
+from app.services.activity_rollup_service import count_new_activity_donor, donation_activity_insert
+from app.services.campaign_service import apply_campaign_total, campaign_total_cte
+from app.services.donation_stats_service import campaign_stats_cte, count_new_donor
+from app.services.payment_gateway import payment_gateway
 
 
 class PaymentService:
@@ -26,19 +28,19 @@ class PaymentService:
             amount_cents = int(amount * 100)
             
             # Create payment intent with metadata
-            payment_intent = stripe.PaymentIntent.create(
-                amount=amount_cents,
-                currency=currency,
-                metadata={
+            payment_intent = await payment_gateway.create_payment_intent({
+                'amount': amount_cents,
+                'currency': currency,
+                'metadata': {
                     'campaign_id': str(campaign_id),
                     'donor_email': donor_email or 'anonymous',
                     'donor_name': donor_name or 'Anonymous',
                     'is_anonymous': str(is_anonymous),
                     'message': message or ''
                 },
-                receipt_email=donor_email if not is_anonymous and donor_email else None,
-                description=f"Donation for Campaign #{campaign_id}"
-            )
+                'receipt_email': donor_email if not is_anonymous and donor_email else None,
+                'description': f"Donation for Campaign #{campaign_id}"
+            })
             
             return {
                 'client_secret': payment_intent.client_secret,
@@ -50,50 +52,101 @@ class PaymentService:
         except Exception as e:
             raise Exception(f"Payment creation error: {str(e)}")
 
+    @staticmethod
+    def donation_values(payment_intent, payment_status: str, donor_id: Optional[int]) -> dict:
+        """Donation columns for a payment intent and its metadata."""
+        metadata = payment_intent['metadata']
+        return {
+            'amount': payment_intent['amount'] / 100,  # Convert from cents
+            'currency': payment_intent['currency'].upper(),
+            'payment_status': payment_status,
+            'payment_id': payment_intent['id'],
+            'donor_id': donor_id,
+            'campaign_id': int(metadata['campaign_id']),
+            'is_anonymous': metadata.get('is_anonymous', 'False') == 'True',
+            'message': metadata.get('message', '') or None
+        }
+
+    @staticmethod
+    def completed_donation_upsert(values):
+        """INSERT of completed donations that upgrades earlier failed or pending attempts.
+
+        `values` is one row or a list of rows with distinct payment_ids. Payments already
+        completed are left alone, so RETURNING yields only the donations new to the totals.
+        """
+        insert = pg_insert(Donation).values(values)
+        return insert.on_conflict_do_update(
+            index_elements=[Donation.payment_id],
+            set_={
+                'amount': insert.excluded.amount,
+                'currency': insert.excluded.currency,
+                'payment_status': insert.excluded.payment_status,
+                'donor_id': func.coalesce(Donation.donor_id, insert.excluded.donor_id),
+                'updated_at': func.now()
+            },
+            where=Donation.payment_status.is_distinct_from('completed')
+        )
+
+    @staticmethod
+    async def record_completed_donation(db: AsyncSession, values: dict) -> Donation:
+        """Record a completed donation and add it to the campaign total and stats in one statement.
+
+        The unique payment_id makes this idempotent: a webhook and /confirm-payment racing
+        for the same payment insert one donation and count it once. An earlier failed or
+        pending attempt with the same payment_id is upgraded to completed and counted.
+        """
+        recorded = (
+            PaymentService.completed_donation_upsert(values)
+            .returning(Donation.id, Donation.campaign_id, Donation.amount, Donation.donor_id, Donation.created_at)
+            .cte('recorded')
+        )
+        total = campaign_total_cte(recorded.c.campaign_id, recorded.c.amount)
+        stats = campaign_stats_cte(recorded.c.id, recorded.c.campaign_id, recorded.c.amount, recorded.c.donor_id)
+        activity = donation_activity_insert(recorded.c.id, recorded.c.donor_id).cte('activity')
+        row = (await db.execute(
+            select(recorded.c.id.label('donation_id'), total)
+            .select_from(recorded.outerjoin(total, true()))
+            .add_cte(stats)
+            .add_cte(activity)
+        )).first()
+
+        if row is None:
+            # Already recorded as completed; attribute it to the donor if that is new information
+            if values['donor_id'] is not None:
+                attributed = (await db.execute(
+                    update(Donation)
+                    .where(Donation.payment_id == values['payment_id'], Donation.donor_id.is_(None))
+                    .values(donor_id=values['donor_id'])
+                    .returning(Donation.id, Donation.campaign_id)
+                )).first()
+                if attributed is not None:
+                    await count_new_donor(db, attributed.campaign_id, values['donor_id'], attributed.id)
+                    await count_new_activity_donor(db, values['donor_id'], attributed.id)
+            donation = await db.scalar(select(Donation).where(Donation.payment_id == values['payment_id']))
+            await db.commit()
+            return donation
+
+        if values['donor_id'] is not None:
+            await count_new_donor(db, values['campaign_id'], values['donor_id'], row.donation_id)
+            await count_new_activity_donor(db, values['donor_id'], row.donation_id)
+        await apply_campaign_total(db, row)
+        await db.commit()
+        return Donation(id=row.donation_id, **values)
+
     @staticmethod
     async def handle_payment_success(
-        db: Session,
+        db: AsyncSession,
         payment_intent_id: str,
         donor_id: Optional[int] = None
     ):
         """Handle successful payment and create donation record"""
         try:
             # Retrieve payment intent from Stripe
-            payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+            payment_intent = await payment_gateway.retrieve_payment_intent(payment_intent_id)
             
             if payment_intent.status == 'succeeded':
-                metadata = payment_intent.metadata
-                campaign_id = int(metadata['campaign_id'])
-                amount = payment_intent.amount / 100  # Convert from cents
-                
-                # Check if donation already exists to prevent duplicates
-                existing_donation = db.query(Donation).filter(
-                    Donation.payment_id == payment_intent_id
-                ).first()
-                
-                if existing_donation:
-                    return existing_donation
-                
-                # Create donation record
-                donation = Donation(
-                    amount=amount,
-                    currency=payment_intent.currency.upper(),
-                    payment_status="completed",
-                    payment_id=payment_intent_id,
-                    donor_id=donor_id,
-                    campaign_id=campaign_id,
-                    is_anonymous=metadata.get('is_anonymous', 'False') == 'True',
-                    message=metadata.get('message', '') or None
-                )
-                
-                db.add(donation)
-                db.commit()
-                db.refresh(donation)
-                
-                # Update campaign amount and check if target reached
-                update_campaign_amount(db, campaign_id, amount)
-                
-                return donation
+                values = PaymentService.donation_values(payment_intent, "completed", donor_id)
+                return await PaymentService.record_completed_donation(db, values)
             else:
                 raise Exception(f"Payment not successful. Status: {payment_intent.status}")
                 
@@ -102,34 +155,30 @@ class PaymentService:
         except Exception as e:
             raise Exception(f"Payment processing error: {str(e)}")
 
+    @staticmethod
+    async def record_failed_donation(db: AsyncSession, values: dict) -> Donation:
+        """Record a failed donation for tracking, unless this payment is already recorded."""
+        donation = await db.scalar(
+            pg_insert(Donation).values(**values)
+            .on_conflict_do_nothing(index_elements=[Donation.payment_id])
+            .returning(Donation)
+        )
+        if donation is None:
+            donation = await db.scalar(select(Donation).where(Donation.payment_id == values['payment_id']))
+        await db.commit()
+        return donation
+
     @staticmethod
     async def handle_payment_failure(
-        db: Session,
+        db: AsyncSession,
         payment_intent_id: str,
         donor_id: Optional[int] = None
     ):
         """Handle failed payment"""
         try:
-            payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
-            metadata = payment_intent.metadata
-            
-            # Create failed donation record for tracking
-            donation = Donation(
-                amount=payment_intent.amount / 100,
-                currency=payment_intent.currency.upper(),
-                payment_status="failed",
-                payment_id=payment_intent_id,
-                donor_id=donor_id,
-                campaign_id=int(metadata['campaign_id']),
-                is_anonymous=metadata.get('is_anonymous', 'False') == 'True',
-                message=metadata.get('message', '') or None
-            )
-            
-            db.add(donation)
-            db.commit()
-            db.refresh(donation)
-            
-            return donation
+            payment_intent = await payment_gateway.retrieve_payment_intent(payment_intent_id)
+            values = PaymentService.donation_values(payment_intent, "failed", donor_id)
+            return await PaymentService.record_failed_donation(db, values)
             
         except Exception as e:
             raise Exception(f"Failed payment handling error: {str(e)}")
@@ -0,0 +1,123 @@
+import queue
+import smtplib
+import ssl
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces sends to at most `rate` messages per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the caller may send the next message (no-op when unlimited)."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class SMTPConnectionPool:
+    """Pool of authenticated SMTP connections reused across sends and batches."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str = "",
+        password: str = "",
+        use_tls: bool = True,
+        size: int = 4,
+        max_idle: float = 60.0,
+        timeout: float = 30.0
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.max_idle = max_idle
+        self.timeout = timeout
+        # Each idle entry is (connection, last_used)
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls(context=ssl.create_default_context())
+        if self.username and self.password:
+            server.login(self.username, self.password)
+        return server
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            try:
+                server, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            # Servers drop idle sessions; probe connections that sat unused for a while
+            if time.monotonic() - last_used < self.max_idle:
+                return server
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                # A reset or timed-out socket is as dead as a disconnected session
+                pass
+            self._discard(server)
+
+    @staticmethod
+    def _discard(server: Optional[smtplib.SMTP]):
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it is closed instead of returned if the session or socket broke."""
+        self._slots.acquire()
+        server = None
+        try:
+            server = self._checkout()
+            yield server
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError):
+            self._discard(server)
+            server = None
+            raise
+        except smtplib.SMTPException:
+            # The server refused this message, not the session; sendmail has already RSET it
+            raise
+        except OSError:
+            # Socket errors (SMTPException is an OSError too, so this comes after it)
+            self._discard(server)
+            server = None
+            raise
+        finally:
+            if server is not None:
+                self._idle.put((server, time.monotonic()))
+            self._slots.release()
+
+    def close(self):
+        """Close every idle connection."""
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(server)
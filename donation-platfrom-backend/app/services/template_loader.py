@@ -1,76 +1,184 @@
 import os
-from typing import Dict, Any, Optional
+import re
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple, List
 from pathlib import Path
 
+from app.core.config import settings
+
+# Matches {{placeholder}} markers in email templates
+PLACEHOLDER_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+
+class CompiledTemplate:
+    """Template parsed once into alternating literal segments and placeholder names."""
+
+    __slots__ = ("source", "literals", "placeholders")
+
+    def __init__(self, source: str):
+        self.source = source
+        # re.split with one group yields [literal, name, literal, name, ..., literal]
+        parts = PLACEHOLDER_PATTERN.split(source)
+        self.literals: List[str] = parts[0::2]
+        self.placeholders: List[str] = parts[1::2]
+
+    def render(self, context: Dict[str, Any]) -> str:
+        """Render in a single join; placeholders missing from the context are left as-is."""
+        literals = self.literals
+        out = [literals[0]]
+        for index, key in enumerate(self.placeholders, 1):
+            out.append(str(context[key]) if key in context else f"{{{{{key}}}}}")
+            out.append(literals[index])
+        return "".join(out)
+
+    @classmethod
+    def from_segments(cls, literals: List[str], placeholders: List[str]) -> "CompiledTemplate":
+        """Build a template from already split segments, without scanning the literals for placeholders."""
+        template = cls.__new__(cls)
+        template.literals = literals
+        template.placeholders = placeholders
+        template.source = "".join(
+            literal + (f"{{{{{placeholders[index]}}}}}" if index < len(placeholders) else "")
+            for index, literal in enumerate(literals)
+        )
+        return template
+
+    def partial(self, context: Dict[str, Any]) -> "CompiledTemplate":
+        """Fill the placeholders known now and keep the rest, e.g. shared campaign fields before per-recipient ones.
+
+        Filled values join the literal text and are never scanned again, so a campaign title
+        containing "{{greeting}}" stays literal text instead of becoming a placeholder.
+        """
+        literals = [self.literals[0]]
+        placeholders = []
+        for index, key in enumerate(self.placeholders, 1):
+            if key in context:
+                literals[-1] += str(context[key]) + self.literals[index]
+            else:
+                placeholders.append(key)
+                literals.append(self.literals[index])
+        return CompiledTemplate.from_segments(literals, placeholders)
+
+@lru_cache(maxsize=64)
+def compile_template(template_content: str) -> CompiledTemplate:
+    """Compile template source, reusing earlier compilations of the same text."""
+    return CompiledTemplate(template_content)
+
 class EmailTemplateLoader:
     """Utility class for loading email templates in multiple languages."""
-    
-    def __init__(self):
+
+    # Subject prefixes; the campaign title is appended
+    SUBJECT_PREFIXES = {
+        "new_campaign": {
+            "en": "🌟 New Campaign: ",
+            "ar": "🌟 حملة جديدة: ",
+            "es": "🌟 Nueva Campaña: ",
+            "fr": "🌟 Nouvelle Campagne: ",
+            "ru": "🌟 Новая Кампания: "
+        },
+        "campaign_completed": {
+            "en": "🎉 Campaign Completed: ",
+            "ar": "🎉 تم إكمال الحملة: ",
+            "es": "🎉 Campaña Completada: ",
+            "fr": "🎉 Campagne Terminée: ",
+            "ru": "🎉 Кампания Завершена: "
+        }
+    }
+    DEFAULT_SUBJECT_PREFIX = "Campaign Update: "
+
+    # (greeting with the recipient's name, greeting when the name is unknown)
+    GREETINGS = {
+        "en": ("Hi {name},", "Hi there,"),
+        "ar": ("مرحباً {name}،", "مرحباً،"),
+        "es": ("Hola {name},", "¡Hola!"),
+        "fr": ("Bonjour {name},", "Bonjour,"),
+        "ru": ("Здравствуйте, {name}!", "Здравствуйте!")
+    }
+
+    def __init__(self, auto_reload: Optional[bool] = None):
         # Get the absolute path to the templates directory
         current_dir = Path(__file__).parent.parent  # Go up to app directory
         self.templates_dir = current_dir / "templates" / "emails"
         self.supported_languages = ["en", "ar", "es", "fr", "ru"]
         self.default_language = "en"
-    
+        # Re-read templates whose file changed on disk (development only)
+        self.auto_reload = settings.ENVIRONMENT == "development" if auto_reload is None else auto_reload
+        # (language, template_name, format) -> (compiled template, file mtime)
+        self._cache: Dict[Tuple[str, str, str], Tuple[CompiledTemplate, float]] = {}
+        self.preload()
+
+    def preload(self):
+        """Compile every template file up front."""
+        for lang in self.supported_languages:
+            lang_dir = self.templates_dir / lang
+            if not lang_dir.is_dir():
+                continue
+            for path in lang_dir.iterdir():
+                if path.suffix in (".html", ".txt"):
+                    self._compile_file(lang, path.stem, path.suffix[1:])
+
+    def _compile_file(self, lang: str, template_name: str, format: str) -> Optional[CompiledTemplate]:
+        path = self.templates_dir / lang / f"{template_name}.{format}"
+        try:
+            mtime = os.path.getmtime(path)
+            with open(path, 'r', encoding='utf-8') as file:
+                compiled = CompiledTemplate(file.read())
+        except FileNotFoundError:
+            self._cache.pop((lang, template_name, format), None)
+            return None
+        self._cache[(lang, template_name, format)] = (compiled, mtime)
+        return compiled
+
+    def _get_cached(self, lang: str, template_name: str, format: str) -> Optional[CompiledTemplate]:
+        key = (lang, template_name, format)
+        cached = self._cache.get(key)
+        if cached is None:
+            return self._compile_file(lang, template_name, format) if self.auto_reload else None
+        if self.auto_reload:
+            try:
+                if os.path.getmtime(self.get_template_path(lang, template_name, format)) != cached[1]:
+                    return self._compile_file(lang, template_name, format)
+            except FileNotFoundError:
+                self._cache.pop(key, None)
+                return None
+        return cached[0]
+
     def get_template_path(self, language: str, template_name: str, format: str = "html") -> Path:
         """Get the path to a specific template file."""
         # Fallback to default language if requested language is not supported
         lang = language if language in self.supported_languages else self.default_language
         return self.templates_dir / lang / f"{template_name}.{format}"
-    
+
+    def get_template(self, language: str, template_name: str, format: str = "html") -> Optional[CompiledTemplate]:
+        """Get a compiled template, falling back to the default language."""
+        lang = language if language in self.supported_languages else self.default_language
+        template = self._get_cached(lang, template_name, format)
+        if template is None and lang != self.default_language:
+            template = self._get_cached(self.default_language, template_name, format)
+        return template
+
     def load_template(self, language: str, template_name: str, format: str = "html") -> Optional[str]:
-        """Load a template file and return its content."""
-        template_path = self.get_template_path(language, template_name, format)
-        
-        try:
-            with open(template_path, 'r', encoding='utf-8') as file:
-                return file.read()
-        except FileNotFoundError:
-            # Try fallback to default language
-            if language != self.default_language:
-                fallback_path = self.get_template_path(self.default_language, template_name, format)
-                try:
-                    with open(fallback_path, 'r', encoding='utf-8') as file:
-                        return file.read()
-                except FileNotFoundError:
-                    pass
-            return None
-    
+        """Load a template and return its source text."""
+        template = self.get_template(language, template_name, format)
+        return template.source if template else None
+
     def render_template(self, template_content: str, context: Dict[str, Any]) -> str:
         """Render a template with the given context."""
         if not template_content:
             return ""
-        
-        # Simple template replacement using double braces
-        rendered = template_content
-        for key, value in context.items():
-            placeholder = f"{{{{{key}}}}}"
-            rendered = rendered.replace(placeholder, str(value))
-        
-        return rendered
-    
+
+        return compile_template(template_content).render(context)
+
     def get_localized_subject(self, language: str, template_type: str, campaign_title: str) -> str:
         """Get localized email subject based on language and template type."""
-        subjects = {
-            "new_campaign": {
-                "en": f"🌟 New Campaign: {campaign_title}",
-                "ar": f"🌟 حملة جديدة: {campaign_title}",
-                "es": f"🌟 Nueva Campaña: {campaign_title}",
-                "fr": f"🌟 Nouvelle Campagne: {campaign_title}",
-                "ru": f"🌟 Новая Кампания: {campaign_title}"
-            },
-            "campaign_completed": {
-                "en": f"🎉 Campaign Completed: {campaign_title}",
-                "ar": f"🎉 تم إكمال الحملة: {campaign_title}",
-                "es": f"🎉 Campaña Completada: {campaign_title}",
-                "fr": f"🎉 Campagne Terminée: {campaign_title}",
-                "ru": f"🎉 Кампания Завершена: {campaign_title}"
-            }
-        }
-        
         # Fallback to default language if not found
         lang = language if language in self.supported_languages else self.default_language
-        return subjects.get(template_type, {}).get(lang, f"Campaign Update: {campaign_title}")
+        prefix = self.SUBJECT_PREFIXES.get(template_type, {}).get(lang, self.DEFAULT_SUBJECT_PREFIX)
+        return prefix + campaign_title
+
+    def get_greeting(self, language: str, name: Optional[str] = None) -> str:
+        """Get the localized greeting line for a recipient."""
+        named, anonymous = self.GREETINGS.get(language, self.GREETINGS[self.default_language])
+        return named.format(name=name) if name else anonymous
 
 # Create global template loader instance
 template_loader = EmailTemplateLoader()
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from app.db.models.user import User
 from app.schemas.user import UserCreate
 from app.auth.password import get_password_hash, verify_password
+from app.services.activity_rollup_service import new_user_activity_insert
 
 def create_user(db: Session, user_data: UserCreate):
     """Create a new user."""
@@ -21,8 +22,10 @@ def create_user(db: Session, user_data: UserCreate):
         full_name=user_data.full_name,
     )
     
-    # Save to DB
+    # Save to DB, queueing the signup for the activity rollups in the same transaction
     db.add(db_user)
+    db.flush()
+    db.execute(new_user_activity_insert(db_user.id))
     db.commit()
     db.refresh(db_user)
     
@@ -0,0 +1,177 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.campaign import Campaign
+from app.db.models.donation import Donation
+from app.db.models.webhook_event import WebhookEvent
+from app.services.activity_rollup_service import add_donation_activity
+from app.services.campaign_service import update_campaign_amount
+from app.services.donation_stats_service import add_campaign_stats
+from app.services.payment_service import PaymentService
+
+# Webhook event types that record a donation, and the payment status they record
+DONATION_EVENTS = {
+    "payment_intent.succeeded": "completed",
+    "payment_intent.payment_failed": "failed",
+}
+
+async def enqueue_webhook_event(db: AsyncSession, event) -> bool:
+    """Store a verified event for the webhook processor and commit.
+
+    Returns False if Stripe redelivered an event that is already queued.
+    """
+    queued_id = await db.scalar(
+        pg_insert(WebhookEvent)
+        .values(event_id=event['id'], event_type=event['type'], payload=event['data']['object'])
+        .on_conflict_do_nothing(index_elements=[WebhookEvent.event_id])
+        .returning(WebhookEvent.id)
+    )
+    await db.commit()
+    return queued_id is not None
+
+async def claim_pending_events(db: AsyncSession, limit: int) -> List[WebhookEvent]:
+    """Lock the oldest pending events, skipping those held by other processors."""
+    result = await db.execute(
+        select(WebhookEvent)
+        .where(WebhookEvent.status == "pending")
+        .order_by(WebhookEvent.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return list(result.scalars().all())
+
+def _reject(event: WebhookEvent, error: str):
+    """Give up on an event whose payload can never be ingested."""
+    event.status = "failed"
+    event.last_error = error
+    event.processed_at = datetime.now(timezone.utc)
+
+def mark_failed(event: WebhookEvent, error: Exception):
+    """Record a failed attempt; the event stays pending until it runs out of attempts."""
+    event.attempts += 1
+    event.last_error = str(error)
+    if event.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+        event.status = "failed"
+        event.processed_at = datetime.now(timezone.utc)
+
+async def ingest_events(db: AsyncSession, events: List[WebhookEvent]) -> Dict[int, float]:
+    """Record the donations carried by `events` in the caller's transaction (nothing is committed).
+
+    Donations are bulk inserted, then each campaign's total and stats and the time-series
+    buckets get one increment for the whole batch. Returns the amount added per campaign.
+    """
+    completed: Dict[str, dict] = {}
+    failed: Dict[str, dict] = {}
+    sources: Dict[int, List[WebhookEvent]] = defaultdict(list)
+    for event in events:
+        payment_status = DONATION_EVENTS.get(event.event_type)
+        if payment_status is None:
+            _reject(event, f"Unsupported event type {event.event_type}")
+            continue
+        try:
+            values = PaymentService.donation_values(event.payload, payment_status, None)
+        except (KeyError, TypeError, ValueError) as e:
+            _reject(event, f"Invalid payment intent payload: {e!r}")
+            continue
+        # Redeliveries of the same payment collapse into one row; a success wins over a failure
+        (completed if payment_status == "completed" else failed)[values['payment_id']] = values
+        sources[values['campaign_id']].append(event)
+
+    # Campaigns deleted since the payment was made would fail the whole insert
+    existing = set()
+    if sources:
+        existing = set((await db.scalars(select(Campaign.id).where(Campaign.id.in_(list(sources))))).all())
+    for campaign_id in set(sources) - existing:
+        for event in sources[campaign_id]:
+            _reject(event, f"Campaign {campaign_id} not found")
+
+    # Sorted by payment_id so concurrent processors take the unique index locks in the same order
+    completed_rows = sorted((v for v in completed.values() if v['campaign_id'] in existing), key=lambda v: v['payment_id'])
+    failed_rows = sorted(
+        (v for k, v in failed.items() if k not in completed and v['campaign_id'] in existing),
+        key=lambda v: v['payment_id']
+    )
+
+    totals: Dict[int, float] = defaultdict(float)
+    recorded = []
+    if completed_rows:
+        recorded = (await db.execute(
+            PaymentService.completed_donation_upsert(completed_rows)
+            .returning(Donation.id, Donation.campaign_id, Donation.amount, Donation.donor_id)
+        )).all()
+        for _, campaign_id, amount, _ in recorded:
+            totals[campaign_id] += amount
+    if failed_rows:
+        await db.execute(
+            pg_insert(Donation).values(failed_rows).on_conflict_do_nothing(index_elements=[Donation.payment_id])
+        )
+
+    # Campaign rows are locked in id order so concurrent batches never deadlock
+    for campaign_id in sorted(totals):
+        await update_campaign_amount(db, campaign_id, totals[campaign_id])
+    # Stats rows after every campaign row, as when a single donation is recorded
+    await add_campaign_stats(db, recorded)
+    await add_donation_activity(db, ((donation_id, donor_id) for donation_id, _, _, donor_id in recorded))
+
+    ingested = [event.id for event in events if event.status == "pending"]
+    if ingested:
+        await db.execute(
+            update(WebhookEvent)
+            .where(WebhookEvent.id.in_(ingested))
+            .values(status="processed", attempts=WebhookEvent.attempts + 1, last_error=None, processed_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+    return dict(totals)
+
+async def process_pending_events(db: AsyncSession, limit: int) -> int:
+    """Ingest one batch of pending events and commit. Returns how many were claimed.
+
+    If the batch fails, its events are retried one by one so a single bad event only
+    costs itself an attempt instead of holding back the rest of the queue.
+    """
+    events = await claim_pending_events(db, limit)
+    if not events:
+        await db.rollback()
+        return 0
+
+    event_ids = [event.id for event in events]
+    try:
+        await ingest_events(db, events)
+        await db.commit()
+        return len(events)
+    except Exception as e:
+        await db.rollback()
+        if len(events) == 1:
+            await _record_failure(db, event_ids[0], e)
+            return 1
+        print(f"❌ Webhook batch of {len(events)} failed, retrying one by one: {e}")
+
+    for event_id in event_ids:
+        event = (await db.execute(
+            select(WebhookEvent)
+            .where(WebhookEvent.id == event_id, WebhookEvent.status == "pending")
+            .with_for_update(skip_locked=True)
+        )).scalar_one_or_none()
+        if event is None:
+            await db.rollback()
+            continue
+        try:
+            await ingest_events(db, [event])
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            await _record_failure(db, event_id, e)
+    return len(event_ids)
+
+async def _record_failure(db: AsyncSession, event_id: int, error: Exception):
+    print(f"❌ Webhook event #{event_id} failed: {error}")
+    event = await db.get(WebhookEvent, event_id, with_for_update=True)
+    if event is not None:
+        mark_failed(event, error)
+    await db.commit()
@@ -0,0 +1,60 @@
+"""Back-fill the hourly/daily/monthly activity rollups from the donations and users tables.
+
+The rollups are kept up to date by app.workers.activity_rollup_folder; run this after bulk
+imports, fixing rows by hand, or to check that nothing has drifted. With --since, only the
+buckets from the start of that UTC month on are rebuilt.
+
+    python -m app.workers.activity_rollup_backfill                     # rebuild everything
+    python -m app.workers.activity_rollup_backfill --since 2025-08-01  # rebuild recent months
+    python -m app.workers.activity_rollup_backfill --check             # report drift, change nothing
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.db.database import AsyncSessionLocal, async_engine
+from app.services.activity_rollup_service import find_activity_drift, rebuild_activity_rollups
+
+
+def _utc_date(value: str) -> datetime:
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+
+async def backfill(since: Optional[datetime], check: bool) -> int:
+    """Report drifted buckets and, unless only checking, rebuild. Returns the drift count."""
+    async with AsyncSessionLocal() as db:
+        drift = await find_activity_drift(db, since)
+        await db.rollback()
+        for row in drift[:20]:
+            print(f"   {row.granularity} {row.bucket_start:%Y-%m-%d %H:%M}: "
+                  f"{row.donation_count or 0} donations / {row.actual_donation_count or 0} actual, "
+                  f"{row.donation_amount or 0:,.2f} / {row.actual_donation_amount or 0:,.2f}, "
+                  f"{row.donor_count or 0} donors / {row.actual_donor_count or 0}, "
+                  f"{row.new_users or 0} new users / {row.actual_new_users or 0}")
+        if len(drift) > 20:
+            print(f"   ... and {len(drift) - 20} more")
+        print(f"{'❌' if drift else '✅'} {len(drift)} bucket(s) with drifted counters")
+
+        if not check:
+            await rebuild_activity_rollups(db, since)
+            print("🧾 Activity rollups rebuilt")
+    return len(drift)
+
+
+async def main(since: Optional[datetime], check: bool) -> int:
+    try:
+        drifted = await backfill(since, check)
+    finally:
+        await async_engine.dispose()
+    return 1 if check and drifted else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the activity rollups from raw donations and users")
+    parser.add_argument("--since", type=_utc_date, default=None, help="Only buckets from this date's month on (YYYY-MM-DD, UTC)")
+    parser.add_argument("--check", action="store_true", help="Report drift and exit 1 if any, without rebuilding")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.since, args.check)))
@@ -0,0 +1,55 @@
+"""Background worker that folds queued donations and signups into the activity rollups.
+
+Recording a donation or a user only queues a pending_activity row, so requests never
+lock the shared hour/day/month buckets; this adds the queue to the buckets in batches.
+
+    python -m app.workers.activity_rollup_folder          # run forever
+    python -m app.workers.activity_rollup_folder --once   # fold what is pending and exit
+"""
+import argparse
+import asyncio
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal, async_engine
+from app.services.activity_rollup_service import fold_activity_rollups
+
+
+async def fold_all() -> int:
+    """Fold every pending row, one short transaction per batch. Returns the rows folded."""
+    folded = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            batch = await fold_activity_rollups(db, settings.ACTIVITY_FOLD_BATCH_SIZE)
+            await db.commit()
+            folded += batch
+            if batch < settings.ACTIVITY_FOLD_BATCH_SIZE:
+                return folded
+
+
+async def run_forever():
+    print(f"🧮 Activity rollup folder started (batch {settings.ACTIVITY_FOLD_BATCH_SIZE}, interval {settings.ACTIVITY_FOLD_INTERVAL}s)")
+    while True:
+        try:
+            await fold_all()
+        except Exception as e:
+            # Keep the worker alive across transient database errors
+            print(f"❌ Activity rollup folder error: {e}")
+        await asyncio.sleep(settings.ACTIVITY_FOLD_INTERVAL)
+
+
+async def main(once: bool):
+    try:
+        if once:
+            print(f"Folded {await fold_all():,} donations and signups into the activity rollups.")
+        else:
+            await run_forever()
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fold queued donations and signups into the activity rollups")
+    parser.add_argument("--once", action="store_true", help="Fold pending rows and exit")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.once))
@@ -0,0 +1,56 @@
+"""Background worker that folds sharded donation counters into campaign totals.
+
+Only needed when CAMPAIGN_AMOUNT_SHARDS is set. Donations fold their own shard when the
+campaign row is free; this catches the amounts skipped while it was busy, and the
+donations waiting to be counted in campaign stats.
+
+    python -m app.workers.amount_folder          # run forever
+    python -m app.workers.amount_folder --once   # fold what is pending and exit
+"""
+import argparse
+import asyncio
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal, async_engine
+from app.services.campaign_service import fold_campaign_amount_shards, get_campaigns_with_unfolded_amounts
+
+
+async def fold_all() -> float:
+    """Fold every campaign with pending shard amounts, one short transaction each."""
+    folded = 0.0
+    async with AsyncSessionLocal() as db:
+        campaign_ids = await get_campaigns_with_unfolded_amounts(db)
+        await db.rollback()
+        for campaign_id in campaign_ids:
+            folded += await fold_campaign_amount_shards(db, campaign_id)
+            await db.commit()
+    return folded
+
+
+async def run_forever():
+    print(f"🧮 Amount folder started ({settings.CAMPAIGN_AMOUNT_SHARDS} shards, interval {settings.AMOUNT_FOLD_INTERVAL}s)")
+    while True:
+        try:
+            await fold_all()
+        except Exception as e:
+            # Keep the worker alive across transient database errors
+            print(f"❌ Amount folder error: {e}")
+        await asyncio.sleep(settings.AMOUNT_FOLD_INTERVAL)
+
+
+async def main(once: bool):
+    try:
+        if once:
+            print(f"Folded {await fold_all():,.2f} into campaign totals.")
+        else:
+            await run_forever()
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fold sharded donation counters into campaign totals")
+    parser.add_argument("--once", action="store_true", help="Fold pending amounts and exit")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.once))
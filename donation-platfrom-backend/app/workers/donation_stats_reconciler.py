@@ -0,0 +1,53 @@
+"""Rebuild the campaign donation stats rollup from the donations table.
+
+The stats are kept up to date as donations are recorded; run this after fixing donation
+rows by hand, bulk imports, or to check that nothing has drifted.
+
+    python -m app.workers.donation_stats_reconciler                   # rebuild all campaigns
+    python -m app.workers.donation_stats_reconciler --campaign-id 42  # rebuild one campaign
+    python -m app.workers.donation_stats_reconciler --check           # report drift, change nothing
+"""
+import argparse
+import asyncio
+import sys
+from typing import Optional
+
+from app.db.database import AsyncSessionLocal, async_engine
+from app.services.donation_stats_service import find_stats_drift, rebuild_campaign_stats
+
+
+async def reconcile(campaign_id: Optional[int], check: bool) -> int:
+    """Report drifted campaigns and, unless only checking, rebuild. Returns the drift count."""
+    async with AsyncSessionLocal() as db:
+        drift = await find_stats_drift(db, campaign_id)
+        await db.rollback()
+        for row in drift[:20]:
+            print(f"   campaign {row.campaign_id}: "
+                  f"{row.donation_count or 0} donations / {row.actual_donation_count or 0} actual, "
+                  f"{row.total_amount or 0:,.2f} / {row.actual_total_amount or 0:,.2f}, "
+                  f"{row.donor_count or 0} donors / {row.actual_donor_count or 0}")
+        if len(drift) > 20:
+            print(f"   ... and {len(drift) - 20} more")
+        print(f"{'❌' if drift else '✅'} {len(drift)} campaign(s) with drifted stats")
+
+        if not check:
+            await rebuild_campaign_stats(db, campaign_id)
+            print("🧾 Campaign donation stats rebuilt")
+    return len(drift)
+
+
+async def main(campaign_id: Optional[int], check: bool) -> int:
+    try:
+        drifted = await reconcile(campaign_id, check)
+    finally:
+        await async_engine.dispose()
+    return 1 if check and drifted else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild campaign donation stats from raw donations")
+    parser.add_argument("--campaign-id", type=int, default=None, help="Only this campaign")
+    parser.add_argument("--check", action="store_true", help="Report drift and exit 1 if any, without rebuilding")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.campaign_id, args.check)))
@@ -0,0 +1,97 @@
+"""Background worker that drains the email outbox outside the API process.
+
+    python -m app.workers.email_dispatcher          # run forever
+    python -m app.workers.email_dispatcher --once   # drain what is due and exit
+"""
+import argparse
+import time
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.services.delivery_job_service import start_delivery_job, record_chunk, finish_delivery_job
+from app.services.email_service import email_service
+from app.services.outbox_service import LeaseLost, claim_next_entry, campaign_from_snapshot, mark_sent, mark_failed, renew_lease
+
+
+def dispatch_next() -> bool:
+    """Send one due outbox entry. Returns False when nothing is due.
+
+    The entry is claimed with a lease and committed right away, so no row lock or
+    transaction is held while mail is sent. Each recipient chunk is read with its own short
+    query, and its checkpoint, which renews the lease, is committed before the next one is
+    read; the checkpoint is the only state carried between chunks. If the worker dies, the
+    lease passes and another dispatcher claims the entry and resumes after the last checkpoint.
+    """
+    with SessionLocal(expire_on_commit=False) as db:
+        entry = claim_next_entry(db)
+        if entry is None:
+            return False
+        job = start_delivery_job(db, entry)
+
+    print(f"📤 Dispatching outbox entry #{entry.id} ({entry.notification})")
+    after = (job.last_language, job.last_subscriber_id) if job.last_subscriber_id is not None else None
+
+    def checkpoint(language: str, last_subscriber_id: int, sent: int, failed: int):
+        with SessionLocal() as db:
+            renew_lease(db, entry)
+            record_chunk(db, job, language, last_subscriber_id, sent, failed)
+            db.commit()
+
+    error = None
+    try:
+        campaign = campaign_from_snapshot(entry.payload)
+        email_service.send_notification(SessionLocal, entry.notification, campaign, after, checkpoint)
+    except LeaseLost as e:
+        # Another dispatcher has taken over; it resumes from the last checkpoint
+        print(f"⚠️  {e}")
+        return True
+    except Exception as e:
+        print(f"❌ Outbox entry #{entry.id} failed: {e}")
+        error = e
+
+    with SessionLocal() as db:
+        try:
+            if error is None:
+                mark_sent(db, entry)
+                finish_delivery_job(db, job)
+            else:
+                final = mark_failed(db, entry, error)
+                finish_delivery_job(db, job, error, final=final)
+            db.commit()
+        except LeaseLost as e:
+            print(f"⚠️  {e}")
+    return True
+
+
+def drain() -> int:
+    """Dispatch every entry that is currently due."""
+    dispatched = 0
+    while dispatch_next():
+        dispatched += 1
+    return dispatched
+
+
+def run_forever():
+    print(f"📬 Email dispatcher started (poll interval {settings.EMAIL_DISPATCH_INTERVAL}s)")
+    while True:
+        try:
+            if not drain():
+                time.sleep(settings.EMAIL_DISPATCH_INTERVAL)
+        except Exception as e:
+            # Keep the worker alive across transient database errors
+            print(f"❌ Email dispatcher error: {e}")
+            time.sleep(settings.EMAIL_DISPATCH_INTERVAL)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send queued email notifications")
+    parser.add_argument("--once", action="store_true", help="Drain due entries and exit")
+    args = parser.parse_args()
+
+    try:
+        if args.once:
+            print(f"Dispatched {drain()} outbox entries.")
+        else:
+            run_forever()
+    finally:
+        email_service.close()
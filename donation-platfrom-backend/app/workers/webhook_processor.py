@@ -0,0 +1,57 @@
+"""Background worker that ingests queued Stripe webhook events in batches.
+
+The webhook endpoint only verifies and stores events; this records the donations, one
+bulk insert and one total increment per campaign for each batch. Several processors
+can run side by side.
+
+    python -m app.workers.webhook_processor          # run forever
+    python -m app.workers.webhook_processor --once   # drain the queue and exit
+"""
+import argparse
+import asyncio
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal, async_engine
+from app.services.webhook_service import process_pending_events
+
+
+async def drain(batch_size: int) -> int:
+    """Process batches until no pending event is left."""
+    processed = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            claimed = await process_pending_events(db, batch_size)
+            if not claimed:
+                return processed
+            processed += claimed
+
+
+async def run_forever(batch_size: int):
+    print(f"🪝 Webhook processor started (batch size {batch_size}, poll interval {settings.WEBHOOK_POLL_INTERVAL}s)")
+    while True:
+        try:
+            if not await drain(batch_size):
+                await asyncio.sleep(settings.WEBHOOK_POLL_INTERVAL)
+        except Exception as e:
+            # Keep the worker alive across transient database errors
+            print(f"❌ Webhook processor error: {e}")
+            await asyncio.sleep(settings.WEBHOOK_POLL_INTERVAL)
+
+
+async def main(once: bool, batch_size: int):
+    try:
+        if once:
+            print(f"Processed {await drain(batch_size)} webhook events.")
+        else:
+            await run_forever(batch_size)
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record donations from queued Stripe webhook events")
+    parser.add_argument("--once", action="store_true", help="Drain pending events and exit")
+    parser.add_argument("--batch-size", type=int, default=settings.WEBHOOK_BATCH_SIZE, help="Events per transaction")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.once, args.batch_size))
@@ -0,0 +1,175 @@
+"""Fixtures for the test suite, which runs against a real Postgres server.
+
+Tests use their own database, TEST_DATABASE_URL (by default DATABASE_URL with "_test"
+appended to the database name). It is dropped, recreated, migrated to head and seeded
+once per session; every test is skipped when the server cannot be reached.
+
+    pip install -r requirements-dev.txt
+    pytest
+"""
+import os
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+
+# The app builds its engines from settings when app.db.database is first imported
+_url = make_url(settings.DATABASE_URL)
+settings.DATABASE_URL = os.environ.get("TEST_DATABASE_URL") or _url.set(
+    database=f"{_url.database}_test"
+).render_as_string(hide_password=False)
+settings.ASYNC_DATABASE_URL = None
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.auth.jwt import create_access_token  # noqa: E402
+from app.db.database import SessionLocal, async_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.activity_rollup_service import activity_rebuild_statements  # noqa: E402
+from app.services.donation_stats_service import stats_rebuild_statements  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEED_CAMPAIGNS = 60
+SEED_DONATIONS = 600
+
+SEED_SQL = [
+    """
+    INSERT INTO users (email, username, hashed_password, full_name, is_active, is_admin)
+    SELECT 'test-user-' || i || '@example.com', 'test_user_' || i, '!', 'Test User ' || i, true, i = 1
+    FROM generate_series(1, 20) i
+    """,
+    "INSERT INTO categories (name, slug) VALUES ('Water', 'water'), ('Education', 'education'), ('Health', 'health')",
+    """
+    INSERT INTO campaigns (title, description, markdown_text, target_amount, current_amount,
+                           status, lang, creator_id, created_at)
+    SELECT
+        (ARRAY['Clean water', 'School books', 'Medical care', 'Food parcels', 'Winter shelter'])[1 + i % 5]
+            || ' for village ' || i,
+        'Campaign ' || i || ' helping families with ' ||
+            (ARRAY['water wells', 'school supplies', 'clinic visits', 'food', 'blankets'])[1 + i % 5],
+        '# Campaign ' || i,
+        1000 + i * 10, 0,
+        (ARRAY['ACTIVE', 'ACTIVE', 'ACTIVE', 'COMPLETED', 'DRAFT', 'PENDING'])[1 + i % 6]::campaignstatus,
+        (ARRAY['en', 'ar', 'fr', 'es', 'ru'])[1 + i % 5],
+        1 + i % 5,
+        now() - i * interval '1 day'
+    FROM generate_series(1, :campaigns) i
+    """,
+    """
+    INSERT INTO campaign_categories (campaign_id, category_id)
+    SELECT c.id, cat.id FROM campaigns c JOIN categories cat ON cat.id % 3 <> c.id % 3
+    """,
+    """
+    INSERT INTO donations (amount, currency, is_anonymous, payment_status, payment_id,
+                           donor_id, campaign_id, created_at)
+    SELECT
+        5 + i % 100, 'USD', i % 7 = 0,
+        (ARRAY['completed', 'completed', 'completed', 'pending', 'failed'])[1 + i % 5],
+        'pi_test_' || i,
+        CASE WHEN i % 4 = 0 THEN NULL ELSE 1 + i % 20 END,
+        1 + i % :campaigns,
+        now() - (i % 90) * interval '1 day' - (i % 86400) * interval '1 second'
+    FROM generate_series(1, :donations) i
+    """,
+    """
+    INSERT INTO newsletter_subscriptions (email, is_active, language, source)
+    SELECT 'test-subscriber-' || i || '@example.com', i % 10 <> 0,
+           (ARRAY['en', 'ar', 'fr', 'es', 'ru'])[1 + i % 5], 'footer'
+    FROM generate_series(1, 50) i
+    """,
+]
+
+
+def recreate_database(url: str):
+    """Drop and create the database named in `url` through the server's maintenance database."""
+    url = make_url(url)
+    maintenance = create_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    try:
+        with maintenance.connect() as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{url.database}" WITH (FORCE)'))
+            conn.execute(text(f'CREATE DATABASE "{url.database}"'))
+    finally:
+        maintenance.dispose()
+
+
+def alembic_config() -> Config:
+    """Alembic config for this checkout; env.py migrates settings.DATABASE_URL."""
+    config = Config()
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return config
+
+
+@pytest.fixture(scope="session")
+def database():
+    """The test database, migrated to head and seeded."""
+    try:
+        recreate_database(settings.DATABASE_URL)
+    except OperationalError as e:
+        pytest.skip(f"Postgres is not reachable: {e.orig}")
+    command.upgrade(alembic_config(), "head")
+
+    db = SessionLocal()
+    try:
+        for statement in SEED_SQL:
+            db.execute(text(statement), {"campaigns": SEED_CAMPAIGNS, "donations": SEED_DONATIONS})
+        # Seeded rows bypass the ingestion paths that maintain the rollups
+        for statement in stats_rebuild_statements() + activity_rebuild_statements():
+            db.execute(statement)
+        db.commit()
+    finally:
+        db.close()
+    return settings.DATABASE_URL
+
+
+@pytest.fixture(scope="session")
+def client(database):
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def admin_headers(database):
+    db = SessionLocal()
+    try:
+        admin_id = db.scalar(text("SELECT id FROM users WHERE is_admin ORDER BY id LIMIT 1"))
+    finally:
+        db.close()
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(admin_id)})}"}
+
+
+@pytest.fixture(scope="session")
+def campaign_ids(database):
+    """Ids of the seeded active campaigns, newest first."""
+    db = SessionLocal()
+    try:
+        return db.scalars(text("SELECT id FROM campaigns WHERE status = 'ACTIVE' ORDER BY id DESC")).all()
+    finally:
+        db.close()
+
+
+class StatementLog(list):
+    """SQL statements the API sent to the database."""
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.append((statement, tuple(parameters or ())))
+
+
+@pytest.fixture
+def statements():
+    """Context manager factory recording every statement the API executes within it."""
+    @contextmanager
+    def recording():
+        log = StatementLog()
+        event.listen(async_engine.sync_engine, "before_cursor_execute", log)
+        try:
+            yield log
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", log)
+    return recording
@@ -0,0 +1,96 @@
+"""Donations and signups queue their activity and the folder adds it to the rollups.
+
+Recording must leave the shared buckets alone; the drift check ignores queued rows, and
+after folding, in batches small enough to split a donor's donations, the buckets match
+the raw tables exactly.
+"""
+import asyncio
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models import ActivityRollup, PendingActivity
+from app.schemas.user import UserCreate
+from app.services.activity_rollup_service import find_activity_drift, fold_activity_rollups
+from app.services.payment_service import PaymentService
+from app.services.user_service import create_user
+
+
+def _donation(campaign_id, donor_id, payment_id=None):
+    return {
+        'amount': 40.0, 'currency': 'USD', 'payment_status': 'completed',
+        'payment_id': payment_id or f"pi_activity_{uuid.uuid4().hex}", 'donor_id': donor_id,
+        'campaign_id': campaign_id, 'is_anonymous': False, 'message': None
+    }
+
+
+def test_activity_is_folded(database, campaign_ids):
+    campaign_id = campaign_ids[0]
+    engine = create_async_engine(settings.async_database_url, poolclass=NullPool)
+
+    async def totals(db):
+        row = (await db.execute(
+            select(func.sum(ActivityRollup.donation_count), func.sum(ActivityRollup.new_users))
+            .where(ActivityRollup.granularity == "month")
+        )).one()
+        pending = await db.scalar(select(func.count()).select_from(PendingActivity))
+        drift = await find_activity_drift(db)
+        await db.rollback()
+        return tuple(row), pending, drift
+
+    async def fold(db, limit):
+        while await fold_activity_rollups(db, limit):
+            await db.commit()
+        await db.commit()
+
+    async def run():
+        try:
+            async with AsyncSession(engine) as db:
+                # Earlier tests may have queued rows
+                await fold(db, 1000)
+                before, _, _ = await totals(db)
+                anonymous = _donation(campaign_id, None)
+                await PaymentService.record_completed_donation(db, _donation(campaign_id, 5))
+                await PaymentService.record_completed_donation(db, _donation(campaign_id, 5))
+                await PaymentService.record_completed_donation(db, anonymous)
+                await PaymentService.record_completed_donation(db, {**anonymous, 'donor_id': 9})
+                await asyncio.to_thread(signup)
+                queued, pending, drift = await totals(db)
+                assert queued == before
+                assert pending == 5
+                assert drift == []
+
+                await fold(db, 2)
+                (donations, users), pending, drift = await totals(db)
+                assert (donations, users) == (before[0] + 3, before[1] + 1)
+                assert pending == 0
+                assert drift == []
+
+                # A replay attributing a donation already counted queues the donor alone
+                late = _donation(campaign_id, None)
+                await PaymentService.record_completed_donation(db, late)
+                await fold(db, 2)
+                await PaymentService.record_completed_donation(db, {**late, 'donor_id': 13})
+                _, pending, drift = await totals(db)
+                assert pending == 1
+                assert drift == []
+                await fold(db, 2)
+                _, pending, drift = await totals(db)
+                assert pending == 0
+                assert drift == []
+        finally:
+            await engine.dispose()
+
+    def signup():
+        name = uuid.uuid4().hex[:12]
+        db = SessionLocal()
+        try:
+            assert create_user(db, UserCreate(email=f"{name}@example.com", username=name, password="password123"))
+        finally:
+            db.close()
+
+    asyncio.run(run())
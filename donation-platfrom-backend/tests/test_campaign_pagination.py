@@ -0,0 +1,73 @@
+"""Following next_cursor visits every campaign exactly once, in (created_at, id) order.
+
+A few campaigns share one created_at so pages must break ties on id, and a campaign
+published mid-scroll must not shift later pages the way OFFSET would.
+"""
+import pytest
+from sqlalchemy import text
+
+from app.db.database import SessionLocal
+
+_INSERT = text("""
+    INSERT INTO campaigns (title, description, markdown_text, target_amount, current_amount,
+                           status, lang, creator_id, created_at)
+    SELECT 'Tied campaign ' || i, 'Shares its created_at', '#', 1000, 0, 'ACTIVE', 'en', 1, :created_at
+    FROM generate_series(1, :count) i
+    RETURNING id
+""")
+
+
+def _execute(statement, **params):
+    with SessionLocal() as db:
+        rows = db.execute(statement, params).scalars().all()
+        db.commit()
+        return rows
+
+
+def _active_ids():
+    return _execute(text("SELECT id FROM campaigns WHERE status = 'ACTIVE' ORDER BY created_at DESC, id DESC"))
+
+
+@pytest.fixture
+def added(database):
+    """Campaigns inserted by a test, removed afterwards."""
+    ids = []
+    yield ids
+    with SessionLocal() as db:
+        db.execute(text("DELETE FROM campaigns WHERE id = ANY(:ids)"), {'ids': ids})
+        db.commit()
+
+
+def _scroll(client, page_size, between_pages=None):
+    seen, cursor = [], None
+    while True:
+        params = {'page_size': page_size, 'fields': 'id'}
+        if cursor:
+            params['cursor'] = cursor
+        body = client.get("/api/v1/campaigns/public", params=params).json()
+        seen += [item['id'] for item in body['items']]
+        cursor = body['pagination']['next_cursor']
+        assert body['pagination']['has_next'] == (cursor is not None)
+        if cursor is None:
+            return seen
+        if between_pages:
+            between_pages()
+            between_pages = None
+
+
+def test_cursor_pages_have_no_duplicates_or_gaps(client, added):
+    # Straddle a page boundary with campaigns sharing one created_at
+    added += _execute(_INSERT, created_at="2000-01-01T00:00:00+00:00", count=5)
+    expected = _active_ids()
+    for page_size in (1, 4, 7, 100):
+        assert _scroll(client, page_size) == expected
+
+
+def test_new_campaign_does_not_shift_later_pages(client, added):
+    expected = _active_ids()
+
+    def publish():
+        added.extend(_execute(_INSERT, created_at="2100-01-01T00:00:00+00:00", count=1))
+
+    # Newer than everything already scrolled past, so it belongs before the first page
+    assert _scroll(client, 4, publish) == expected
@@ -0,0 +1,94 @@
+"""With sharded totals, donations queue their campaign stats and a fold counts them.
+
+A donation recorded while another transaction holds the campaign row must leave the stats
+row alone; the drift check ignores it until it is folded, and after the fold the stats
+match the donations exactly.
+"""
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models import CampaignDonationStats, PendingCampaignStats
+from app.services.campaign_service import fold_campaign_amount_shards
+from app.services.donation_stats_service import find_stats_drift
+from app.services.payment_service import PaymentService
+
+
+@pytest.fixture
+def sharded(monkeypatch):
+    monkeypatch.setattr(settings, "CAMPAIGN_AMOUNT_SHARDS", 4)
+
+
+def _donation(campaign_id, donor_id, payment_id=None):
+    return {
+        'amount': 25.0, 'currency': 'USD', 'payment_status': 'completed',
+        'payment_id': payment_id or f"pi_stats_{uuid.uuid4().hex}", 'donor_id': donor_id,
+        'campaign_id': campaign_id, 'is_anonymous': False, 'message': None
+    }
+
+
+def test_sharded_stats_are_folded(database, sharded, campaign_ids):
+    campaign_id = campaign_ids[0]
+    engine = create_async_engine(settings.async_database_url, poolclass=NullPool)
+
+    async def stats(db):
+        row = (await db.execute(
+            select(CampaignDonationStats.donation_count, CampaignDonationStats.donor_count)
+            .where(CampaignDonationStats.campaign_id == campaign_id)
+        )).first()
+        pending = await db.scalar(select(func.count()).select_from(PendingCampaignStats))
+        drift = await find_stats_drift(db, campaign_id)
+        await db.rollback()
+        return (tuple(row) if row else (0, 0)), pending, drift
+
+    async def run(holder):
+        try:
+            async with AsyncSession(engine) as db:
+                before, _, _ = await stats(db)
+                anonymous = _donation(campaign_id, None)
+                # Only the fold, which skips a busy campaign row, may write the stats row
+                holder.execute(text("SELECT id FROM campaigns WHERE id = :id FOR NO KEY UPDATE"), {"id": campaign_id})
+                await PaymentService.record_completed_donation(db, _donation(campaign_id, 7))
+                await PaymentService.record_completed_donation(db, _donation(campaign_id, 7))
+                await PaymentService.record_completed_donation(db, anonymous)
+                # A replay attributing a donation still waiting for its fold queues its donor
+                await PaymentService.record_completed_donation(db, {**anonymous, 'donor_id': 3})
+                queued, pending, drift = await stats(db)
+                assert queued == before
+                assert pending == 4
+                assert drift == []
+                holder.rollback()
+
+                await fold_campaign_amount_shards(db, campaign_id)
+                await db.commit()
+                folded, pending, drift = await stats(db)
+                assert folded[0] == before[0] + 3
+                assert pending == 0
+                assert drift == []
+
+                # A replay attributing a donation already counted queues the donor alone
+                late = _donation(campaign_id, None)
+                await PaymentService.record_completed_donation(db, late)
+                await PaymentService.record_completed_donation(db, {**late, 'donor_id': 19})
+                _, pending, drift = await stats(db)
+                assert pending == 1
+                assert drift == []
+                await fold_campaign_amount_shards(db, campaign_id)
+                await db.commit()
+                _, pending, drift = await stats(db)
+                assert pending == 0
+                assert drift == []
+        finally:
+            await engine.dispose()
+
+    holder = SessionLocal()
+    try:
+        asyncio.run(run(holder))
+    finally:
+        holder.close()
@@ -0,0 +1,210 @@
+"""The email outbox leases entries to one dispatcher at a time and retries failures with backoff.
+
+Claims commit right away, so nothing stays locked while mail is sent; an entry whose
+dispatcher died is claimed again once its lease passes. SMTP is replaced by a recorder.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.db.database import SessionLocal, engine
+from app.db.models import Campaign, EmailDeliveryJob, EmailOutbox, NewsletterSubscription
+from app.services.email_service import email_service
+from app.services.outbox_service import (
+    LeaseLost, claim_next_entry, enqueue_campaign_notification, mark_failed, mark_sent, renew_lease
+)
+from app.workers.email_dispatcher import dispatch_next
+
+
+@pytest.fixture
+def entry_id(database, campaign_ids):
+    """A due new_campaign entry in an otherwise empty outbox."""
+    with SessionLocal(expire_on_commit=False) as db:
+        db.execute(delete(EmailOutbox))
+        entry = enqueue_campaign_notification(db, "new_campaign", db.get(Campaign, campaign_ids[0]))
+        db.commit()
+    yield entry.id
+    with SessionLocal() as db:
+        db.execute(delete(EmailOutbox))
+        db.commit()
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Recipients of every message the email service hands to SMTP."""
+    recipients = []
+
+    def deliver(to_email, message):
+        recipients.append(to_email)
+        return True
+
+    monkeypatch.setattr(email_service, "use_tls", False)  # no credentials needed
+    monkeypatch.setattr(email_service, "_deliver", deliver)
+    return recipients
+
+
+def _claim():
+    with SessionLocal(expire_on_commit=False) as db:
+        return claim_next_entry(db)
+
+
+def _entry(entry_id):
+    with SessionLocal() as db:
+        return db.get(EmailOutbox, entry_id)
+
+
+def _expire_lease(entry_id):
+    with SessionLocal() as db:
+        db.execute(
+            update(EmailOutbox).where(EmailOutbox.id == entry_id)
+            .values(locked_until=datetime.now(timezone.utc) - timedelta(seconds=1))
+        )
+        db.commit()
+
+
+def test_claim_leases_without_holding_a_lock(entry_id):
+    entry = _claim()
+    assert entry.id == entry_id
+    assert entry.status == "processing"
+    assert entry.locked_until > datetime.now(timezone.utc)
+    # Other dispatchers skip the leased entry, and nothing keeps its row locked
+    assert _claim() is None
+    with SessionLocal() as db:
+        db.execute(text("SELECT id FROM email_outbox WHERE id = :id FOR UPDATE NOWAIT"), {"id": entry_id})
+
+
+def test_expired_lease_is_claimed_again(entry_id):
+    first = _claim()
+    _expire_lease(entry_id)
+    second = _claim()
+    assert second.id == entry_id
+    # The first dispatcher can no longer checkpoint or finish the entry
+    with SessionLocal() as db:
+        with pytest.raises(LeaseLost):
+            renew_lease(db, first)
+        with pytest.raises(LeaseLost):
+            mark_sent(db, first)
+        renew_lease(db, second)
+        mark_sent(db, second)
+        db.commit()
+    assert _entry(entry_id).status == "sent"
+
+
+def test_failed_attempts_back_off_until_they_run_out(entry_id):
+    for attempt in range(1, settings.EMAIL_OUTBOX_MAX_ATTEMPTS + 1):
+        entry = _claim()
+        assert entry.id == entry_id
+        with SessionLocal() as db:
+            final = mark_failed(db, entry, RuntimeError(f"attempt {attempt}"))
+            db.commit()
+        stored = _entry(entry_id)
+        assert stored.attempts == attempt
+        assert stored.last_error == f"attempt {attempt}"
+        if attempt < settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            assert not final
+            assert stored.status == "pending"
+            delay = (stored.available_at - datetime.now(timezone.utc)).total_seconds()
+            assert 30 * 2 ** attempt - 5 < delay <= 30 * 2 ** attempt
+            # Not due before its retry time
+            assert _claim() is None
+            with SessionLocal() as db:
+                db.execute(update(EmailOutbox).where(EmailOutbox.id == entry_id).values(available_at=datetime.now(timezone.utc)))
+                db.commit()
+    assert final
+    assert stored.status == "failed"
+    assert _claim() is None
+
+
+def test_dispatch_sends_to_every_active_subscriber(entry_id, sent):
+    assert dispatch_next()
+    assert not dispatch_next()
+    with SessionLocal() as db:
+        active = db.scalars(select(NewsletterSubscription.email).where(NewsletterSubscription.is_active)).all()
+        job = db.scalar(select(EmailDeliveryJob).where(EmailDeliveryJob.outbox_id == entry_id))
+        entry = db.get(EmailOutbox, entry_id)
+        assert (entry.status, entry.locked_until) == ("sent", None)
+        assert (job.status, job.sent_count, job.failed_count) == ("completed", len(active), 0)
+    assert sorted(sent) == sorted(active)
+
+
+def test_dispatch_failure_is_retried(entry_id, sent, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("template exploded")
+
+    monkeypatch.setattr(email_service, "send_notification", broken)
+    assert dispatch_next()
+    with SessionLocal() as db:
+        entry = db.get(EmailOutbox, entry_id)
+        job = db.scalar(select(EmailDeliveryJob).where(EmailDeliveryJob.outbox_id == entry_id))
+        assert (entry.status, entry.attempts, entry.last_error) == ("pending", 1, "template exploded")
+        assert job.status == "interrupted"
+    assert sent == []
+
+
+def test_claim_does_not_wait_for_other_dispatchers(entry_id):
+    with SessionLocal() as holder:
+        holder.execute(text("SELECT id FROM email_outbox WHERE id = :id FOR UPDATE"), {"id": entry_id})
+        with SessionLocal() as db:
+            db.execute(text("SET lock_timeout = '1s'"))
+            try:
+                assert claim_next_entry(db) is None
+            except OperationalError:
+                pytest.fail("claim waited for a locked entry")
+
+
+class Crash(BaseException):
+    """The worker process dying mid-send: nothing is caught or recorded."""
+
+
+def test_dispatch_resumes_from_the_last_checkpoint(entry_id, monkeypatch):
+    monkeypatch.setattr(email_service, "use_tls", False)
+    monkeypatch.setattr(email_service, "batch_size", 4)
+    runs = [[], []]
+
+    def deliver(to_email, message):
+        if len(runs[0]) >= 10 and not runs[1] and crashing:
+            raise Crash()
+        (runs[0] if crashing else runs[1]).append(to_email)
+        return True
+
+    monkeypatch.setattr(email_service, "_deliver", deliver)
+    crashing = True
+    with pytest.raises(Crash):
+        dispatch_next()
+    # The dead dispatcher still holds the lease
+    assert not dispatch_next()
+    _expire_lease(entry_id)
+    crashing = False
+    assert dispatch_next()
+
+    with SessionLocal() as db:
+        active = db.scalars(select(NewsletterSubscription.email).where(NewsletterSubscription.is_active)).all()
+        job = db.scalar(select(EmailDeliveryJob).where(EmailDeliveryJob.outbox_id == entry_id))
+        assert (job.status, job.runs, job.sent_count, job.failed_count) == ("completed", 2, len(active), 0)
+    first, second = runs
+    assert set(first) | set(second) == set(active)
+    # Only the chunk in flight when the worker died is sent twice
+    assert len(set(first) & set(second)) < 4
+    assert len(second) == len(set(second))
+
+
+def test_nothing_is_held_open_while_sending(entry_id, monkeypatch):
+    monkeypatch.setattr(email_service, "use_tls", False)
+    monkeypatch.setattr(email_service, "batch_size", 4)
+    open_transactions = []
+
+    def deliver(to_email, message):
+        # In autocommit, so the probes running on other sender threads never show up themselves
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            open_transactions.append(conn.scalar(text(
+                "SELECT count(*) FROM pg_stat_activity "
+                "WHERE datname = current_database() AND state LIKE 'idle in transaction%'"
+            )))
+        return True
+
+    monkeypatch.setattr(email_service, "_deliver", deliver)
+    assert dispatch_next()
+    assert open_transactions and not any(open_transactions)
@@ -0,0 +1,27 @@
+"""Shared campaign fields are filled once and per-recipient placeholders stay separate.
+
+Text substituted by `partial` is never scanned for placeholders again, so campaign text
+that happens to contain "{{greeting}}" reaches every recipient verbatim.
+"""
+from app.services.template_loader import compile_template
+
+
+def test_partial_keeps_recipient_placeholders():
+    template = compile_template("{{greeting}} <h1>{{campaign_title}}</h1> <a href=\"{{unsubscribe_url}}\">x</a>")
+    partial = template.partial({'campaign_title': "Wells"})
+    assert partial.placeholders == ["greeting", "unsubscribe_url"]
+    assert partial.render({'greeting': "Hi Sam,", 'unsubscribe_url': "https://u"}) == (
+        "Hi Sam, <h1>Wells</h1> <a href=\"https://u\">x</a>"
+    )
+
+
+def test_partial_never_rescans_substituted_text():
+    template = compile_template("{{greeting}} {{campaign_title}} / {{campaign_description}}")
+    partial = template.partial({
+        'campaign_title': "{{greeting}}",
+        'campaign_description': "see {{unsubscribe_url}}",
+    })
+    assert partial.placeholders == ["greeting"]
+    assert partial.render({'greeting': "Hi,", 'unsubscribe_url': "https://u"}) == (
+        "Hi, {{greeting}} / see {{unsubscribe_url}}"
+    )
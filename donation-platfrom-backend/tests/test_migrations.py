@@ -0,0 +1,89 @@
+"""The Alembic history builds the schema the models declare, and every revision can be undone.
+
+A model change shipped without its migration fails here. These tests use a scratch database
+of their own, next to the test database.
+"""
+import re
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+import app.db.models  # noqa: F401  registers every model's table on Base.metadata
+from app.core.config import settings
+from app.db.database import Base
+from tests.conftest import alembic_config, recreate_database
+
+
+@pytest.fixture
+def migrations_url(database, monkeypatch):
+    """An empty scratch database; alembic's env.py migrates settings.DATABASE_URL."""
+    url = make_url(database)
+    url = url.set(database=f"{url.database}_migrations").render_as_string(hide_password=False)
+    recreate_database(url)
+    monkeypatch.setattr(settings, "DATABASE_URL", url)
+    return url
+
+
+def test_each_revision_upgrades_and_downgrades(migrations_url):
+    config = alembic_config()
+    revisions = [script.revision for script in reversed(list(ScriptDirectory.from_config(config).walk_revisions()))]
+    for revision in revisions:
+        command.upgrade(config, revision)
+        command.downgrade(config, "-1")
+        command.upgrade(config, revision)
+
+
+def test_models_match_migrations(migrations_url):
+    command.upgrade(alembic_config(), "head")
+    engine = create_engine(migrations_url, poolclass=NullPool)
+    try:
+        with engine.connect() as conn:
+            diff = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+    finally:
+        engine.dispose()
+    assert diff == [], "models and migrations differ; add a migration"
+
+
+# Details autogenerate doesn't compare: generated column expressions (the campaign search
+# vector), server defaults, and index definitions with their predicates, INCLUDE columns
+# and operator classes
+CATALOG_SQL = {
+    "generated": """
+        SELECT table_name || '.' || column_name, generation_expression FROM information_schema.columns
+        WHERE table_schema = :schema AND is_generated = 'ALWAYS'
+    """,
+    "defaults": """
+        SELECT table_name || '.' || column_name, column_default FROM information_schema.columns
+        WHERE table_schema = :schema AND column_default IS NOT NULL
+    """,
+    "indexes": "SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = :schema AND tablename <> 'alembic_version'",
+}
+
+
+def _catalog(conn, schema: str) -> dict:
+    unqualified = re.compile(rf"\b{schema}\.")
+    return {
+        kind: {name: unqualified.sub("", definition) for name, definition in conn.execute(text(sql), {"schema": schema})}
+        for kind, sql in CATALOG_SQL.items()
+    }
+
+
+def test_schema_details_match_models(migrations_url):
+    """The migrated schema matches one created straight from the models, detail for detail."""
+    command.upgrade(alembic_config(), "head")
+    engine = create_engine(migrations_url, poolclass=NullPool)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE SCHEMA from_models"))
+            Base.metadata.create_all(conn.execution_options(schema_translate_map={None: "from_models"}))
+            migrated, declared = _catalog(conn, "public"), _catalog(conn, "from_models")
+    finally:
+        engine.dispose()
+    for kind in CATALOG_SQL:
+        assert migrated[kind] == declared[kind], f"{kind} differ between migrations and models"
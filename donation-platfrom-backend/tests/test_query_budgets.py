@@ -0,0 +1,86 @@
+"""Campaign, donation and analytics endpoints run a constant number of SQL statements per request.
+
+Each endpoint is called with a page of 1 and a page of 50; the statement count must stay
+within its budget and must not grow with the page size, which is what an N+1 looks like.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.services.analytics_service import ANALYTICS_SECTIONS, AnalyticsService
+
+# (path, max statements, needs admin token); "{size}" is replaced by the page size and
+# "{campaign_ids}" by that many campaign ids
+BUDGETS = [
+    ("/api/v1/campaigns/public?page_size={size}", 3, False),
+    ("/api/v1/campaigns/public?page_size={size}&include_total=false", 2, False),
+    ("/api/v1/campaigns/paginated?page_size={size}", 3, False),
+    ("/api/v1/campaigns/public?page_size={size}&fields=title,current_amount", 2, False),  # count + page, no categories query
+    ("/api/v1/campaigns/public?page_size={size}&fields=title,current_amount,donation_stats", 2, False),  # stats joined inline
+    ("/api/v1/campaigns/featured", 2, False),
+    ("/api/v1/campaigns/search?keyword=water&page_size={size}", 3, False),  # count + ranked page, snippets inline
+    ("/api/v1/campaigns/suggest?q=watr", 2, False),  # threshold set_config + one indexed SELECT
+    ("/api/v1/campaigns/?limit={size}", 2, False),
+    ("/api/v1/campaigns/me/paginated?page_size={size}", 4, True),   # + current user
+    ("/api/v1/campaigns/admin/paginated?page_size={size}", 4, True),  # creator is joined, not a separate query
+    ("/api/v1/campaigns/{campaign_id}", 2, False),
+    ("/api/v1/donations/stats/{campaign_id}", 1, False),  # primary-key lookup on the stats rollup
+    ("/api/v1/donations/stats?campaign_ids={campaign_ids}", 1, False),  # one IN query for a whole grid
+    ("/api/v1/analytics/weekly-overview?weeks={size}", 2, True),  # current user + one generate_series query
+    ("/api/v1/analytics/category-distribution", 2, True),  # current user + one grouped query over all categories
+    ("/api/v1/analytics/comprehensive", 9, True),  # current user + overview in one statement + 7 for the other sections
+]
+
+
+@pytest.mark.parametrize("path, budget, needs_auth", BUDGETS)
+def test_statement_budget(client, statements, admin_headers, campaign_ids, path, budget, needs_auth):
+    client.get("/api/v1/campaigns/public")  # Warm up the connection pool
+    counts = []
+    for size in (1, 50):
+        url = path.format(size=size, campaign_id=campaign_ids[0], campaign_ids=",".join(map(str, campaign_ids[:size])))
+        with statements() as log:
+            response = client.get(url, headers=admin_headers if needs_auth else None)
+        assert response.status_code == 200, f"{url}: {response.text}"
+        counts.append(len(log))
+
+    assert counts[0] == counts[1], f"statement count grows with the page size: {counts[0]} -> {counts[1]}"
+    assert max(counts) <= budget, f"{max(counts)} statements, budget {budget}"
+
+
+# Statements per dashboard section of /analytics/comprehensive
+SECTION_BUDGETS = {
+    'overview': 1,  # every count and total in one statement
+    'donation_trends': 1,
+    'campaign_status': 1,
+    'category_distribution': 1,
+    'monthly_revenue': 1,
+    'top_campaigns': 1,
+    'user_growth': 2,  # daily buckets + users before the range
+}
+
+
+def test_every_analytics_section_has_a_budget():
+    assert set(SECTION_BUDGETS) == set(ANALYTICS_SECTIONS)
+
+
+@pytest.mark.parametrize("section, budget", SECTION_BUDGETS.items())
+def test_analytics_section_budget(database, section, budget):
+    report, _ = ANALYTICS_SECTIONS[section]
+    # A separate engine: the app's pool belongs to the test client's event loop
+    engine = create_async_engine(settings.async_database_url, poolclass=NullPool)
+    log = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: log.append(args[2]))
+
+    async def run():
+        try:
+            async with AsyncSession(engine) as db:
+                return await report(AnalyticsService(db))
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(run())
+    assert len(log) == budget, log
@@ -0,0 +1,168 @@
+"""Hot endpoints' SQL can be served from indexes, without sequential scans on large tables.
+
+Every SELECT issued while serving the endpoints below is captured and re-run with EXPLAIN.
+On the small test dataset Postgres rightly prefers sequential scans, so by default plans are
+made with enable_seqscan off: a Seq Scan that remains means no index can serve the query.
+The opt-in large_dataset test seeds a large dataset instead and checks the plans Postgres
+actually picks (it takes a minute or two):
+
+    pytest -m large_dataset
+"""
+import asyncio
+import json
+
+import asyncpg
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.database import SessionLocal, engine
+from app.services.activity_rollup_service import activity_rebuild_statements
+from app.services.donation_stats_service import stats_rebuild_statements
+
+# Tables that grow with usage; small lookup tables (users, categories) may be scanned
+BIG_TABLES = {"campaigns", "donations", "campaign_categories", "newsletter_subscriptions"}
+
+# (path, needs admin token); "{campaign_id}" is replaced by an active campaign
+HOT_ENDPOINTS = [
+    ("/api/v1/campaigns/public?lang=en&page_size=12", False),
+    ("/api/v1/campaigns/public?lang=ar&page=3&page_size=12", False),
+    ("/api/v1/campaigns/featured?lang=fr", False),
+    ("/api/v1/campaigns/paginated?status=active&lang=es&include_total=false", False),
+    ("/api/v1/campaigns/search?keyword=water&lang=en", False),
+    ("/api/v1/campaigns/search?keyword=school%20books", False),
+    ("/api/v1/campaigns/suggest?q=wat&lang=en", False),
+    ("/api/v1/campaigns/{campaign_id}", False),
+    ("/api/v1/campaigns/me/paginated", True),
+    ("/api/v1/donations/campaign/{campaign_id}", False),
+    ("/api/v1/donations/stats/{campaign_id}", False),
+    ("/api/v1/donations/stats?campaign_ids={campaign_id},1,2,3,4,5", False),
+    ("/api/v1/donations/my-donations", True),
+]
+
+LARGE_CAMPAIGNS = 100_000
+LARGE_DONATIONS = 1_000_000
+LARGE_SUBSCRIBERS = 50_000
+
+LARGE_SEED_SQL = [
+    # Donors; password hashes are never checked for these accounts
+    """
+    INSERT INTO users (email, username, hashed_password, full_name, is_active, is_admin)
+    SELECT 'seed-donor-' || i || '@example.com', 'seed_donor_' || i, '!', 'Seed Donor ' || i, true, false
+    FROM generate_series(1, 2000) i
+    """,
+    # Mostly active campaigns spread over five languages and a few hundred creators
+    """
+    INSERT INTO campaigns (title, description, markdown_text, target_amount, current_amount,
+                           status, lang, creator_id, created_at)
+    SELECT
+        (ARRAY['Clean water', 'School books', 'Medical care', 'Food parcels', 'Winter shelter'])[1 + i % 5]
+            || ' for town ' || i,
+        'Seed campaign ' || i || ' helping families with ' ||
+            (ARRAY['water wells', 'school supplies', 'clinic visits', 'food', 'blankets'])[1 + i % 5],
+        '# Campaign ' || i || E'\\n\\n' || repeat('Every donation goes directly to the families. ', 20),
+        1000 + i % 50000, 0,
+        (ARRAY['ACTIVE', 'ACTIVE', 'ACTIVE', 'COMPLETED', 'DRAFT', 'PENDING'])[1 + i % 6]::campaignstatus,
+        (ARRAY['en', 'ar', 'fr', 'es', 'ru'])[1 + i % 5],
+        (SELECT min(id) FROM users WHERE username LIKE 'seed_donor_%') + i % 300,
+        now() - (i % 1000) * interval '1 day' - (i % 86400) * interval '1 second'
+    FROM generate_series(1, :campaigns) i
+    """,
+    """
+    INSERT INTO campaign_categories (campaign_id, category_id)
+    SELECT c.id, cat.id FROM campaigns c
+    JOIN categories cat ON cat.id % 3 = c.id % 3
+    WHERE c.title LIKE '% for town %'
+    """,
+    """
+    INSERT INTO donations (amount, currency, is_anonymous, payment_status, payment_id,
+                           donor_id, campaign_id, created_at)
+    SELECT
+        5 + i % 500, 'USD', i % 7 = 0,
+        (ARRAY['completed', 'completed', 'completed', 'pending', 'failed'])[1 + i % 5],
+        'pi_seed_' || i,
+        CASE WHEN i % 4 = 0 THEN NULL ELSE d.first_id + i % 2000 END,
+        c.first_id + i % :campaigns,
+        now() - (i % 730) * interval '1 day' - (i % 86400) * interval '1 second'
+    FROM generate_series(1, :donations) i,
+         (SELECT min(id) AS first_id FROM users WHERE username LIKE 'seed_donor_%') d,
+         (SELECT min(id) AS first_id FROM campaigns WHERE title LIKE '% for town %') c
+    """,
+    """
+    INSERT INTO newsletter_subscriptions (email, is_active, language, source)
+    SELECT 'seed-subscriber-' || i || '@example.com', i % 10 <> 0,
+           (ARRAY['en', 'ar', 'fr', 'es', 'ru'])[1 + i % 5], 'footer'
+    FROM generate_series(1, :subscribers) i
+    """,
+]
+
+
+def _seq_scans(plan: dict) -> list:
+    """Large tables read with a sequential scan anywhere in a plan tree."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in BIG_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+def _capture_selects(client, statements, headers, campaign_id) -> list:
+    """(url, statement, parameters) for every SELECT the hot endpoints issue."""
+    client.get("/api/v1/campaigns/public")  # Warm up the connection pool
+    captured = []
+    for path, needs_auth in HOT_ENDPOINTS:
+        url = path.format(campaign_id=campaign_id)
+        with statements() as log:
+            response = client.get(url, headers=headers if needs_auth else None)
+        assert response.status_code == 200, f"{url}: {response.text}"
+        captured.extend(
+            (url, statement, parameters) for statement, parameters in log
+            if statement.lstrip().upper().startswith(("SELECT", "WITH"))
+        )
+    return captured
+
+
+async def _explain_seq_scans(captured: list, enable_seqscan: bool) -> list:
+    """'url: tables' for each captured statement planned with a sequential scan on a large table."""
+    conn = await asyncpg.connect(settings.async_database_url.replace("postgresql+asyncpg://", "postgresql://"))
+    failures = []
+    try:
+        await conn.execute(f"SET enable_seqscan = {'on' if enable_seqscan else 'off'}")
+        for url, statement, parameters in captured:
+            plan = json.loads(await conn.fetchval(f"EXPLAIN (FORMAT JSON) {statement}", *parameters))[0]["Plan"]
+            seq_scans = _seq_scans(plan)
+            if seq_scans:
+                failures.append(f"{url}: Seq Scan on {', '.join(sorted(set(seq_scans)))}: {' '.join(statement.split())[:100]}")
+    finally:
+        await conn.close()
+    return failures
+
+
+def test_hot_endpoints_have_indexes(client, statements, admin_headers, campaign_ids):
+    captured = _capture_selects(client, statements, admin_headers, campaign_ids[0])
+    assert captured
+    assert asyncio.run(_explain_seq_scans(captured, enable_seqscan=False)) == []
+
+
+@pytest.fixture(scope="module")
+def large_dataset(database):
+    db = SessionLocal()
+    try:
+        params = {"campaigns": LARGE_CAMPAIGNS, "donations": LARGE_DONATIONS, "subscribers": LARGE_SUBSCRIBERS}
+        for statement in LARGE_SEED_SQL:
+            db.execute(text(statement), params)
+        for statement in stats_rebuild_statements() + activity_rebuild_statements():
+            db.execute(statement)
+        db.commit()
+    finally:
+        db.close()
+    # Fresh statistics and visibility map, as autovacuum would eventually provide
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+
+
+@pytest.mark.large_dataset
+def test_hot_endpoints_use_indexes_at_scale(large_dataset, client, statements, admin_headers, campaign_ids):
+    captured = _capture_selects(client, statements, admin_headers, campaign_ids[0])
+    assert asyncio.run(_explain_seq_scans(captured, enable_seqscan=True)) == []
@@ -0,0 +1,81 @@
+"""Replayed webhooks count a payment once.
+
+Stripe redelivers events, sends several events for one PaymentIntent and races the
+/confirm-payment call; however they arrive, one payment_id adds one donation to the
+campaign total and stats.
+"""
+import asyncio
+import uuid
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db.models import Campaign, CampaignDonationStats, Donation, WebhookEvent
+from app.services.donation_stats_service import find_stats_drift
+from app.services.payment_service import PaymentService
+from app.services.webhook_service import enqueue_webhook_event, process_pending_events
+
+
+def _event(payment_id, campaign_id, event_id=None):
+    intent = {
+        'id': payment_id, 'amount': 2500, 'currency': 'usd',
+        'metadata': {'campaign_id': str(campaign_id), 'is_anonymous': 'False'}
+    }
+    return {
+        'id': event_id or f"evt_{uuid.uuid4().hex}", 'type': 'payment_intent.succeeded',
+        'data': {'object': intent}
+    }
+
+
+def test_replayed_payment_is_counted_once(database, campaign_ids):
+    campaign_id = campaign_ids[0]
+    payment_id = f"pi_replay_{uuid.uuid4().hex}"
+    engine = create_async_engine(settings.async_database_url, poolclass=NullPool)
+
+    async def totals(db):
+        amount = await db.scalar(select(Campaign.current_amount).where(Campaign.id == campaign_id))
+        count = await db.scalar(
+            select(CampaignDonationStats.donation_count).where(CampaignDonationStats.campaign_id == campaign_id)
+        )
+        rows = await db.scalar(select(func.count()).select_from(Donation).where(Donation.payment_id == payment_id))
+        drift = await find_stats_drift(db, campaign_id)
+        await db.rollback()
+        return amount, count or 0, rows, drift
+
+    async def process(db):
+        while await process_pending_events(db, 10):
+            pass
+
+    async def run():
+        try:
+            async with AsyncSession(engine) as db:
+                await db.execute(delete(WebhookEvent))
+                await db.commit()
+                amount, count, _, _ = await totals(db)
+
+                first = _event(payment_id, campaign_id)
+                assert await enqueue_webhook_event(db, first)
+                # A redelivery of the same event is dropped at intake
+                assert not await enqueue_webhook_event(db, first)
+                # A second event for the same payment lands in the same batch
+                assert await enqueue_webhook_event(db, _event(payment_id, campaign_id))
+                await process(db)
+                assert await totals(db) == (amount + 25, count + 1, 1, [])
+
+                # ...or in a later batch, or through /confirm-payment
+                assert await enqueue_webhook_event(db, _event(payment_id, campaign_id))
+                await process(db)
+                values = PaymentService.donation_values(first['data']['object'], "completed", None)
+                await PaymentService.record_completed_donation(db, values)
+                assert await totals(db) == (amount + 25, count + 1, 1, [])
+
+                statuses = (await db.scalars(select(WebhookEvent.status))).all()
+                assert statuses == ["processed"] * 3
+                await db.execute(delete(WebhookEvent))
+                await db.commit()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())